@@ -0,0 +1,301 @@
+"""
+Корпус страниц Steam для офлайн-бенчмарков.
+
+Страницы восстанавливаются из сохраненных результатов ./examples/*.json в разметке, которую разбирает паук:
+строки поиска, JSON-выдача бесконечной прокрутки, ответы api/appdetails и страницы продуктов. Часть продуктов
+превращается в особые случаи: DLC, саундтрек, продукт без обзоров и еще не вышедший продукт; продукты с франшизой
+и без нее берутся из примеров как есть. Чтобы стоимость разбора была близка к настоящей, страницы дополняются
+типичным для Steam содержимым, которое паук не читает: скриптами, описанием, рекомендациями и обзорами.
+"""
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import json
+import re
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+FIRST_APP_ID = 100_000
+SEARCH_PAGE_SIZE = 25
+
+OS_TO_DATA_OS = {
+    "Windows": "win",
+    "macOS": "mac",
+    "SteamOS + Linux": "linux",
+}
+
+# Особые случаи по остатку от деления номера продукта на VARIANTS_PERIOD; остальные продукты - обычные игры
+VARIANTS_PERIOD = 20
+VARIANTS = {
+    0: "dlc",
+    1: "soundtrack",
+    2: "coming_soon",
+    3: "no_reviews",
+    4: "no_reviews",
+}
+
+HEADINGS = {
+    "dlc": "Is this DLC relevant to you?",
+    "soundtrack": "Is this soundtrack relevant to you?",
+}
+
+LOREM = (
+    "Steam is the ultimate destination for playing, discussing, and creating games. "
+    "Fight your way through hordes of enemies, explore a vast open world and team up with friends. "
+)
+
+
+class Product(NamedTuple):
+    app_id:  int
+    game:    Dict[str, Any]  # Запись из ./examples
+    variant: str             # "game", "dlc", "soundtrack", "coming_soon" или "no_reviews"
+
+
+class Corpus(object):
+    # Страницы строятся один раз; copies > 1 повторяет примеры с новыми id для более длинных обходов
+
+    __slots__ = ["__store_url", "__products", "__product_pages", "__filler"]
+
+    def __init__(self, store_url: str, copies: int = 1, filler: bool = True) -> None:
+        self.__store_url: str = store_url.rstrip("/")
+        self.__filler: bool = filler
+        self.__products: List[Product] = list()
+
+        games = load_games()
+        for copy in range(copies):
+            for number, game in enumerate(games):
+                index = copy * len(games) + number
+                variant = VARIANTS.get(index % VARIANTS_PERIOD, "game")
+                if variant == "game" and game["reviews_count"] == "0":
+                    variant = "no_reviews"
+                self.__products.append(Product(app_id=FIRST_APP_ID + index, game=game, variant=variant))
+
+        self.__product_pages: Dict[int, bytes] = {
+            product.app_id: self.__form_product_page(product=product).encode("utf-8") for product in self.__products
+        }
+
+    def get_products(self) -> List[Product]:
+        return list(self.__products)
+
+    def get_product_url(self, product: Product) -> str:
+        slug = re.sub(r"\W+", "_", product.game["name"]).strip("_")
+        return f"{self.__store_url}/app/{product.app_id}/{slug}/"
+
+    def get_product_page(self, app_id: int) -> bytes | None:
+        return self.__product_pages.get(app_id)
+
+    def get_search_page(self, page: int) -> bytes:
+        start = (page - 1) * SEARCH_PAGE_SIZE
+        rows = self.__form_search_rows(start=start, count=SEARCH_PAGE_SIZE, page=page)
+
+        parts = ["<html><head><title>Steam Search</title></head><body>"]
+        if self.__filler:
+            parts.append(_form_search_sidebar())
+
+        parts.append(f'<div id="search_resultsRows">{rows}</div></body></html>')
+        return "".join(parts).encode("utf-8")
+
+    def get_search_results(self, start: int, count: int) -> bytes:
+        # Format: {"success": 1, "results_html": "...", "total_count": N, "start": start}
+        return json.dumps({
+            "success": 1,
+            "results_html": self.__form_search_rows(start=start, count=count, page=0),
+            "total_count": len(self.__products),
+            "start": start,
+        }).encode("utf-8")
+
+    def get_appdetails(self, app_id: int) -> bytes:
+        product = next((product for product in self.__products if product.app_id == app_id), None)
+        if product is None:
+            return json.dumps({str(app_id): {"success": False}}).encode("utf-8")
+
+        game = product.game
+        price, _, currency = game["price"].partition(" ")
+        data = {
+            "type": {"dlc": "dlc", "soundtrack": "music"}.get(product.variant, "game"),
+            "name": game["name"],
+            "price_overview": {"currency": currency, "final": round(float(price.replace(",", ".")) * 100)},
+            "developers": game["developers"],
+            "publishers": game["publishers"],
+            "platforms": {api_os: name in game["platforms"] for name, api_os in [
+                ("Windows", "windows"), ("macOS", "mac"), ("SteamOS + Linux", "linux"),
+            ]},
+            "genres": [{"id": str(number), "description": genre} for number, genre in enumerate(game["genres"])],
+            "release_date": {
+                "coming_soon": product.variant == "coming_soon",
+                "date": "Coming soon" if product.variant == "coming_soon" else game["release_date"],
+            },
+            "supported_languages": ", ".join(game["languages"]),
+        }
+        return json.dumps({str(app_id): {"success": True, "data": data}}).encode("utf-8")
+
+    def __form_search_rows(self, start: int, count: int, page: int) -> str:
+        rows = list()
+        for product in self.__products[start:start + count]:
+            game = product.game
+            price = game["price"].partition(" ")[0].replace(",", ".")
+            release_date = "Coming soon" if product.variant == "coming_soon" else game["release_date"]
+            platforms = "".join(
+                f'<span class="platform_img {OS_TO_DATA_OS[name]}"></span>' for name in game["platforms"] if name in OS_TO_DATA_OS
+            )
+
+            review = ""
+            if product.variant != "no_reviews" and game["reviews_count"] != "0":
+                tooltip = escape(f"{game['overall']}<br>90% of the {game['reviews_count']} user reviews are positive.")
+                review = f'<span class="search_review_summary positive" data-tooltip-html="{tooltip}"></span>'
+
+            rows.append(
+                f'<a href="{self.get_product_url(product=product)}?snr=1_7_7_151_150_{page}" '
+                f'data-ds-appid="{product.app_id}" class="search_result_row ds_collapse_flag " >'
+                f'<div class="responsive_search_name_combined"><div class="col search_name ellipsis">'
+                f'<span class="title">{escape(game["name"])}</span><div>{platforms}</div></div>'
+                f'<div class="col search_released responsive_secondrow">{escape(release_date)}</div>'
+                f'<div class="col search_reviewscore responsive_secondrow">{review}</div>'
+                f'<div class="col search_price_discount_combined responsive_secondrow" '
+                f'data-price-final="{round(float(price) * 100)}"><div class="col search_price responsive_secondrow">'
+                f'{escape(game["price"])}</div></div></div></a>'
+            )
+
+        return "\n".join(rows)
+
+    def __form_product_page(self, product: Product) -> str:
+        game = product.game
+        price, _, currency = game["price"].partition(" ")
+        heading = HEADINGS.get(product.variant, "Is this game relevant to you?")
+        release_date = "Coming soon" if product.variant == "coming_soon" else game["release_date"]
+
+        categories = ["All Games"] + [label.strip() for label in game["category"].split(">")] + [game["name"]]
+        parts = [
+            "<html><head>",
+            f"<title>{escape(game['name'])} on Steam</title>",
+            f'<meta itemprop="price" content="{escape(price)}">',
+            f'<meta itemprop="priceCurrency" content="{escape(currency)}">',
+        ]
+        if self.__filler:
+            parts.append(_form_script(seed=product.app_id))
+
+        parts.append("</head><body>")
+        parts.append('<div class="blockbg">' + "".join(f'<a href="#">{escape(label)}</a>' for label in categories) + "</div>")
+        parts.append(f'<div class="block responsive_apppage_details_right heading responsive_hidden">{heading}</div>')
+        parts.append("".join(f'<a class="app_tag" href="#">\n\t\t{escape(tag)}\t\t</a>' for tag in game["tags"]))
+
+        if product.variant == "no_reviews":
+            parts.append('<div class="noReviewsYetTitle">There are no reviews for this product</div>')
+            parts.append('<span class="game_review_summary no_reviews">No user reviews</span>')
+        else:
+            parts.append(f'<span itemprop="description">{escape(game["overall"])}</span>')
+            parts.append(
+                f'<label for="review_type_all">All Reviews <span class="user_reviews_count">({game["reviews_count"]})</span></label>'
+            )
+
+        if product.variant == "coming_soon":
+            parts.append('<span class="not_yet">This game is not yet available on Steam</span>')
+
+        parts.append('<div class="details_block" id="genresAndManufacturer">')
+        parts.append(f"<b>Title:</b> {escape(game['name'])}<br>")
+        parts.append("<b>Genre:</b> " + ", ".join(f"<a>{escape(genre)}</a>" for genre in game["genres"]) + "<br>")
+        parts.append('<div class="dev_row"><b>Developer:</b> ' + ", ".join(f"<a>{escape(label)}</a>" for label in game["developers"]) + "</div>")
+        parts.append('<div class="dev_row"><b>Publisher:</b> ' + ", ".join(f"<a>{escape(label)}</a>" for label in game["publishers"]) + "</div>")
+        if game["franchises"]:
+            parts.append('<div class="dev_row"><b>Franchise:</b> ' + ", ".join(f"<a>{escape(label)}</a>" for label in game["franchises"]) + "</div>")
+        parts.append(f"<b>Release Date:</b> {escape(release_date)}<br>")
+        parts.append("</div>")
+
+        if self.__filler:
+            parts.append(_form_description(seed=product.app_id))
+            parts.append(_form_recommendations(seed=product.app_id))
+
+        for number, name in enumerate(game["platforms"]):
+            active = " active" if number == 0 else ""
+            parts.append(
+                f'<div class="game_area_sys_req sysreq_content{active}" data-os="{OS_TO_DATA_OS[name]}">'
+                + (_form_system_requirements() if self.__filler else "") + "</div>"
+            )
+
+        parts.append('<table class="game_language_options">')
+        for language in game["languages"]:
+            parts.append(
+                f'<tr class=""><td class="ellipsis">\n\t\t\t\t{escape(language)}\t\t\t</td>'
+                '<td class="checkcol"><span>&#10004;</span></td><td class="checkcol"></td><td class="checkcol"></td></tr>'
+            )
+        parts.append("</table>")
+
+        if self.__filler:
+            parts.append(_form_reviews(seed=product.app_id))
+
+        parts.append("</body></html>")
+        return "\n".join(parts)
+
+
+def load_games() -> List[Dict[str, Any]]:
+    games, names = list(), set()
+    for path in sorted(EXAMPLES_DIR.glob("*.json")):
+        with open(file=path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                game = json.loads(line)
+                if game["name"] not in names:
+                    names.add(game["name"])
+                    games.append(game)
+
+    return games
+
+
+def _form_script(seed: int) -> str:
+    # Встроенные данные страницы: большой объем текста без разметки
+    entries = [f'"{seed}_{number}": {{"id": {number}, "label": "{LOREM[:60]}"}}' for number in range(1200)]
+    return "<script type=\"text/javascript\">var g_rgAppContextData = {" + ", ".join(entries) + "};</script>"
+
+
+def _form_description(seed: int) -> str:
+    paragraphs = "".join(f"<p class=\"bb_paragraph\">{LOREM * (1 + (seed + number) % 3)}</p>" for number in range(30))
+    return f'<div id="game_area_description" class="game_area_description"><h2>About This Game</h2>{paragraphs}</div>'
+
+
+def _form_recommendations(seed: int) -> str:
+    items = list()
+    for number in range(100):
+        items.append(
+            f'<a class="small_cap app_impression_tracked" data-ds-appid="{seed + number}" href="#">'
+            f'<img src="capsule_{number}.jpg" class="small_cap_img"><h4>Recommended game {number}</h4>'
+            f'<div class="discount_block no_discount"><div class="discount_prices">'
+            f'<div class="discount_final_price">{number * 10} RUB</div></div></div></a>'
+        )
+
+    return '<div id="recommended_block_content" class="block_content">' + "".join(items) + "</div>"
+
+
+def _form_system_requirements() -> str:
+    rows = [
+        ("OS", "Windows 10 64-bit"),
+        ("Processor", "Intel Core i5-4460 or AMD FX-6300"),
+        ("Memory", "8 GB RAM"),
+        ("Graphics", "NVIDIA GeForce GTX 960 or AMD Radeon R9 280"),
+        ("Storage", "40 GB available space"),
+    ]
+    items = "".join(f"<li><strong>{name}:</strong> {value}<br></li>" for name, value in rows)
+    return f'<div class="game_area_sys_req_leftCol"><ul class="bb_ul">{items}</ul></div>'
+
+
+def _form_reviews(seed: int) -> str:
+    reviews = list()
+    for number in range(10):
+        reviews.append(
+            f'<div class="review_box"><div class="persona_name"><a href="#">player_{seed}_{number}</a></div>'
+            f'<div class="vote_header"><div class="title ellipsis">Recommended</div>'
+            f'<div class="hours ellipsis">{number * 7}.5 hrs on record</div></div>'
+            f'<div class="content">{LOREM * 2}</div></div>'
+        )
+
+    return '<div id="Reviews_all" class="user_reviews">' + "".join(reviews) + "</div>"
+
+
+def _form_search_sidebar() -> str:
+    # Панель фильтров поиска: несколько сотен меток с флажками
+    rows = "".join(
+        f'<div class="tab_filter_control_row" data-param="tags" data-value="{number}">'
+        f'<span class="tab_filter_control_label">Tag {number}</span><span class="tab_filter_control_count">{number * 3}</span></div>'
+        for number in range(400)
+    )
+    return f'<div id="additional_search_options">{rows}</div>'
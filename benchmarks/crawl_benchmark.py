@@ -0,0 +1,240 @@
+"""
+Офлайн-бенчмарк паука на корпусе страниц Steam (см. benchmarks/corpus.py).
+
+1. Разбор: SteamGameSpider.parse на всех страницах продуктов корпуса без сети - страниц и предметов в секунду,
+   время построения дерева, разбора описания и каждого извлекателя поля (замеры StageStats, steam_stages/*), пиковая память на страницу.
+2. Обход: scrapy crawl против локального сервера-заменителя (STEAM_STORE_URL) с настройками проекта -
+   страниц и предметов в секунду и пиковый размер резидентной памяти процесса.
+3. Фрагменты (--mode fragments): разбор страниц продуктов и поиска с HTML_FRAGMENTS_ONLY и без него - предметы
+   и запросы должны совпадать; время и пиковая память на страницу в обоих случаях.
+
+Запуск из основной директории проекта: python -m benchmarks.crawl_benchmark [--parser lxml] [--copies 4]
+"""
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from typing import Any, Dict
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor, is_reactor_installed
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin_server import start_server_process
+from steam_crawler.config import load_config
+from steam_crawler.instrumentation import STAGES_PREFIX, stage_stats_flush
+from steam_crawler.items import Game
+from steam_crawler.spiders.SteamGameSpider import SEARCH_PAGE_SIZE, SteamGameSpider
+
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+
+REPEAT = 3
+
+
+def form_spider(parser: str, filename: str, **settings: Any) -> SteamGameSpider:
+    # Паук с настройками проекта и замерами этапов (STEAM_STAGE_STATS_ENABLED): их итоги - в статистике steam_stages/*.
+    # Без фильтров паук отдает предмет для каждой страницы игры
+    project_settings = get_project_settings()
+    if not is_reactor_installed():
+        # Реактор не запускается - разбор вызывается напрямую, но Crawler проверяет, что реактор проекта установлен
+        install_reactor(project_settings["TWISTED_REACTOR"], project_settings["ASYNCIO_EVENT_LOOP"])
+
+    crawler = get_crawler(SteamGameSpider, settings_dict=dict(
+        project_settings.copy_to_dict(),
+        HTML_PARSER=parser,
+        STEAM_STAGE_STATS_ENABLED=True,
+        **settings,
+    ))
+    return SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME=filename)))
+
+
+def get_stage_seconds(spider: SteamGameSpider) -> Dict[str, float]:
+    # Перенос накопленных StageStats значений в статистику Scrapy
+    spider.crawler.signals.send_catch_log(signal=stage_stats_flush)
+
+    stats = spider.crawler.stats.get_stats()
+    return {
+        key[len(STAGES_PREFIX):-len("/seconds")]: value
+        for key, value in stats.items() if key.startswith(STAGES_PREFIX) and key.endswith("/seconds")
+    }
+
+
+def benchmark_parse(parser: str, copies: int) -> None:
+    corpus = Corpus(store_url="https://store.steampowered.com", copies=copies)
+    responses = list()
+    for product in corpus.get_products():
+        url = corpus.get_product_url(product=product)
+        responses.append(HtmlResponse(
+            url=url,
+            body=corpus.get_product_page(app_id=product.app_id),
+            encoding="utf-8",
+            request=Request(url=url),
+        ))
+
+    with TemporaryDirectory() as directory:
+        spider = form_spider(parser=parser, filename=os.path.join(directory, "parse"))
+
+        items = 0
+        started_at, cpu_started_at = time.perf_counter(), time.process_time()
+        for _ in range(REPEAT):
+            for response in responses:
+                items += len(list(spider.parse(response)))
+        elapsed, cpu_elapsed = time.perf_counter() - started_at, time.process_time() - cpu_started_at
+        timings = get_stage_seconds(spider=spider)
+
+        tracemalloc.start()
+        peak = 0
+        for response in responses:
+            tracemalloc.reset_peak()
+            list(spider.parse(response))
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    pages = REPEAT * len(responses)
+    average_size = sum(len(response.body) for response in responses) / len(responses)
+    print(f"== SteamGameSpider.parse ({parser}, {len(responses)} pages, {average_size / 1024:.0f} KiB on average)")
+    print(f"Pages/sec:           {pages / elapsed:10.1f}")
+    print(f"Items/sec:           {items / elapsed:10.1f}")
+    print(f"CPU per page:        {cpu_elapsed / pages * 1000:10.3f} ms")
+    print(f"Peak traced memory:  {peak / 1024 / 1024:10.2f} MiB per page")
+    for stage, seconds in sorted(timings.items(), key=lambda pair: -pair[1]):
+        print(f"  {stage + ':':<26} {seconds / pages * 1000:8.3f} ms/page  {seconds / elapsed * 100:5.1f}%")
+
+
+def benchmark_fragments(parser: str, copies: int) -> bool:
+    corpus = Corpus(store_url="https://store.steampowered.com", copies=copies)
+    responses = list()
+    for product in corpus.get_products():
+        url = corpus.get_product_url(product=product)
+        body = corpus.get_product_page(app_id=product.app_id)
+        responses.append(HtmlResponse(url=url, body=body, encoding="utf-8", request=Request(url=url)))
+
+    for page in range(1, len(corpus.get_products()) // SEARCH_PAGE_SIZE + 2):
+        url = f"https://store.steampowered.com/search/?page={page}"
+        request = Request(url=url, meta={"query": 0, "page": page})
+        responses.append(HtmlResponse(url=url, body=corpus.get_search_page(page=page), encoding="utf-8", request=request))
+
+    def parse(spider: SteamGameSpider, response: HtmlResponse) -> list:
+        callback = spider.parse_search_page if "page" in response.meta else spider.parse
+        return [dict(entry) if isinstance(entry, Game) else entry.url for entry in callback(response)]
+
+    results, cpu_per_page, peaks = dict(), dict(), dict()
+    with TemporaryDirectory() as directory:
+        for is_fragments_only in (False, True):
+            spider = form_spider(parser=parser, filename=os.path.join(directory, "fragments"), HTML_FRAGMENTS_ONLY=is_fragments_only)
+
+            cpu_started_at = time.process_time()
+            for _ in range(REPEAT):
+                results[is_fragments_only] = [parse(spider=spider, response=response) for response in responses]
+            cpu_per_page[is_fragments_only] = (time.process_time() - cpu_started_at) / (REPEAT * len(responses))
+
+            tracemalloc.start()
+            peaks[is_fragments_only] = 0
+            for response in responses:
+                tracemalloc.reset_peak()
+                parse(spider=spider, response=response)
+                peaks[is_fragments_only] = max(peaks[is_fragments_only], tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    mismatches = sum(full != fragments for full, fragments in zip(results[False], results[True]))
+    print(f"== HTML_FRAGMENTS_ONLY ({parser}, {len(responses)} pages)")
+    print(f"Mismatched pages:    {mismatches:10d}")
+    for is_fragments_only, label in ((False, "full tree"), (True, "fragments")):
+        print(f"{label}: CPU per page {cpu_per_page[is_fragments_only] * 1000:8.3f} ms, peak traced memory {peaks[is_fragments_only] / 1024 / 1024:6.2f} MiB")
+
+    return mismatches == 0
+
+
+def benchmark_crawl(
+    parser: str,
+    copies: int,
+    search_backend: str,
+    product_backend: str,
+    extraction_processes: int,
+    config: str | None = None,
+) -> None:
+    server, store_url = start_server_process(copies=copies)
+
+    settings = get_project_settings()
+    settings.set("STEAM_STORE_URL", store_url)
+    settings.set("HTML_PARSER", parser)
+    settings.set("STEAM_CACHE_ENABLED", False)
+    settings.set("LOG_LEVEL", "WARNING")
+    if extraction_processes > 0:
+        settings.set("EXTRACTION_POOL_ENABLED", True)
+        settings.set("EXTRACTION_POOL_PROCESSES", extraction_processes)
+
+    with TemporaryDirectory() as directory:
+        # Фильтры - из файла настроек config (None -> без фильтров)
+        crawl_config = load_config(source=config or dict(), overrides=dict(
+            FILENAME=os.path.join(directory, "crawl"),
+            QUERY="benchmark",
+            SEARCH_BACKEND=search_backend,
+            PRODUCT_BACKEND=product_backend,
+        ))
+
+        process = CrawlerProcess(settings=settings)
+        crawler = process.create_crawler(SteamGameSpider)
+
+        started_at = time.perf_counter()
+        process.crawl(crawler, config=crawl_config)
+        process.start()
+        elapsed = time.perf_counter() - started_at
+
+    server.terminate()
+
+    stats = crawler.stats.get_stats()
+    pages = stats.get("response_received_count", 0)
+    items = stats.get("item_scraped_count", 0)
+    print(f"== Full crawl ({parser}, search: {search_backend}, product: {product_backend}, extraction processes: {extraction_processes})")
+    print(f"Responses:           {pages:10d}")
+    print(f"Response bytes:      {stats.get('downloader/response_bytes', 0) / 1024 / 1024:10.2f} MiB")
+    print(f"Items:               {items:10d}")
+    print(f"Elapsed:             {elapsed:10.2f} s")
+    print(f"Pages/sec:           {pages / elapsed:10.1f}")
+    print(f"Items/sec:           {items / elapsed:10.1f}")
+    print(f"Peak RSS:            {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:10.1f} MiB")
+    for key in sorted(stats):
+        if key.startswith("steam_stages/") and key.endswith("/seconds"):
+            stage = key[len("steam_stages/"):-len("/seconds")]
+            print(f"  {stage + ':':<26} {stats[key]:8.3f} s in {stats[key[:-len('seconds')] + 'calls']} calls")
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Офлайн-бенчмарк разбора и обхода на корпусе страниц Steam")
+    parser.add_argument("--parser", default="html.parser", help="HTML_PARSER: html.parser или lxml")
+    parser.add_argument("--copies", type=int, default=1, help="Число повторов примеров в корпусе")
+    parser.add_argument("--mode", choices=["all", "parse", "crawl", "fragments"], default="all")
+    parser.add_argument("--search-backend", choices=["pages", "infinite"], default="pages")
+    parser.add_argument("--product-backend", choices=["html", "api"], default="html")
+    parser.add_argument("--extraction-processes", type=int, default=0, help="EXTRACTION_POOL_PROCESSES (0 -> разбор в потоке реактора)")
+    parser.add_argument("--config", default=None, help="Файл настроек обхода .py/.toml/.json с фильтрами (по умолчанию - без фильтров)")
+    arguments = parser.parse_args()
+
+    # Обход - первым, чтобы пиковый размер памяти процесса относился к нему
+    if arguments.mode in ("all", "crawl"):
+        benchmark_crawl(
+            parser=arguments.parser,
+            copies=arguments.copies,
+            search_backend=arguments.search_backend,
+            product_backend=arguments.product_backend,
+            extraction_processes=arguments.extraction_processes,
+            config=arguments.config,
+        )
+
+    if arguments.mode in ("all", "parse"):
+        benchmark_parse(parser=arguments.parser, copies=arguments.copies)
+
+    if arguments.mode in ("all", "fragments"):
+        if not benchmark_fragments(parser=arguments.parser, copies=arguments.copies):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
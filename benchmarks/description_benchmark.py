@@ -0,0 +1,101 @@
+"""
+Микробенчмарк разбора блока genresAndManufacturer.
+
+Тексты описаний восстанавливаются из сохраненных результатов ./examples/*.json в том виде,
+в котором их отдает страница продукта. Сравниваются прежний способ (отдельный re.sub на каждое поле)
+и единственное сопоставление parse_game_description.
+
+Запуск из основной директории проекта: python -m benchmarks.description_benchmark
+"""
+from pathlib import Path
+from timeit import repeat
+from typing import List
+
+from steam_crawler.description import (
+    DESCRIPTION_WITH_FRANCHISE_REGEXPR,
+    DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR,
+    parse_game_description,
+)
+
+import json
+import re
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+REPEAT = 5
+NUMBER = 20
+
+
+def load_descriptions() -> List[str]:
+    descriptions = list()
+    for path in sorted(EXAMPLES_DIR.glob("*.json")):
+        with open(file=path, mode="r") as file:
+            for line in file:
+                game = json.loads(line)
+
+                parts = [
+                    f"Title: {game['name']}",
+                    f"Genre: {', '.join(game['genres'])}",
+                    f"Developer: {', '.join(game['developers'])}",
+                    f"Publisher: {', '.join(game['publishers'])}",
+                ]
+                if game["franchises"]:
+                    parts.append(f"Franchise: {', '.join(game['franchises'])}")
+
+                parts.append(f"Release Date: {game['release_date']}")
+                descriptions.append(" ".join(parts))
+
+    return descriptions
+
+
+def parse_per_field(description: str) -> tuple:
+    # Прежний способ: каждый геттер заново определял франшизу и выполнял свой re.sub
+    def field(group: int, franchise_group: int | None = None) -> str:
+        belongs_to_franchise = bool(re.match(DESCRIPTION_WITH_FRANCHISE_REGEXPR, description))
+        regexpr = DESCRIPTION_WITH_FRANCHISE_REGEXPR if belongs_to_franchise else DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR
+        substitution = rf"\{franchise_group}" if belongs_to_franchise and franchise_group else rf"\{group}"
+        return re.sub(regexpr, substitution, description).strip()
+
+    def labels(value: str) -> List[str]:
+        return list(map(lambda label: label.strip(), value.split(",")))
+
+    franchises = list()
+    if re.match(DESCRIPTION_WITH_FRANCHISE_REGEXPR, description):
+        franchises = labels(re.sub(DESCRIPTION_WITH_FRANCHISE_REGEXPR, r"\10", description).strip())
+
+    return (
+        field(2),
+        labels(field(4)),
+        labels(field(6)),
+        labels(field(8)),
+        franchises,
+        field(10, franchise_group=12),
+    )
+
+
+def measure(function, descriptions: List[str]) -> float:
+    def run() -> None:
+        for description in descriptions:
+            function(description)
+
+    best = min(repeat(run, repeat=REPEAT, number=NUMBER))
+    return best / (NUMBER * len(descriptions)) * 1_000_000  # мкс на продукт
+
+
+def main() -> None:
+    descriptions = load_descriptions()
+    for description in descriptions:
+        assert tuple(parse_game_description(description)) == parse_per_field(description), description
+
+    before = measure(parse_per_field, descriptions)
+    after = measure(parse_game_description, descriptions)
+
+    print(f"Products:            {len(descriptions)}")
+    print(f"re.sub per field:    {before:8.2f} us/item")
+    print(f"single precompiled:  {after:8.2f} us/item")
+    print(f"Speedup:             {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
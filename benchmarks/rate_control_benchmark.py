@@ -0,0 +1,124 @@
+"""
+Проверка SteamRateLimitMiddleware на локальном сервере-заменителе, который имитирует ограничения Steam.
+
+Сервер отвечает на /app/<id>/ небольшой страницей, но пропускает не больше ALLOWED_PER_SECOND запросов в секунду:
+остальные получают 429 с заголовком Retry-After. Обход запускается с настройками проекта (без кэша и выгрузок),
+после чего печатаются время обхода, число отклоненных сервером запросов и решения регулятора из статистики.
+
+Запуск из основной директории проекта: python -m benchmarks.rate_control_benchmark [--requests 300] [--rate 20]
+"""
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Dict
+
+from scrapy import Request, Spider
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+import time
+
+
+PAGE = b"<html><body><div id='appHubAppName'>Stand-in</div></body></html>"
+
+
+class ThrottlingServer(ThreadingHTTPServer):
+    # Окно в одну секунду: запросы сверх allowed_per_second в пределах окна отклоняются
+
+    daemon_threads = True
+
+    def __init__(self, allowed_per_second: int, retry_after: int) -> None:
+        super().__init__(("127.0.0.1", 0), ThrottlingHandler)
+        self.allowed_per_second: int = allowed_per_second
+        self.retry_after: int = retry_after
+        self.counters: Dict[str, int] = {"served": 0, "throttled": 0}
+        self.window_start: float = time.monotonic()
+        self.window_count: int = 0
+        self.lock: Lock = Lock()
+
+    def is_throttled(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+
+            self.window_count += 1
+            is_throttled = self.window_count > self.allowed_per_second
+            self.counters["throttled" if is_throttled else "served"] += 1
+            return is_throttled
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        if self.server.is_throttled():
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class RateControlProbeSpider(Spider):
+    name: str = "rate_control_probe"
+
+    def __init__(self, base_url: str, requests_count: int, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.base_url: str = base_url
+        self.requests_count: int = requests_count
+
+    async def start(self):
+        for app_id in range(self.requests_count):
+            yield Request(url=f"{self.base_url}/app/{app_id}/", dont_filter=True)
+
+    def parse(self, response):
+        yield {"url": response.url}
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Обход локального сервера, ограничивающего частоту запросов")
+    parser.add_argument("--requests", type=int, default=300, help="Число запросов страниц продуктов")
+    parser.add_argument("--rate", type=int, default=20, help="Допустимое сервером число запросов в секунду")
+    parser.add_argument("--retry-after", type=int, default=1, help="Значение заголовка Retry-After, с")
+    arguments = parser.parse_args()
+
+    server = ThrottlingServer(allowed_per_second=arguments.rate, retry_after=arguments.retry_after)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    settings = get_project_settings()
+    settings.set("ROBOTSTXT_OBEY", False)
+    settings.set("STEAM_CACHE_ENABLED", False)
+    settings.set("ITEM_PIPELINES", dict())
+    settings.set("RETRY_TIMES", 20)
+    settings.set("LOG_LEVEL", "WARNING")
+
+    process = CrawlerProcess(settings=settings)
+    crawler = process.create_crawler(RateControlProbeSpider)
+
+    started_at = time.monotonic()
+    process.crawl(crawler, base_url=f"http://127.0.0.1:{server.server_port}", requests_count=arguments.requests)
+    process.start()
+    elapsed = time.monotonic() - started_at
+    server.shutdown()
+
+    stats = crawler.stats.get_stats()
+    items = stats.get("item_scraped_count", 0)
+    print(f"Items:               {items} of {arguments.requests}")
+    print(f"Elapsed:             {elapsed:8.2f} s ({items / elapsed:.1f} items/s, server limit {arguments.rate}/s)")
+    print(f"Served / throttled:  {server.counters['served']} / {server.counters['throttled']}")
+    for key in sorted(stats):
+        if key.startswith("steam_rate/"):
+            print(f"{key + ':':<32} {stats[key]}")
+
+
+if __name__ == "__main__":
+    main()
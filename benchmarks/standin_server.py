@@ -0,0 +1,83 @@
+"""
+Локальный сервер-заменитель магазина Steam, отдающий страницы корпуса (см. benchmarks/corpus.py).
+
+Паук направляется на него настройкой STEAM_STORE_URL. Сервер работает в отдельном процессе,
+чтобы его работа не отнимала процессорное время у измеряемого обхода.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.corpus import SEARCH_PAGE_SIZE, Corpus
+
+import re
+
+
+APP_PATH_REGEXPR = re.compile(r"^/app/(\d+)/")
+
+ROBOTS_TXT = b"User-agent: *\nAllow: /\n"
+
+
+class StandInServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, copies: int = 1, filler: bool = True) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.store_url: str = f"http://127.0.0.1:{self.server_port}"
+        self.corpus: Corpus = Corpus(store_url=self.store_url, copies=copies, filler=filler)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        corpus = self.server.corpus
+
+        if url.path == "/robots.txt":
+            self.__send(body=ROBOTS_TXT, content_type="text/plain")
+        elif url.path.startswith("/search/results"):
+            start, count = int(query.get("start", 0)), int(query.get("count", SEARCH_PAGE_SIZE))
+            self.__send(body=corpus.get_search_results(start=start, count=count), content_type="application/json")
+        elif url.path.startswith("/search"):
+            self.__send(body=corpus.get_search_page(page=int(query.get("page", 1))), content_type="text/html; charset=utf-8")
+        elif url.path.startswith("/api/appdetails"):
+            self.__send(body=corpus.get_appdetails(app_id=int(query["appids"])), content_type="application/json")
+        elif APP_PATH_REGEXPR.match(url.path):
+            page = corpus.get_product_page(app_id=int(APP_PATH_REGEXPR.match(url.path).group(1)))
+            if page is None:
+                self.__send(body=b"", content_type="text/html", status=404)
+            else:
+                self.__send(body=page, content_type="text/html; charset=utf-8")
+        else:
+            self.__send(body=b"", content_type="text/html", status=404)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def __send(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server_process(copies: int = 1, filler: bool = True) -> Tuple[Any, str]:
+    # Возвращает процесс сервера и адрес, который нужно передать в STEAM_STORE_URL
+    context = get_context("spawn")
+    parent_connection, child_connection = context.Pipe()
+
+    process = context.Process(target=_serve, args=(child_connection, copies, filler), daemon=True)
+    process.start()
+    return process, parent_connection.recv()
+
+
+def _serve(connection: Any, copies: int, filler: bool) -> None:
+    server = StandInServer(copies=copies, filler=filler)
+    connection.send(server.store_url)
+    server.serve_forever()
@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from steam_crawler.search import OS_TO_FULL_NAME
+
+import re
+
+
+APPDETAILS_URL = "https://store.steampowered.com/api/appdetails?l=english&appids="
+
+APP_ID_REGEXPR = re.compile(r"/app/(\d+)")
+
+# Format: "https://store.steampowered.com/app/550/Left_4_Dead_2/?snr=1_7_7_151_150_1"; наборы - /bundle/ и /sub/
+PRODUCT_URL_REGEXPR = re.compile(r"^([a-z]+://[^/]+)/(app|bundle|sub)/(\d+)")
+
+TRACKING_PARAMETERS = ["snr"]  # Зависит от страницы поиска, с которой открыт продукт
+
+API_OS_TO_OS = {
+    "windows": "win",
+    "mac": "mac",
+    "linux": "linux",
+}
+
+API_RELEASE_DATE_FORMATS = [
+    "%b %d, %Y",  # "Nov 16, 2009"
+    "%d %b, %Y",  # "16 Nov, 2009"
+]
+
+SKIPPED_TYPES = [
+    "dlc",    # Аналог страницы "Is this DLC relevant to you?"
+    "music",  # Аналог страницы "Is this soundtrack relevant to you?"
+]
+
+
+def get_app_id(url: str) -> str | None:
+    match = APP_ID_REGEXPR.search(url)
+    return match.group(1) if match else None
+
+
+def get_product_key(url: str) -> str | None:
+    # Format: "app/550", "bundle/232" или "sub/12345"
+    match = PRODUCT_URL_REGEXPR.search(url)
+    return f"{match.group(2)}/{match.group(3)}" if match else None
+
+
+def canonicalize_product_url(url: str) -> str:
+    # Ссылка на продукт без названия в пути и параметров отслеживания; прочие ссылки не меняются
+    match = PRODUCT_URL_REGEXPR.search(url)
+    if not match:
+        return url
+
+    query = [(name, value) for name, value in parse_qsl(urlparse(url).query) if name not in TRACKING_PARAMETERS]
+    canonical_url = f"{match.group(1)}/{match.group(2)}/{match.group(3)}/"
+    return f"{canonical_url}?{urlencode(query)}" if query else canonical_url
+
+
+def is_required_app_type(data: Dict[str, Any]) -> bool:
+    if data.get("type") in SKIPPED_TYPES:
+        return False
+
+    return not _get_dict(data=data, name="release_date").get("coming_soon", False)
+
+
+def parse_appdetails(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Переводит поле "data" ответа api/appdetails в поля Game. Отсутствующие в API поля и поля неожиданного вида
+    # не заполняются: их извлекает страница продукта
+    fields = dict()
+
+    if isinstance(data.get("name"), str) and data["name"].strip():
+        fields["name"] = data["name"].strip()
+
+    price_overview = _get_dict(data=data, name="price_overview")
+    if isinstance(price_overview.get("final"), int) and isinstance(price_overview.get("currency"), str):
+        fields["price"] = f"{_format_price(price_overview['final'])} {price_overview['currency']}"
+
+    genres = data.get("genres")
+    if isinstance(genres, list) and all(isinstance(genre, dict) and isinstance(genre.get("description"), str) for genre in genres):
+        fields["genres"] = [genre["description"].strip() for genre in genres]
+
+    release_date = _get_dict(data=data, name="release_date").get("date")
+    if isinstance(release_date, str) and release_date.strip():
+        fields["release_date"] = _format_release_date(release_date=release_date.strip())
+
+    for field in ("developers", "publishers"):
+        labels = data.get(field)
+        if isinstance(labels, list) and all(isinstance(label, str) for label in labels):
+            fields[field] = [label.strip() for label in labels]
+
+    platforms = data.get("platforms")
+    if isinstance(platforms, dict):
+        fields["platforms"] = [
+            OS_TO_FULL_NAME[API_OS_TO_OS[op_sys]] for op_sys, is_supported in platforms.items()
+            if is_supported and op_sys in API_OS_TO_OS
+        ]
+
+    if isinstance(data.get("supported_languages"), str) and data["supported_languages"]:
+        fields["languages"] = _parse_languages(data["supported_languages"])
+
+    return fields
+
+
+def _get_dict(data: Dict[str, Any], name: str) -> Dict[str, Any]:
+    value = data.get(name)
+    return value if isinstance(value, dict) else dict()
+
+
+def _format_release_date(release_date: str) -> str:
+    # Как на странице продукта: "16 Nov, 2009". API в зависимости от региона отдает и "Nov 16, 2009";
+    # даты без дня ("Nov 2009", "Q1 2025", "Coming soon") на странице те же и не меняются
+    for date_format in API_RELEASE_DATE_FORMATS:
+        try:
+            parsed_date = datetime.strptime(release_date, date_format)
+        except ValueError:
+            continue
+
+        return f"{parsed_date.day} {parsed_date:%b}, {parsed_date.year}"
+
+    return release_date
+
+
+def _format_price(final: int) -> str:
+    # Как в meta-тэге страницы: "499" для целой стоимости, "9.99" для дробной
+    return str(final // 100) if final % 100 == 0 else f"{final / 100:.2f}"
+
+
+def _parse_languages(supported_languages: str) -> List[str]:
+    # Format: "English<strong>*</strong>, Russian<br><strong>*</strong>languages with full audio support"
+    languages = supported_languages.split("<br>")[0]
+    languages = re.sub(r"<[^>]+>", "", languages).replace("*", "")
+    return [language.strip() for language in languages.split(",") if language.strip()]
@@ -0,0 +1,237 @@
+"""
+Настройки одного обхода: неизменяемый проверенный объект CrawlConfig с теми же именами, что и в user_settings.py.
+
+Источники: модуль или словарь Python, файл .py, .toml или .json, а также аргументы паука (-a), например
+scrapy crawl SteamGameSpider -a config=crawl.toml -a QUERY="Zombie games" -a TAGS=Zombies,Horror
+"""
+from types import ModuleType
+from typing import Any, Dict, FrozenSet, Mapping, NamedTuple, Tuple
+
+from steam_crawler.writers import OUTPUT_FORMATS
+
+import json
+import os
+
+
+SEARCH_BACKENDS = ("pages", "infinite")
+SEARCH_ORDERS = ("release", "price")
+PRODUCT_BACKENDS = ("html", "api")
+
+# Списки меток фильтров хранятся множествами: проверка принадлежности не зависит от их длины
+LABEL_SETTINGS = ["PLATFORMS", "DEVELOPERS", "TAGS", "LANGUAGES", "GENRES", "PUBLISHERS", "FRANCHISES"]
+
+BOOL_SETTINGS = [
+    "INCREMENTAL",
+    "TURN_ON_PAGE_SETTINGS",
+    "TURN_ON_PRICE_SETTINGS",
+    "TURN_ON_RELEASE_SETTINGS",
+    "TURN_ON_OS_SETTINGS",
+    "TURN_ON_DEVELOPERS_SETTINGS",
+    "TURN_ON_TAGS_SETTINGS",
+    "TURN_ON_LANGUAGE_SETTINGS",
+    "TURN_ON_GENRE_SETTINGS",
+    "TURN_ON_PUBLISHER_SETTINGS",
+    "TURN_ON_FRANCHISE_SETTINGS",
+]
+
+
+class CrawlConfig(NamedTuple):
+    # Описание полей - в user_settings.py; незаданные поля (кроме FILENAME) отключают соответствующую настройку
+    FILENAME: str
+    QUERY: str | None = None
+    OUTPUT_FORMAT: str = "jsonl"
+
+    INCREMENTAL: bool = False
+    BATCH_QUERIES: Tuple["CrawlConfig", ...] | None = None
+
+    SEARCH_BACKEND: str = "pages"
+    SEARCH_BATCH_SIZE: int = 100
+    PRODUCT_BACKEND: str = "html"
+
+    SEARCH_ORDER: str | None = None
+    MAX_RESULTS: int | None = None
+    MAX_ITEMS: int | None = None
+
+    TURN_ON_PAGE_SETTINGS: bool = False
+    SINCE_PAGE: int | None = None
+    TILL_PAGE: int | None = None
+
+    TURN_ON_PRICE_SETTINGS: bool = False
+    MIN_PRICE: float | None = None
+    MAX_PRICE: float | None = None
+
+    TURN_ON_RELEASE_SETTINGS: bool = False
+    SINCE_RELEASE_YEAR: int | None = None
+    TILL_RELEASE_YEAR: int | None = None
+
+    TURN_ON_OS_SETTINGS: bool = False
+    ALL_OF_OS: bool | None = False
+    PLATFORMS: FrozenSet[str] | None = None
+
+    TURN_ON_DEVELOPERS_SETTINGS: bool = False
+    ALL_OF_DEVELOPERS: bool | None = False
+    DEVELOPERS: FrozenSet[str] | None = None
+
+    TURN_ON_TAGS_SETTINGS: bool = False
+    ALL_OF_TAGS: bool | None = False
+    TAGS: FrozenSet[str] | None = None
+
+    TURN_ON_LANGUAGE_SETTINGS: bool = False
+    ALL_OF_LANGUAGES: bool | None = False
+    LANGUAGES: FrozenSet[str] | None = None
+
+    TURN_ON_GENRE_SETTINGS: bool = False
+    ALL_OF_GENRES: bool | None = False
+    GENRES: FrozenSet[str] | None = None
+
+    TURN_ON_PUBLISHER_SETTINGS: bool = False
+    ALL_OF_PUBLISHERS: bool | None = False
+    PUBLISHERS: FrozenSet[str] | None = None
+
+    TURN_ON_FRANCHISE_SETTINGS: bool = False
+    ALL_OF_FRANCHISES: bool | None = False
+    FRANCHISES: FrozenSet[str] | None = None
+
+
+def load_config(source: Any = None, overrides: Mapping[str, Any] | None = None) -> CrawlConfig:
+    # source: None (user_settings.py), CrawlConfig, модуль, словарь или путь к файлу .py/.toml/.json;
+    # overrides - значения поверх source, в том числе строковые аргументы паука
+    if source is None:
+        import user_settings
+        source = user_settings
+
+    values = _read_source(source=source)
+    for name, value in (overrides or dict()).items():
+        values[name] = _parse_argument(name=name, value=value) if isinstance(value, str) else value
+
+    return _form_config(values=values, base=dict())
+
+
+def _read_source(source: Any) -> Dict[str, Any]:
+    if isinstance(source, CrawlConfig):
+        return source._asdict()
+
+    if isinstance(source, ModuleType):
+        return {name: getattr(source, name) for name in dir(source) if name.isupper()}
+
+    if isinstance(source, Mapping):
+        return dict(source)
+
+    path = os.fspath(source)
+    if path.endswith(".toml"):
+        import tomllib
+        with open(file=path, mode="rb") as file:
+            return tomllib.load(file)
+
+    if path.endswith(".json"):
+        with open(file=path, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+
+    if path.endswith(".py"):
+        import runpy
+        return {name: value for name, value in runpy.run_path(path).items() if name.isupper()}
+
+    raise ValueError(f"Unsupported config source {source!r}: expected a module, a mapping or a .py/.toml/.json file")
+
+
+def _parse_argument(name: str, value: str) -> Any:
+    # Аргументы -a всегда строки: "none" -> None, "true"/"false" -> bool, числа -> int/float,
+    # списки меток - через запятую или в формате JSON
+    if value.strip().lower() in ("none", "null"):
+        return None
+
+    if name in BOOL_SETTINGS or name.startswith("ALL_OF_"):
+        if value.strip().lower() not in ("true", "false", "1", "0"):
+            raise ValueError(f"{name} must be a boolean, got {value!r}")
+        return value.strip().lower() in ("true", "1")
+
+    if name in LABEL_SETTINGS:
+        if value.lstrip().startswith("["):
+            return json.loads(value)
+        return [label.strip() for label in value.split(",") if label.strip()]
+
+    if name == "BATCH_QUERIES":
+        return json.loads(value)
+
+    if name in ("QUERY", "FILENAME", "OUTPUT_FORMAT", "SEARCH_BACKEND", "PRODUCT_BACKEND", "SEARCH_ORDER"):
+        return value
+
+    try:
+        return int(value)
+    except ValueError:
+        pass
+
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+
+def _form_config(values: Dict[str, Any], base: Dict[str, Any]) -> CrawlConfig:
+    unknown = set(values) - set(CrawlConfig._fields)
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+
+    fields = dict(base)
+    fields.update(values)
+    if not fields.get("FILENAME"):
+        raise ValueError("FILENAME is required")
+
+    for name in LABEL_SETTINGS:
+        if fields.get(name) is not None:
+            if isinstance(fields[name], str):
+                raise ValueError(f"{name} must be a list of labels, got {fields[name]!r}")
+            fields[name] = frozenset(fields[name])
+
+    batch_queries = fields.get("BATCH_QUERIES")
+    if batch_queries:
+        # Запрос пакетного режима наследует все настройки, кроме самого списка запросов
+        query_base = dict(fields, BATCH_QUERIES=None)
+        fields["BATCH_QUERIES"] = tuple(_form_config(values=_read_source(source=query), base=query_base) for query in batch_queries)
+    else:
+        fields["BATCH_QUERIES"] = None
+
+    config = CrawlConfig(**fields)
+    _validate(config=config)
+    return config
+
+
+def _validate(config: CrawlConfig) -> None:
+    if config.OUTPUT_FORMAT not in OUTPUT_FORMATS:
+        raise ValueError(f"OUTPUT_FORMAT must be one of {OUTPUT_FORMATS}, got {config.OUTPUT_FORMAT!r}")
+
+    if config.SEARCH_BACKEND not in SEARCH_BACKENDS:
+        raise ValueError(f"SEARCH_BACKEND must be one of {SEARCH_BACKENDS}, got {config.SEARCH_BACKEND!r}")
+
+    if config.PRODUCT_BACKEND not in PRODUCT_BACKENDS:
+        raise ValueError(f"PRODUCT_BACKEND must be one of {PRODUCT_BACKENDS}, got {config.PRODUCT_BACKEND!r}")
+
+    if config.SEARCH_ORDER is not None and config.SEARCH_ORDER not in SEARCH_ORDERS:
+        raise ValueError(f"SEARCH_ORDER must be one of {SEARCH_ORDERS} or None, got {config.SEARCH_ORDER!r}")
+
+    for name in ("MAX_RESULTS", "MAX_ITEMS"):
+        if getattr(config, name) is not None and getattr(config, name) < 1:
+            raise ValueError(f"{name} must be positive, got {getattr(config, name)}")
+
+    if config.INCREMENTAL and (config.MAX_RESULTS is not None or config.MAX_ITEMS is not None):
+        # Продукты за пределами бюджета считались бы удаленными
+        raise ValueError("INCREMENTAL mode does not support MAX_RESULTS and MAX_ITEMS")
+
+    if config.SEARCH_BATCH_SIZE < 1:
+        raise ValueError(f"SEARCH_BATCH_SIZE must be positive, got {config.SEARCH_BATCH_SIZE}")
+
+    for name in ("SINCE_PAGE", "TILL_PAGE"):
+        if getattr(config, name) is not None and getattr(config, name) < 1:
+            raise ValueError(f"{name} must be at least 1, got {getattr(config, name)}")
+
+    for low, high in (("SINCE_PAGE", "TILL_PAGE"), ("MIN_PRICE", "MAX_PRICE"), ("SINCE_RELEASE_YEAR", "TILL_RELEASE_YEAR")):
+        if getattr(config, low) is not None and getattr(config, high) is not None and getattr(config, low) > getattr(config, high):
+            raise ValueError(f"{low} must not exceed {high}")
+
+    if config.BATCH_QUERIES:
+        if config.INCREMENTAL:
+            raise ValueError("INCREMENTAL mode does not support BATCH_QUERIES")
+
+        filenames = [query.FILENAME for query in config.BATCH_QUERIES]
+        if len(set(filenames)) != len(filenames):
+            raise ValueError("Every query in BATCH_QUERIES needs its own FILENAME")
@@ -0,0 +1,61 @@
+from datetime import date, datetime
+from typing import Any, Dict, Tuple
+
+import re
+
+
+LIST_FIELDS = ["genres", "tags", "developers", "publishers", "franchises", "platforms", "languages"]
+
+RELEASE_DATE_FORMATS = [
+    "%d %b, %Y",  # "16 Nov, 2009"
+    "%b %d, %Y",  # "Nov 16, 2009"
+    "%b %Y",      # "Nov 2009"
+    "%d %B, %Y",  # "16 November, 2009"
+    "%B %d, %Y",  # "November 16, 2009"
+    "%B %Y",      # "November 2009"
+    "%Y",         # "2009"
+]
+
+
+def parse_price(price: str) -> Tuple[float, str]:
+    # Format: "Price Currency", например "499 RUB" или "9,99 EUR"
+    value, _, currency = price.strip().partition(" ")
+    return float(value.replace(",", ".")), currency.strip()
+
+
+def parse_reviews_count(reviews_count: str) -> int:
+    # Format: "1,234"
+    digits = re.sub(r"\D", "", reviews_count)
+    return int(digits) if digits else 0
+
+
+def parse_release_date(release_date: str) -> date | None:
+    # Даты без дня считаются первым днем месяца (года); "Coming soon" и т.п. -> None
+    for date_format in RELEASE_DATE_FORMATS:
+        try:
+            return datetime.strptime(release_date.strip(), date_format).date()
+        except ValueError:
+            continue
+
+    return None
+
+
+def to_typed_record(game: Dict[str, Any]) -> Dict[str, Any]:
+    # Запись Game с типизированными полями: стоимость делится на число и валюту, число обзоров - целое,
+    # дата выхода - datetime.date, списковые поля остаются списками строк
+    price, currency = parse_price(game["price"])
+
+    record = {
+        "app_id": game.get("app_id"),
+        "name": game["name"],
+        "price": price,
+        "currency": currency,
+        "category": game["category"],
+        "overall": game["overall"],
+        "reviews_count": parse_reviews_count(game["reviews_count"]),
+        "release_date": parse_release_date(game["release_date"]),
+    }
+    for field in LIST_FIELDS:
+        record[field] = list(game[field])
+
+    return record
@@ -0,0 +1,111 @@
+from typing import Any, Dict, List
+
+from steam_crawler.conversions import LIST_FIELDS
+
+import sqlite3
+
+
+# Списковые поля Game хранятся нормализованно: справочник меток и таблица связей "продукт - метка"
+LABEL_TABLES = {
+    "genres":     ("genres",     "game_genres",     "genre_id"),
+    "tags":       ("tags",       "game_tags",       "tag_id"),
+    "developers": ("developers", "game_developers", "developer_id"),
+    "publishers": ("publishers", "game_publishers", "publisher_id"),
+    "franchises": ("franchises", "game_franchises", "franchise_id"),
+    "platforms":  ("platforms",  "game_platforms",  "platform_id"),
+    "languages":  ("languages",  "game_languages",  "language_id"),
+}
+
+GAMES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    app_id        TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    price         REAL NOT NULL,
+    currency      TEXT NOT NULL,
+    category      TEXT NOT NULL,
+    overall       TEXT NOT NULL,
+    reviews_count INTEGER NOT NULL,
+    release_date  TEXT,
+    release_year  INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_price_index ON games (price);
+CREATE INDEX IF NOT EXISTS games_release_year_index ON games (release_year);
+"""
+
+LABEL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {labels} (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS {links} (
+    app_id      TEXT NOT NULL REFERENCES games (app_id) ON DELETE CASCADE,
+    {label_id}  INTEGER NOT NULL REFERENCES {labels} (id),
+    PRIMARY KEY (app_id, {label_id})
+);
+CREATE INDEX IF NOT EXISTS {links}_{label_id}_index ON {links} ({label_id}, app_id);
+"""
+
+UPSERT_GAME = """
+INSERT INTO games (app_id, name, price, currency, category, overall, reviews_count, release_date, release_year)
+VALUES (:app_id, :name, :price, :currency, :category, :overall, :reviews_count, :release_date, :release_year)
+ON CONFLICT (app_id) DO UPDATE SET
+    name = excluded.name,
+    price = excluded.price,
+    currency = excluded.currency,
+    category = excluded.category,
+    overall = excluded.overall,
+    reviews_count = excluded.reviews_count,
+    release_date = excluded.release_date,
+    release_year = excluded.release_year
+"""
+
+
+class GameDatabase(object):
+    # База SQLite с продуктами: записи вставляются пачками в одной транзакции и обновляются по app_id
+
+    __slots__ = ["__connection"]
+
+    def __init__(self, path: str) -> None:
+        self.__connection: sqlite3.Connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+
+        with self.__connection:
+            self.__connection.executescript(GAMES_SCHEMA)
+            for labels, links, label_id in LABEL_TABLES.values():
+                self.__connection.executescript(LABEL_SCHEMA.format(labels=labels, links=links, label_id=label_id))
+
+    def upsert(self, records: List[Dict[str, Any]]) -> None:
+        # records - типизированные записи (см. to_typed_record)
+        rows = list()
+        for record in records:
+            release_date = record["release_date"]
+            rows.append(dict(
+                record,
+                app_id=self.get_key(record=record),
+                release_date=release_date.isoformat() if release_date else None,
+                release_year=release_date.year if release_date else None,
+            ))
+
+        with self.__connection:
+            self.__connection.executemany(UPSERT_GAME, rows)
+
+            for field in LIST_FIELDS:
+                labels, links, label_id = LABEL_TABLES[field]
+
+                names = {(name,) for row in rows for name in row[field]}
+                self.__connection.executemany(f"INSERT OR IGNORE INTO {labels} (name) VALUES (?)", names)
+
+                # Связи обновленных продуктов пересоздаются целиком
+                self.__connection.executemany(f"DELETE FROM {links} WHERE app_id = ?", [(row["app_id"],) for row in rows])
+                self.__connection.executemany(
+                    f"INSERT OR IGNORE INTO {links} (app_id, {label_id}) SELECT ?, id FROM {labels} WHERE name = ?",
+                    [(row["app_id"], name) for row in rows for name in row[field]],
+                )
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    @staticmethod
+    def get_key(record: Dict[str, Any]) -> str:
+        return record.get("app_id") or record["name"]  # У наборов (bundle, sub) нет id приложения
@@ -0,0 +1,59 @@
+from typing import List, NamedTuple
+
+import re
+
+
+DESCRIPTION_WITH_FRANCHISE_REGEXPR = r"(Title:)(.*)(Genre:)(.+)(Developer:)(.+)(Publisher:)(.+)(Franchise:)(.+)(Release Date:)(.+)"
+DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR = r"(Title: )(.*)(Genre:)(.+)(Developer:)(.+)(Publisher:)(.+)(Release Date:)(.+)"
+
+DESCRIPTION_WITH_FRANCHISE_PATTERN = re.compile(DESCRIPTION_WITH_FRANCHISE_REGEXPR)
+DESCRIPTION_WITHOUT_FRANCHISE_PATTERN = re.compile(DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR)
+
+
+class GameDescription(NamedTuple):
+    title:        str        # Название игры
+    genres:       List[str]  # Жанры игры
+    developers:   List[str]  # Разработчики
+    publishers:   List[str]  # Издатели
+    franchises:   List[str]  # Франшизы
+    release_date: str        # Дата выхода
+
+
+def parse_game_description(description: str) -> GameDescription:
+    # Текст блока genresAndManufacturer разбирается одним сопоставлением с заранее скомпилированным выражением
+    match = DESCRIPTION_WITH_FRANCHISE_PATTERN.match(description)
+    if match is not None:
+        return GameDescription(
+            title=match.group(2).strip(),
+            genres=_split_labels(match.group(4)),
+            developers=_split_labels(match.group(6)),
+            publishers=_split_labels(match.group(8)),
+            franchises=_split_labels(match.group(10)),
+            release_date=match.group(12).strip(),
+        )
+
+    match = DESCRIPTION_WITHOUT_FRANCHISE_PATTERN.search(description)
+    if match is not None:
+        return GameDescription(
+            title=match.group(2).strip(),
+            genres=_split_labels(match.group(4)),
+            developers=_split_labels(match.group(6)),
+            publishers=_split_labels(match.group(8)),
+            franchises=[],
+            release_date=match.group(10).strip(),
+        )
+
+    # Нестандартный блок: как и раньше, каждое поле получает весь текст описания
+    text = description.strip()
+    return GameDescription(
+        title=text,
+        genres=_split_labels(text),
+        developers=_split_labels(text),
+        publishers=_split_labels(text),
+        franchises=[],
+        release_date=text,
+    )
+
+
+def _split_labels(labels: str) -> List[str]:
+    return list(map(lambda label: label.strip(), labels.strip().split(",")))
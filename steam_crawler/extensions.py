@@ -0,0 +1,68 @@
+from scrapy import Spider, signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from steam_crawler.instrumentation import format_prometheus, get_numeric_stats, stage_stats_flush
+
+import json
+import logging
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+class SteamStatsExporter:
+    # Выгрузка статистики обхода каждые STEAM_STATS_EXPORT_INTERVAL секунд и при его завершении: одной строкой JSON
+    # в журнал и/или файлом в текстовом формате Prometheus (например, для textfile collector из node_exporter)
+
+    __slots__ = ["__crawler", "__interval", "__is_json_log", "__prometheus_file", "__task", "__weakref__"]
+
+    def __init__(self, crawler, interval: float, is_json_log: bool, prometheus_file: str | None) -> None:
+        self.__crawler = crawler
+        self.__interval: float = interval
+        self.__is_json_log: bool = is_json_log
+        self.__prometheus_file: str | None = prometheus_file
+        self.__task: task.LoopingCall | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        is_json_log = crawler.settings.getbool("STEAM_STATS_JSON_LOG")
+        prometheus_file = crawler.settings.get("STEAM_STATS_PROMETHEUS_FILE")
+        if not is_json_log and not prometheus_file:
+            raise NotConfigured
+
+        s = cls(
+            crawler=crawler,
+            interval=crawler.settings.getfloat("STEAM_STATS_EXPORT_INTERVAL", 60.0),
+            is_json_log=is_json_log,
+            prometheus_file=prometheus_file,
+        )
+        crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def spider_opened(self, spider: Spider) -> None:
+        if self.__interval > 0:
+            self.__task = task.LoopingCall(self.__export)
+            self.__task.start(self.__interval, now=False)
+
+    def spider_closed(self, spider: Spider, reason: str) -> None:
+        if self.__task is not None and self.__task.running:
+            self.__task.stop()
+
+        self.__export()
+
+    def __export(self) -> None:
+        self.__crawler.signals.send_catch_log(signal=stage_stats_flush)
+        stats = self.__crawler.stats.get_stats()
+
+        if self.__is_json_log:
+            logger.info("Crawl stats: %s", json.dumps(get_numeric_stats(stats=stats), sort_keys=True))
+
+        if self.__prometheus_file:
+            # Файл заменяется целиком: сборщик не прочитает его наполовину записанным
+            temporary_file = f"{self.__prometheus_file}.tmp"
+            with open(file=temporary_file, mode="w", encoding="utf-8") as file:
+                file.write(format_prometheus(stats=stats))
+            os.replace(temporary_file, self.__prometheus_file)
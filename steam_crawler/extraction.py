@@ -0,0 +1,321 @@
+"""
+Разбор страницы продукта: проверки типа страницы и извлечение полей Game.
+
+Функции не зависят от паука и его настроек, поэтому extract_product можно выполнять в отдельном процессе
+(EXTRACTION_POOL_ENABLED): туда передается только текст страницы, а обратно - обычный словарь полей.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+from scrapy import signals
+
+from steam_crawler.config import CrawlConfig
+from steam_crawler.description import GameDescription, parse_game_description
+from steam_crawler.filters import form_filters_plan
+from steam_crawler.search import OS_TO_FULL_NAME
+
+import asyncio
+import multiprocessing
+import os
+import re
+
+
+Extractor = Callable[[BeautifulSoup, GameDescription], Any]
+FiltersPlan = List[Tuple[str, Callable[[Any], bool]]]
+
+# Области страницы продукта, которые читают проверки и извлечение полей (HTML_FRAGMENTS_ONLY): дерево строится
+# только для тэгов с этими классами или атрибутами и их содержимого, остальная страница (описание, скриншоты,
+# обзоры, рекомендации) лишь просматривается парсером
+PRODUCT_FRAGMENT_CLASSES = frozenset([
+    "details_block",                     # Блок genresAndManufacturer
+    "blockbg",                           # Категория
+    "app_tag",                           # Тэги
+    "noReviewsYetTitle",                 # Обзоров нет
+    "game_review_summary",
+    "game_area_sys_req",                 # Платформы
+    "ellipsis",                          # Языки
+    "responsive_apppage_details_right",  # Заголовок DLC и саундтреков
+    "not_yet",                           # Продукт еще не вышел
+])
+PRODUCT_FRAGMENT_ITEMPROPS = frozenset(["price", "priceCurrency", "description"])  # Стоимость и оценка
+
+SEARCH_ROW_CLASS = "search_result_row"
+
+
+def is_product_fragment(name: str, attrs: Mapping[str, Any]) -> bool:
+    if attrs.get("itemprop") in PRODUCT_FRAGMENT_ITEMPROPS or attrs.get("for") == "review_type_all":
+        return True
+
+    return not PRODUCT_FRAGMENT_CLASSES.isdisjoint(_get_classes(attrs=attrs))
+
+
+def is_search_row_fragment(name: str, attrs: Mapping[str, Any]) -> bool:
+    return SEARCH_ROW_CLASS in _get_classes(attrs=attrs)
+
+
+def form_fragments_filter(is_fragment: Callable[[str, Mapping[str, Any]], bool]) -> SoupStrainer:
+    # Фильтр для parse_only: подходящий тэг сохраняется со всем содержимым, как при полном разборе
+    try:
+        from bs4 import ElementFilter
+    except ImportError:
+        # До bs4 4.13 SoupStrainer сам передает функции имя и атрибуты тэга
+        return SoupStrainer(name=lambda name, attrs: is_fragment(name, attrs or {}))
+
+    class FragmentsFilter(ElementFilter):
+        def allow_tag_creation(self, nsprefix: str | None, name: str, attrs: Mapping[str, Any] | None) -> bool:
+            return is_fragment(name, attrs or {})
+
+        def allow_string_creation(self, string: str) -> bool:
+            return False  # Текст вне подходящих тэгов
+
+    return FragmentsFilter()
+
+
+def _get_classes(attrs: Mapping[str, Any]) -> List[str]:
+    classes = attrs.get("class") or []
+    return classes.split() if isinstance(classes, str) else classes
+
+
+PRODUCT_FRAGMENTS = form_fragments_filter(is_fragment=is_product_fragment)
+SEARCH_ROW_FRAGMENTS = form_fragments_filter(is_fragment=is_search_row_fragment)
+
+
+def make_soup(page: str, parser: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    # "html.parser" не требует зависимостей, "lxml" заметно быстрее при установленном lxml
+    return BeautifulSoup(page, parser, parse_only=parse_only)
+
+
+def is_product_page(soup: BeautifulSoup) -> bool:
+    about_block = soup.find(name="div", attrs={"class": "details_block", "id": "genresAndManufacturer"})
+    return about_block is not None
+
+
+def is_dlc_page(soup: BeautifulSoup) -> bool:
+    if not is_product_page(soup=soup):
+        return False
+
+    block = soup.find(name="div", attrs={"class": "block responsive_apppage_details_right heading responsive_hidden"})
+
+    text = block.string.strip()
+    return text == "Is this DLC relevant to you?"
+
+
+def is_soundtrack_page(soup: BeautifulSoup) -> bool:
+    if not is_product_page(soup=soup):
+        return False
+
+    block = soup.find(name="div", attrs={"class": "block responsive_apppage_details_right heading responsive_hidden"})
+
+    text = block.string.strip()
+    return text == "Is this soundtrack relevant to you?"
+
+
+def is_released_product(soup: BeautifulSoup, description: GameDescription) -> bool:
+    block = soup.find(name="span", attrs={"class": "not_yet"})
+    if block is not None:
+        return False
+
+    return description.release_date.lower() not in [
+        "coming soon",
+        "to be announced",
+    ]
+
+
+def get_game_description(soup: BeautifulSoup) -> GameDescription:
+    about_block = soup.find(name="div", attrs={"class": "details_block", "id": "genresAndManufacturer"})
+    return parse_game_description(about_block.text.replace("\n", " ").strip())
+
+
+def get_price(soup: BeautifulSoup) -> str:
+    price = soup.find(name="meta", attrs={"itemprop": "price"})["content"].strip()
+    currency = soup.find(name="meta", attrs={"itemprop": "priceCurrency"})["content"].strip()
+
+    return f"{price} {currency}"
+
+
+def get_category(soup: BeautifulSoup) -> str:
+    category_blocks = soup.find(name="div", attrs={"class": "blockbg"}).find_all(name="a")
+    labels = list()
+
+    for index in range(1, len(category_blocks) - 1):
+        category = category_blocks[index]
+
+        label = category.text.strip()
+        labels.append(label)
+
+    return " > ".join(labels)
+
+
+def get_tags(soup: BeautifulSoup) -> List[str]:
+    tags = list()
+    for block in soup.find_all(name="a", attrs={"class": "app_tag"}):
+
+        tag = block.text.strip()
+        tags.append(tag)
+
+    return tags
+
+
+def has_reviews(soup: BeautifulSoup) -> bool:
+    block = soup.find(name="div", attrs={"class": "noReviewsYetTitle"})
+    if block is None:
+        return True
+
+    text = block.string.strip()
+    if text == "There are no reviews for this product":
+        return False
+
+    block = soup.find(name="span", attrs={"class": "game_review_summary no_reviews"})
+    if block is None:
+        return True
+
+    text = block.string.strip()
+    return text.lower() != "no user reviews"
+
+
+def get_overall(soup: BeautifulSoup) -> str:
+    if not has_reviews(soup=soup):
+        return "No User Reviews"
+
+    return soup.find(name="span", attrs={"itemprop": "description"}).string.strip()
+
+
+def get_reviews_count(soup: BeautifulSoup) -> str:
+    if not has_reviews(soup=soup):
+        return "0"
+
+    count = soup.find(name="label", attrs={"for": "review_type_all"}).span.text
+    return re.sub(r"(\()(.*)(\))", r"\2", count)  # Format before re: "(count)"
+
+
+def get_platforms(soup: BeautifulSoup) -> List[str]:
+    systems = list()
+    for block in soup.find_all(name="div", attrs={"class": re.compile(r"game_area_sys_req sysreq_content")}):
+        op_sys = block["data-os"]  # One of: "win", "max", "linux"
+        systems.append(OS_TO_FULL_NAME[op_sys])
+
+    return systems
+
+
+def get_languages(soup: BeautifulSoup) -> List[str]:
+    languages = list()
+    for block in soup.find_all("td", attrs={"class": "ellipsis"}):
+
+        language = block.string.strip()
+        languages.append(language)
+
+    return languages
+
+
+# Порядок полей совпадает с порядком полей в выходном файле
+EXTRACTORS: Dict[str, Extractor] = {
+    "name":          lambda soup, description: description.title,
+    "price":         lambda soup, description: get_price(soup=soup),
+    "category":      lambda soup, description: get_category(soup=soup),
+    "genres":        lambda soup, description: description.genres,
+    "tags":          lambda soup, description: get_tags(soup=soup),
+    "overall":       lambda soup, description: get_overall(soup=soup),
+    "reviews_count": lambda soup, description: get_reviews_count(soup=soup),
+    "release_date":  lambda soup, description: description.release_date,
+    "developers":    lambda soup, description: description.developers,
+    "publishers":    lambda soup, description: description.publishers,
+    "franchises":    lambda soup, description: description.franchises,
+    "platforms":     lambda soup, description: get_platforms(soup=soup),
+    "languages":     lambda soup, description: get_languages(soup=soup),
+}
+
+
+def extract_fields(
+    soup: BeautifulSoup,
+    filters_plan: FiltersPlan,
+    extractors: Mapping[str, Extractor] = EXTRACTORS,
+    get_description: Callable[[BeautifulSoup], GameDescription] = get_game_description,
+    api_fields: Mapping[str, Any] | None = None,
+) -> Dict[str, Any] | None:
+    # Поля игры в порядке extractors; None -> страница не продукт, продукт не вышел, DLC, саундтрек или не прошел фильтры
+    if not is_product_page(soup=soup):
+        return None
+
+    description = get_description(soup)  # Разбирается один раз на страницу
+    if not is_released_product(soup=soup, description=description):
+        return None
+
+    if is_dlc_page(soup=soup):
+        return None
+
+    if is_soundtrack_page(soup=soup):
+        return None
+
+    # Поля, полученные из api/appdetails, уже прошли свои фильтры и повторно не извлекаются
+    fields = dict(api_fields or {})
+
+    # Сначала извлекаются только поля, нужные включенным фильтрам, от самых дешевых к самым дорогим
+    for field, is_required in filters_plan:
+        if field in fields:
+            continue
+
+        fields[field] = extractors[field](soup, description)
+        if not is_required(fields[field]):
+            return None
+
+    return {field: fields[field] if field in fields else extract(soup, description) for field, extract in extractors.items()}
+
+
+# План фильтров рабочего процесса для каждого набора настроек: строится при первой странице
+_filters_plans: Dict[CrawlConfig, FiltersPlan] = dict()
+
+
+def extract_product(
+    page: str,
+    parser: str,
+    settings: CrawlConfig | None,
+    api_fields: Dict[str, Any] | None = None,
+    is_fragments_only: bool = True,
+) -> Dict[str, Any] | None:
+    # Разбор страницы по ее тексту для пула процессов. settings - настройки фильтров
+    # (None -> без фильтров, как в пакетном режиме, где фильтры применяются при распределении продуктов)
+    filters_plan = list()
+    if settings is not None:
+        filters_plan = _filters_plans.get(settings)
+        if filters_plan is None:
+            filters_plan = _filters_plans[settings] = form_filters_plan(settings=settings)
+
+    soup = make_soup(page=page, parser=parser, parse_only=PRODUCT_FRAGMENTS if is_fragments_only else None)
+    return extract_fields(soup=soup, filters_plan=filters_plan, api_fields=api_fields)
+
+
+class ExtractionPool(object):
+    # Пул процессов для extract_product: страницы продуктов разбираются на всех ядрах, а не в потоке реактора.
+    # Одновременно в пуле не больше max_pending страниц: остальные ответы ждут в обработчике, и Scrapy
+    # перестает выдавать новые ответы, когда их накапливается больше SCRAPER_SLOT_MAX_ACTIVE_SIZE
+
+    __slots__ = ["__executor", "__semaphore", "__weakref__"]  # __weakref__ нужен для подписки на сигналы
+
+    def __init__(self, crawler, processes: int, max_pending: int) -> None:
+        # spawn: рабочие процессы не наследуют реактор и открытые соединения родителя
+        self.__executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        self.__semaphore = asyncio.Semaphore(max_pending)
+
+        crawler.signals.connect(self.close, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        processes = crawler.settings.getint("EXTRACTION_POOL_PROCESSES") or os.cpu_count() or 1
+        max_pending = crawler.settings.getint("EXTRACTION_POOL_MAX_PENDING") or 2 * processes
+        return cls(crawler=crawler, processes=processes, max_pending=max_pending)
+
+    async def extract(
+        self,
+        page: str,
+        parser: str,
+        settings: CrawlConfig | None,
+        api_fields: Dict[str, Any] | None = None,
+        is_fragments_only: bool = True,
+    ) -> Dict[str, Any] | None:
+        async with self.__semaphore:
+            future = self.__executor.submit(extract_product, page, parser, settings, api_fields, is_fragments_only)
+            return await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=True, cancel_futures=True)
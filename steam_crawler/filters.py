@@ -0,0 +1,246 @@
+from typing import Any, Callable, Collection, Dict, List, Mapping, Tuple
+
+from steam_crawler.conversions import parse_price, parse_release_date
+from steam_crawler.search import SearchCandidate
+from steam_crawler.vocabulary import LANGUAGE_CODES, PLATFORM_CODES, TAG_IDS
+
+import math
+
+
+# Границы по умолчанию для незаданных (None) настроек
+MIN_PRICE = 0
+MAX_PRICE = 1_000_000_000
+SINCE_RELEASE_YEAR = 1900
+TILL_RELEASE_YEAR = 3000
+
+
+def any_of_in(required: Collection[str] | None, existing: List[str] | None) -> bool:
+    if not required:
+        return True
+
+    if not existing:
+        return False
+
+    # Списки меток CrawlConfig уже приведены к frozenset
+    required_labels = required if isinstance(required, frozenset) else frozenset(required)
+    return not required_labels.isdisjoint(existing)
+
+
+def all_of_in(required: Collection[str] | None, existing: List[str] | None) -> bool:
+    if not required:
+        return True
+
+    if not existing:
+        return False
+
+    required_labels = required if isinstance(required, frozenset) else frozenset(required)
+    return required_labels.issubset(existing)
+
+
+def has_required_labels(existing: List[str] | None, required: Collection[str] | None, all_of: bool | None) -> bool:
+    # all_of: все указанные метки обязательны, иначе достаточно хотя бы одной (None -> False)
+    if all_of:
+        return all_of_in(required, existing)
+    else:
+        return any_of_in(required, existing)
+
+
+def is_in_price_range(price: float, min_price: float | None, max_price: float | None) -> bool:
+    if min_price is None:
+        min_price = MIN_PRICE
+
+    if max_price is None:
+        max_price = MAX_PRICE
+
+    return min_price <= price <= max_price
+
+
+def is_in_release_year_range(year: int | None, since_year: int | None, till_year: int | None) -> bool:
+    if year is None:
+        return False  # Дата выхода не распознана
+
+    if since_year is None:
+        since_year = SINCE_RELEASE_YEAR
+
+    if till_year is None:
+        till_year = TILL_RELEASE_YEAR
+
+    return since_year <= year <= till_year
+
+
+def get_release_year(release_date: str) -> int | None:
+    # Форматы - conversions.RELEASE_DATE_FORMATS ("16 Nov, 2009", "Nov 16, 2009", "Nov 2009" и т.д.);
+    # иначе ("Coming soon" и т.п.) -> None
+    parsed_date = parse_release_date(release_date)
+    return parsed_date.year if parsed_date is not None else None
+
+
+# Порядок проверки фильтров по стоимости извлечения поля: сначала поля уже разобранного описания,
+# затем одиночные meta-тэги, затем поиск по всей странице
+FILTERS_ORDER = [
+    "release_date",
+    "genres",
+    "developers",
+    "publishers",
+    "franchises",
+    "price",
+    "platforms",
+    "tags",
+    "languages",
+]
+
+
+def form_filters_plan(settings: Any) -> List[Tuple[str, Callable[[Any], bool]]]:
+    # settings - CrawlConfig либо другой объект с настройками под теми же именами, что и в user_settings.py.
+    # Возвращает включенные фильтры "поле -> проверка значения поля" в порядке FILTERS_ORDER
+    filters = {
+        "release_date": (
+            settings.TURN_ON_RELEASE_SETTINGS,
+            lambda release_date: is_in_release_year_range(
+                get_release_year(release_date),
+                since_year=settings.SINCE_RELEASE_YEAR,
+                till_year=settings.TILL_RELEASE_YEAR,
+            ),
+        ),
+        "genres": (
+            settings.TURN_ON_GENRE_SETTINGS,
+            lambda genres: has_required_labels(genres, required=settings.GENRES, all_of=settings.ALL_OF_GENRES),
+        ),
+        "developers": (
+            settings.TURN_ON_DEVELOPERS_SETTINGS,
+            lambda developers: has_required_labels(developers, required=settings.DEVELOPERS, all_of=settings.ALL_OF_DEVELOPERS),
+        ),
+        "publishers": (
+            settings.TURN_ON_PUBLISHER_SETTINGS,
+            lambda publishers: has_required_labels(publishers, required=settings.PUBLISHERS, all_of=settings.ALL_OF_PUBLISHERS),
+        ),
+        "franchises": (
+            settings.TURN_ON_FRANCHISE_SETTINGS,
+            lambda franchises: has_required_labels(franchises, required=settings.FRANCHISES, all_of=settings.ALL_OF_FRANCHISES),
+        ),
+        "price": (
+            settings.TURN_ON_PRICE_SETTINGS,
+            lambda price: is_in_price_range(parse_price(price)[0], min_price=settings.MIN_PRICE, max_price=settings.MAX_PRICE),
+        ),
+        "platforms": (
+            settings.TURN_ON_OS_SETTINGS,
+            lambda platforms: has_required_labels(platforms, required=settings.PLATFORMS, all_of=settings.ALL_OF_OS),
+        ),
+        "tags": (
+            settings.TURN_ON_TAGS_SETTINGS,
+            lambda tags: has_required_labels(tags, required=settings.TAGS, all_of=settings.ALL_OF_TAGS),
+        ),
+        "languages": (
+            settings.TURN_ON_LANGUAGE_SETTINGS,
+            lambda languages: has_required_labels(languages, required=settings.LANGUAGES, all_of=settings.ALL_OF_LANGUAGES),
+        ),
+    }
+
+    return [(field, filters[field][1]) for field in FILTERS_ORDER if filters[field][0]]
+
+
+# План фильтров для каждого набора настроек (CrawlConfig): строится при первой проверке продукта
+_filters_plans: Dict[Any, List[Tuple[str, Callable[[Any], bool]]]] = dict()
+
+
+def is_required_game(game: Dict[str, Any], settings: Any) -> bool:
+    filters_plan = _filters_plans.get(settings)
+    if filters_plan is None:
+        filters_plan = _filters_plans[settings] = form_filters_plan(settings=settings)
+
+    for field, is_required in filters_plan:
+        if not is_required(game[field]):
+            return False
+
+    return True
+
+
+# Поля строки поиска, проверяемые до загрузки страницы продукта, в порядке проверки
+CANDIDATE_FILTERS_ORDER = [
+    "price",
+    "release_date",
+    "platforms",
+]
+
+
+def form_candidate_filters_plan(settings: Any) -> List[Tuple[str, Callable[[SearchCandidate], bool]]]:
+    # Включенные фильтры строк поиска в порядке CANDIDATE_FILTERS_ORDER. Проверка отбрасывает лишь ту строку,
+    # данные которой есть и точно не проходят фильтр
+    filters = {
+        "price": (
+            settings.TURN_ON_PRICE_SETTINGS,
+            lambda candidate: candidate.price is None
+            or is_in_price_range(candidate.price, min_price=settings.MIN_PRICE, max_price=settings.MAX_PRICE),
+        ),
+        "release_date": (
+            settings.TURN_ON_RELEASE_SETTINGS,
+            lambda candidate: is_candidate_in_release_year_range(candidate=candidate, settings=settings),
+        ),
+        "platforms": (
+            settings.TURN_ON_OS_SETTINGS,
+            lambda candidate: not candidate.platforms
+            or has_required_labels(candidate.platforms, required=settings.PLATFORMS, all_of=settings.ALL_OF_OS),
+        ),
+    }
+
+    return [(field, filters[field][1]) for field in CANDIDATE_FILTERS_ORDER if filters[field][0]]
+
+
+def is_candidate_in_release_year_range(candidate: SearchCandidate, settings: Any) -> bool:
+    if candidate.release_date is None:
+        return True
+
+    year = get_release_year(candidate.release_date)
+    return year is None or is_in_release_year_range(year, settings.SINCE_RELEASE_YEAR, settings.TILL_RELEASE_YEAR)
+
+
+def form_search_parameters(settings: Any) -> List[Tuple[str, str]]:
+    # Параметры поиска Steam для включенных фильтров: выдача сужается до надмножества подходящих продуктов,
+    # а точная проверка остается за страницей продукта. Несколько тэгов поиск требует все сразу; для нескольких
+    # языков и платформ способ объединения не гарантирован, поэтому при "хотя бы один из" параметр добавляется
+    # лишь для единственной метки
+    parameters = list()
+
+    if settings.TURN_ON_TAGS_SETTINGS:
+        tag_ids = get_search_labels(required=settings.TAGS, all_of=settings.ALL_OF_TAGS, vocabulary=TAG_IDS)
+        if tag_ids:
+            parameters.append(("tags", ",".join(tag_ids)))
+
+    if settings.TURN_ON_LANGUAGE_SETTINGS:
+        languages = get_search_labels(required=settings.LANGUAGES, all_of=settings.ALL_OF_LANGUAGES, vocabulary=LANGUAGE_CODES)
+        if languages:
+            parameters.append(("supportedlang", ",".join(languages)))
+
+    if settings.TURN_ON_OS_SETTINGS:
+        platforms = get_search_labels(required=settings.PLATFORMS, all_of=settings.ALL_OF_OS, vocabulary=PLATFORM_CODES)
+        if platforms:
+            parameters.append(("os", ",".join(platforms)))
+
+    if settings.TURN_ON_PRICE_SETTINGS and settings.MAX_PRICE is not None:
+        # Поиск принимает целую верхнюю границу: округление вверх не отсеивает подходящие продукты
+        parameters.append(("maxprice", "free" if settings.MAX_PRICE <= 0 else str(math.ceil(settings.MAX_PRICE))))
+
+    return parameters
+
+
+def get_search_labels(required: Collection[str] | None, all_of: bool | None, vocabulary: Mapping[str, Any]) -> List[str]:
+    # При "все из" достаточно любого подмножества известных словарю меток, при "хотя бы один из" - только одной метки
+    if not required or (not all_of and len(required) > 1):
+        return list()
+
+    return sorted(str(vocabulary[label]) for label in required if label in vocabulary)
+
+
+def is_past_search_order_bound(candidates: List[SearchCandidate], settings: Any) -> bool:
+    # Для упорядоченной выдачи (SEARCH_ORDER): последний результат уже вышел раньше SINCE_RELEASE_YEAR
+    # или стоит дороже MAX_PRICE, значит, ни один из следующих результатов фильтрам не подойдет
+    if settings.SEARCH_ORDER == "release" and settings.TURN_ON_RELEASE_SETTINGS and settings.SINCE_RELEASE_YEAR is not None:
+        years = [get_release_year(candidate.release_date) for candidate in candidates if candidate.release_date is not None]
+        years = [year for year in years if year is not None]
+        return bool(years) and years[-1] < settings.SINCE_RELEASE_YEAR
+
+    if settings.SEARCH_ORDER == "price" and settings.TURN_ON_PRICE_SETTINGS and settings.MAX_PRICE is not None:
+        prices = [candidate.price for candidate in candidates if candidate.price is not None]
+        return bool(prices) and prices[-1] > settings.MAX_PRICE
+
+    return False
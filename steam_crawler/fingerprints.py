@@ -0,0 +1,26 @@
+from scrapy import Request
+from scrapy.utils.request import RequestFingerprinter
+
+from steam_crawler.appdetails import canonicalize_product_url
+
+
+class SteamRequestFingerprinter(object):
+    # Отпечаток запроса продукта считается по канонической ссылке (тип и id продукта без названия и параметра snr):
+    # продукт, найденный на разных страницах поиска или разными запросами, загружается один раз, в том числе
+    # после возобновления обхода из JOBDIR, где отпечатки загруженных запросов хранятся между запусками
+
+    __slots__ = ["__fingerprinter"]
+
+    def __init__(self, crawler=None) -> None:
+        self.__fingerprinter: RequestFingerprinter = RequestFingerprinter(crawler)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler=crawler)
+
+    def fingerprint(self, request: Request) -> bytes:
+        url = canonicalize_product_url(url=request.url)
+        if url != request.url:
+            request = request.replace(url=url)
+
+        return self.__fingerprinter.fingerprint(request)
@@ -0,0 +1,276 @@
+"""
+Общий фронтир распределенного обхода (FRONTIER_ENABLED): очередь страниц поиска и страниц продуктов, из которой
+задачи забирают несколько рабочих процессов, в том числе на разных машинах.
+
+Каждая задача - сериализованный запрос Scrapy с ключом, по которому задачи не повторяются: "search/<запрос>/<страница>"
+для страницы поиска и "product/<ключ продукта>" для продукта. Рабочий процесс забирает задачи пачками, отмечает
+выполненными после обработки ответа, а задачи, взятые давно остановившимся процессом, отдаются другим.
+Новые задачи и отметки о выполнении копятся в памяти процесса и записываются в хранилище одной транзакцией
+(flush, а также перед claim, is_drained и unregister): задача и порожденные ею задачи не теряются по отдельности.
+Запись может ждать блокировки хранилища, поэтому паук вызывает flush, claim и is_drained не в потоке реактора.
+
+Хранилище подключаемое (FRONTIER_STORE): SqliteFrontierStore - база SQLite в общем каталоге; другое хранилище
+(например, Redis) наследует FrontierStore и реализует его абстрактные методы.
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+
+
+FRONTIER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id         INTEGER PRIMARY KEY,
+    key        TEXT NOT NULL UNIQUE,
+    request    BLOB NOT NULL,
+    state      INTEGER NOT NULL DEFAULT 0,
+    worker     TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_state_index ON tasks (state, id);
+CREATE TABLE IF NOT EXISTS workers (
+    worker    TEXT PRIMARY KEY,
+    is_active INTEGER NOT NULL,
+    seen_at   REAL NOT NULL
+);
+"""
+
+# Состояния задач
+PENDING = 0
+CLAIMED = 1
+DONE = 2
+
+# Состояния процессов (workers.is_active)
+STOPPED = 0
+WORKING = 1
+FINISHED = 2  # Все задачи выполнены, процесс ждет остальных
+
+
+class FrontierTask(NamedTuple):
+    key:     str             # Ключ, по которому задачи не повторяются
+    request: Dict[str, Any]  # Запрос в виде request_to_dict
+
+
+def get_default_worker() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class FrontierStore(ABC):
+    # Интерфейс хранилища фронтира
+
+    __slots__ = []
+
+    @classmethod
+    @abstractmethod
+    def from_crawler(cls, crawler, filename: str):
+        # Создает хранилище по настройкам обхода; filename - FILENAME обхода, рядом с которым хранилище
+        # может располагаться по умолчанию
+        ...
+
+    @property
+    @abstractmethod
+    def worker(self) -> str:
+        # Имя рабочего процесса: различает процессы фронтира и их части выходного файла
+        ...
+
+    @abstractmethod
+    def add(self, tasks: List[FrontierTask]) -> None:
+        # Добавляет задачи, ключей которых во фронтире еще не было. Может лишь запомнить их до flush
+        ...
+
+    @abstractmethod
+    def complete(self, key: str) -> None:
+        # Может лишь запомнить отметку до flush
+        ...
+
+    @abstractmethod
+    def flush(self) -> None:
+        # Записывает запомненные задачи и отметки о выполнении одной транзакцией
+        ...
+
+    @abstractmethod
+    def claim(self, limit: int) -> List[FrontierTask]:
+        # Забирает до limit ожидающих задач или задач, взятых дольше FRONTIER_CLAIM_TIMEOUT назад
+        ...
+
+    @abstractmethod
+    def is_drained(self) -> bool:
+        # True -> все задачи выполнены: новых задач больше не появится
+        ...
+
+    @abstractmethod
+    def finish(self) -> bool:
+        # Отмечает, что процесс выполнил все задачи; True -> работающих процессов не осталось. Процесс,
+        # остановившийся посреди обхода, считается работающим еще FRONTIER_CLAIM_TIMEOUT секунд
+        ...
+
+    @abstractmethod
+    def unregister(self) -> bool:
+        # Отмечает процесс завершившимся, возвращает его невыполненные задачи и закрывает соединение;
+        # True -> других работающих или ждущих процессов не осталось. После unregister остальные методы ничего не делают
+        ...
+
+    @abstractmethod
+    def drop(self) -> None:
+        # Удаляет фронтир завершенного обхода, чтобы повторный запуск начал обход заново.
+        # Вызывается после unregister последним процессом
+        ...
+
+
+class SqliteFrontierStore(FrontierStore):
+    # Фронтир в базе SQLite: все процессы открывают один файл (на разных машинах - в общем сетевом каталоге),
+    # а блокировки SQLite делают выдачу задач атомарной. Методы можно вызывать из разных потоков:
+    # соединение и запомненные изменения защищены блокировкой
+
+    __slots__ = ["__path", "__connection", "__lock", "__worker", "__claim_timeout", "__tasks", "__completed"]
+
+    def __init__(self, path: str, worker: str, claim_timeout: float = 600.0) -> None:
+        self.__path: str = path
+        self.__connection: sqlite3.Connection | None = sqlite3.connect(path, timeout=60.0, isolation_level=None, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__lock: threading.Lock = threading.Lock()
+        self.__worker: str = worker
+        self.__claim_timeout: float = claim_timeout
+        self.__tasks: List[FrontierTask] = list()
+        self.__completed: List[str] = list()
+
+        self.__connection.executescript(FRONTIER_SCHEMA)
+        with self.__transaction():
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO workers (worker, is_active, seen_at) VALUES (?, ?, ?)",
+                (self.__worker, WORKING, time.time()),
+            )
+
+    @classmethod
+    def from_crawler(cls, crawler, filename: str):
+        return cls(
+            path=crawler.settings.get("FRONTIER_PATH") or f"{filename}.frontier.sqlite3",
+            worker=crawler.settings.get("FRONTIER_WORKER") or get_default_worker(),
+            claim_timeout=crawler.settings.getfloat("FRONTIER_CLAIM_TIMEOUT", 600.0),
+        )
+
+    @property
+    def worker(self) -> str:
+        return self.__worker
+
+    def add(self, tasks: List[FrontierTask]) -> None:
+        with self.__lock:
+            self.__tasks.extend(tasks)
+
+    def complete(self, key: str) -> None:
+        with self.__lock:
+            self.__completed.append(key)
+
+    def flush(self) -> None:
+        with self.__lock:
+            if self.__connection is None:
+                return
+
+            with self.__transaction():
+                self.__write()
+
+    def claim(self, limit: int) -> List[FrontierTask]:
+        with self.__lock:
+            if self.__connection is None:
+                return []
+
+            now = time.time()
+            with self.__transaction():
+                self.__write()
+                rows = self.__connection.execute(
+                    "SELECT id, key, request FROM tasks WHERE state = ? OR (state = ? AND claimed_at < ?) ORDER BY id LIMIT ?",
+                    (PENDING, CLAIMED, now - self.__claim_timeout, limit),
+                ).fetchall()
+
+                self.__connection.executemany(
+                    "UPDATE tasks SET state = ?, worker = ?, claimed_at = ? WHERE id = ?",
+                    [(CLAIMED, self.__worker, now, task_id) for task_id, _, _ in rows],
+                )
+                if rows:
+                    # Задачи остановившегося процесса могли достаться процессу, который уже ждал остальных
+                    self.__connection.execute("UPDATE workers SET is_active = ? WHERE worker = ?", (WORKING, self.__worker))
+
+        return [FrontierTask(key=key, request=pickle.loads(request)) for _, key, request in rows]
+
+    def is_drained(self) -> bool:
+        with self.__lock:
+            if self.__connection is None:
+                return False
+
+            with self.__transaction():
+                self.__write()
+                return self.__connection.execute("SELECT 1 FROM tasks WHERE state != ? LIMIT 1", (DONE,)).fetchone() is None
+
+    def finish(self) -> bool:
+        with self.__lock:
+            if self.__connection is None:
+                return False
+
+            with self.__transaction():
+                self.__write(is_active=FINISHED)
+                return not self.__has_other_workers(states=(WORKING,))
+
+    def unregister(self) -> bool:
+        with self.__lock:
+            if self.__connection is None:
+                return False
+
+            with self.__transaction():
+                self.__write(is_active=STOPPED)
+                # Невыполненные задачи прерванного процесса сразу достаются другим, а не по истечении FRONTIER_CLAIM_TIMEOUT
+                self.__connection.execute(
+                    "UPDATE tasks SET state = ?, worker = NULL, claimed_at = NULL WHERE state = ? AND worker = ?",
+                    (PENDING, CLAIMED, self.__worker),
+                )
+                is_last = not self.__has_other_workers(states=(WORKING, FINISHED))
+
+            self.__connection.close()
+            self.__connection = None
+
+        return is_last
+
+    def drop(self) -> None:
+        # Вместе с базой - журнал WAL и его индекс, если SQLite не удалил их при закрытии соединения
+        for path in (self.__path, f"{self.__path}-wal", f"{self.__path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __write(self, is_active: int | None = None) -> None:
+        # Запомненные задачи и отметки о выполнении; заодно процесс отмечается живым
+        now = time.time()
+        self.__connection.executemany(
+            "INSERT OR IGNORE INTO tasks (key, request) VALUES (?, ?)",
+            [(task.key, pickle.dumps(task.request, protocol=pickle.HIGHEST_PROTOCOL)) for task in self.__tasks],
+        )
+        self.__connection.executemany("UPDATE tasks SET state = ? WHERE key = ?", [(DONE, key) for key in self.__completed])
+        if is_active is None:
+            self.__connection.execute("UPDATE workers SET seen_at = ? WHERE worker = ?", (now, self.__worker))
+        else:
+            self.__connection.execute("UPDATE workers SET is_active = ?, seen_at = ? WHERE worker = ?", (is_active, now, self.__worker))
+
+    def __has_other_workers(self, states: tuple) -> bool:
+        # Процесс, давно не писавший во фронтир, считается остановившимся
+        placeholders = ", ".join("?" * len(states))
+        return self.__connection.execute(
+            f"SELECT 1 FROM workers WHERE worker != ? AND is_active IN ({placeholders}) AND seen_at >= ? LIMIT 1",
+            (self.__worker, *states, time.time() - self.__claim_timeout),
+        ).fetchone() is not None
+
+    @contextmanager
+    def __transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE сразу берет блокировку записи: два процесса не заберут одну и ту же задачу
+        self.__connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+
+        self.__connection.execute("COMMIT")
+        self.__tasks, self.__completed = list(), list()  # Записаны (__write)
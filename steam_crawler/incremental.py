@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Set
+
+from steam_crawler.items import Game
+from steam_crawler.search import SearchCandidate
+
+from itemadapter import ItemAdapter
+
+import hashlib
+import json
+import os
+
+
+class IncrementalState(object):
+    # Хранилище "id продукта -> последний отпечаток (стоимость, число обзоров, хэш содержимого) и сама запись"
+    # между запусками одного и того же запроса
+
+    __slots__ = ["__path", "__records", "__seen", "__is_complete"]
+
+    def __init__(self, path: str) -> None:
+        self.__path: str = path
+        self.__records: Dict[str, Dict[str, Any]] = dict()
+        self.__seen: Set[str] = set()
+        self.__is_complete: bool = True  # False -> часть выдачи поиска не просмотрена
+
+        if os.path.exists(path):
+            with open(file=path, mode="r") as file:
+                self.__records = json.load(file)
+
+    def is_unchanged_candidate(self, app_id: str, candidate: SearchCandidate) -> bool:
+        # Строка поиска без стоимости или числа обзоров не позволяет доказать, что продукт не изменился
+        record = self.__records.get(app_id)
+        if record is None or candidate.price is None or candidate.reviews_count is None:
+            return False
+
+        stored_price = float(record["price"].replace(",", ".").split()[0])  # Format: "Price Currency"
+        if stored_price != candidate.price or record["reviews_count"] != candidate.reviews_count:
+            return False
+
+        self.__seen.add(app_id)
+        return True
+
+    def update(self, game: Game) -> str:
+        # Возвращает "new", "changed" или "unchanged"
+        key = self.get_key(game=game)
+        content = ItemAdapter(game).asdict()
+        content_hash = hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+        record = self.__records.get(key)
+        self.__seen.add(key)
+        self.__records[key] = {
+            "price": content["price"],
+            "reviews_count": content["reviews_count"],
+            "hash": content_hash,
+            "game": content,
+        }
+
+        if record is None:
+            return "new"
+
+        return "unchanged" if record["hash"] == content_hash else "changed"
+
+    def keep(self, key: str) -> None:
+        # Продукт, страница которого не загрузилась, сохраняет запись прошлого запуска
+        self.__seen.add(key)
+
+    def mark_incomplete(self) -> None:
+        # Страница поиска пропущена: продукты с нее неизвестны, и непросмотренные нельзя считать удаленными
+        self.__is_complete = False
+
+    @property
+    def is_complete(self) -> bool:
+        return self.__is_complete
+
+    def remove_unseen(self) -> List[Dict[str, Any]]:
+        # Продукты, не встретившиеся в этом запуске, больше не подходят под запрос
+        removed = list()
+        for key in list(self.__records.keys()):
+            if key not in self.__seen:
+                removed.append(self.__records.pop(key)["game"])
+
+        return removed
+
+    def get_games(self) -> List[Dict[str, Any]]:
+        return [record["game"] for record in self.__records.values()]
+
+    def save(self) -> None:
+        temporary_path = f"{self.__path}.tmp"
+        with open(file=temporary_path, mode="w") as file:
+            json.dump(self.__records, file)
+
+        os.replace(temporary_path, self.__path)
+
+    @staticmethod
+    def get_key(game: Game) -> str:
+        return game.get("app_id") or game["name"]  # У наборов (bundle, sub) нет id приложения
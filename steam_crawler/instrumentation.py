@@ -0,0 +1,126 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+from scrapy import signals
+
+import time
+
+
+STAGES_PREFIX = "steam_stages/"    # steam_stages/<этап>/seconds и steam_stages/<этап>/calls
+FILTERS_PREFIX = "steam_filters/"  # steam_filters/<источник>/<поле>/checked и steam_filters/<источник>/<поле>/rejected
+
+PROMETHEUS_PREFIX = "steam_crawler_"
+
+# Сигнал переноса накопленных StageStats значений в статистику Scrapy, например перед ее выгрузкой
+stage_stats_flush = object()
+
+
+class StageStats(object):
+    # Время этапов обработки и исходы фильтров копятся в собственных счетчиках и переносятся в статистику Scrapy
+    # по сигналу stage_stats_flush и при завершении обхода: методы StatsCollector слишком дороги для каждого этапа.
+    # Замер - два вызова perf_counter и пара сложений, доли микросекунды: замеры можно не отключать
+
+    __slots__ = ["__crawler", "__stages", "__filters", "__weakref__"]  # __weakref__ нужен для подписки на сигналы
+
+    def __init__(self, crawler) -> None:
+        self.__crawler = crawler
+        self.__stages: Dict[str, List[float]] = dict()  # Этап -> [секунды, вызовы]
+        self.__filters: Dict[str, List[int]] = dict()   # "Источник/поле" -> [проверено, отклонено]
+
+        crawler.signals.connect(self.flush, signal=stage_stats_flush)
+        crawler.signals.connect(self.flush, signal=signals.spider_closed)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        totals = self.__get_stage_totals(stage=stage)
+        totals[0] += seconds
+        totals[1] += 1
+
+    def measure(self, stage: str, function: Callable) -> Callable:
+        totals = self.__get_stage_totals(stage=stage)
+
+        def measured(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals[0] += time.perf_counter() - started_at
+                totals[1] += 1
+
+        return measured
+
+    def measure_filter(self, source: str, field: str, is_required: Callable[[Any], bool]) -> Callable[[Any], bool]:
+        # source: "search_row" для строк поиска, "product" для полей страницы продукта и api/appdetails
+        stage_totals = self.__get_stage_totals(stage=f"filter/{source}/{field}")
+        filter_totals = self.__filters.setdefault(f"{source}/{field}", [0, 0])
+
+        def measured(value: Any) -> bool:
+            started_at = time.perf_counter()
+            is_passed = is_required(value)
+            stage_totals[0] += time.perf_counter() - started_at
+            stage_totals[1] += 1
+
+            filter_totals[0] += 1
+            if not is_passed:
+                filter_totals[1] += 1
+
+            return is_passed
+
+        return measured
+
+    def flush(self) -> None:
+        stats = self.__crawler.stats
+        for stage, (seconds, calls) in self.__stages.items():
+            stats.set_value(f"{STAGES_PREFIX}{stage}/seconds", seconds)
+            stats.set_value(f"{STAGES_PREFIX}{stage}/calls", calls)
+
+        for name, (checked, rejected) in self.__filters.items():
+            stats.set_value(f"{FILTERS_PREFIX}{name}/checked", checked)
+            stats.set_value(f"{FILTERS_PREFIX}{name}/rejected", rejected)
+
+    def __get_stage_totals(self, stage: str) -> List[float]:
+        totals = self.__stages.get(stage)
+        if totals is None:
+            totals = self.__stages[stage] = [0.0, 0]
+
+        return totals
+
+
+def get_numeric_stats(stats: Dict[str, Any]) -> Dict[str, int | float]:
+    # Счетчики и размеры без дат начала и окончания обхода и строковых значений
+    return {
+        key: value for key, value in stats.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def format_prometheus(stats: Dict[str, Any]) -> str:
+    # Текстовый формат Prometheus: этапы и фильтры - счетчики с метками, прочая статистика Scrapy - steam_crawler_stat
+    samples: Dict[Tuple[str, str], List[str]] = dict()
+
+    for key, value in sorted(get_numeric_stats(stats=stats).items()):
+        if key.startswith(STAGES_PREFIX):
+            stage, _, unit = key[len(STAGES_PREFIX):].rpartition("/")
+            name = f"stage_{unit}_total"
+            labels = {"stage": stage}
+        elif key.startswith(FILTERS_PREFIX):
+            path, _, outcome = key[len(FILTERS_PREFIX):].rpartition("/")
+            source, _, field = path.partition("/")
+            name = f"filter_{outcome}_total"
+            labels = {"source": source, "filter": field}
+        else:
+            name = "stat"
+            labels = {"name": key}
+
+        metric_type = "gauge" if name == "stat" else "counter"
+        formatted_labels = ",".join(f'{label}="{_escape_label(value=label_value)}"' for label, label_value in labels.items())
+        samples.setdefault((PROMETHEUS_PREFIX + name, metric_type), list()).append(f"{PROMETHEUS_PREFIX}{name}{{{formatted_labels}}} {value}")
+
+    lines = list()
+    for (name, metric_type), metric_samples in samples.items():
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(metric_samples)
+
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -3,7 +3,10 @@ from typing import List
 
 
 class Game(Item):
-    
+
+    #
+    app_id:        str       = Field()  # Идентификатор продукта в Steam (None -> набор bundle/sub)
+
     #
     name:          str       = Field()  # Название игры
     price:         str       = Field()  # Стоимость игры
@@ -26,3 +29,6 @@ class Game(Item):
     #
     platforms:     List[str] = Field()  # Доступные платформы
     languages:     List[str] = Field()  # Поддерживаемые языки
+
+    #
+    output:        str       = Field()  # Имя выходного файла запроса (только в пакетном режиме)
@@ -3,11 +3,41 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-from scrapy import signals
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterable, Dict, Generator, Iterable
+from urllib.parse import parse_qs, urlparse
+
+from scrapy import Request, Spider, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers, Response
+from scrapy.responsetypes import responsetypes
+from scrapy.statscollectors import StatsCollector
+from w3lib.url import add_or_replace_parameter
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from steam_crawler.appdetails import get_app_id
+from steam_crawler.instrumentation import StageStats
+
+import gzip
+import hashlib
+import logging
+import pickle
+import random
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Разброс задержки при отступлении: одновременно получившие 429 слоты не возвращаются к серверу в один момент
+BACKOFF_JITTER = 0.2
+
+DELAY_DECAY = 0.9   # Множитель задержки слота на каждый успешный ответ
+FLOOR_DECAY = 0.99  # Множитель нижней границы задержки: медленная проверка, не ослабил ли сервер ограничение
+
 
 class SteamCrawlerSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -56,48 +86,533 @@ class SteamCrawlerSpiderMiddleware:
         spider.logger.info('Spider opened: %s' % spider.name)
 
 
+def get_url_class(url: str) -> str | None:
+    # Класс ссылки Steam определяется только путем, поэтому и локальный сервер-заменитель классифицируется так же
+    path = urlparse(url).path
+    if path.startswith("/search"):
+        return "search"
+    if path.startswith("/api/appdetails"):
+        return "api"
+    if path.startswith("/app/"):
+        return "app"
+
+    return None
+
+
 class SteamCrawlerDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    # Постоянный кэш ответов на диске: сжатые ответы хранятся по ключу "класс ссылки + id продукта + язык",
+    # живут в течение времени, заданного для класса ссылки (STEAM_CACHE_TTL), а затем перепроверяются
+    # условным запросом (If-None-Match / If-Modified-Since)
+
+    __slots__ = ["__directory", "__ttls", "__stats", "__weakref__"]  # __weakref__ нужен для подписки на сигналы
+
+    def __init__(self, directory: str, ttls: Dict[str, int], stats: StatsCollector) -> None:
+        self.__directory: Path = Path(directory)
+        self.__ttls: Dict[str, int] = ttls
+        self.__stats: StatsCollector = stats
 
     @classmethod
     def from_crawler(cls, crawler):
-        # This method is used by Scrapy to create your spiders.
-        s = cls()
+        if not crawler.settings.getbool("STEAM_CACHE_ENABLED"):
+            raise NotConfigured
+
+        s = cls(
+            directory=crawler.settings.get("STEAM_CACHE_DIR", ".steam_cache"),
+            ttls=crawler.settings.getdict("STEAM_CACHE_TTL"),
+            stats=crawler.stats,
+        )
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
         return s
 
-    def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
+    def process_request(self, request: Request) -> Response | None:
+        key = self.__get_key(url=request.url)
+        if key is None:
+            return None
+
+        entry = self.__load(key=key)
+        if entry is None:
+            self.__stats.inc_value("steam_cache/miss")
+            return None
+
+        if time.time() - entry["stored_at"] < self.__ttls[get_url_class(url=request.url)]:
+            self.__stats.inc_value("steam_cache/hit")
+            return self.__form_response(entry=entry, request=request)
+
+        # Запись устарела: просим сервер ответить 304, если страница не менялась
+        if entry["etag"]:
+            request.headers[b"If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request.headers[b"If-Modified-Since"] = entry["last_modified"]
 
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
         return None
 
-    def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
+    def process_response(self, request: Request, response: Response) -> Response:
+        if "steam_cache" in response.flags:
+            return response  # Ответ и так взят из кэша
 
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
-        return response
+        key = self.__get_key(url=request.url)
+        if key is None:
+            return response
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
+        if response.status == 304:
+            entry = self.__load(key=key)
+            if entry is None:
+                return response
 
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
+            self.__stats.inc_value("steam_cache/revalidated")
+            entry["stored_at"] = time.time()
+            self.__store(key=key, entry=entry)
+            return self.__form_response(entry=entry, request=request)
+
+        if response.status == 200:
+            self.__stats.inc_value("steam_cache/store")
+            self.__store(key=key, entry={
+                "url": response.url,
+                "status": response.status,
+                "headers": dict(response.headers),
+                "body": response.body,
+                "stored_at": time.time(),
+                "etag": response.headers.get(b"ETag"),
+                "last_modified": response.headers.get(b"Last-Modified"),
+            })
+
+        return response
 
     def spider_opened(self, spider):
         spider.logger.info('Spider opened: %s' % spider.name)
+
+    def __get_key(self, url: str) -> str | None:
+        url_class = get_url_class(url=url)
+        if url_class is None or url_class not in self.__ttls:
+            return None  # Ссылки без заданного времени жизни не кэшируются
+
+        query = parse_qs(urlparse(url).query)
+        locale = "-".join(query.get("l", []) + query.get("cc", [])) or "default"
+
+        app_id = None
+        if url_class == "app":
+            app_id = get_app_id(url=url)
+        elif url_class == "api":
+            app_id = ",".join(query.get("appids", [])) or None
+
+        if app_id is None:
+            # Страницы поиска различаются всеми параметрами запроса
+            app_id = hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+        return f"{url_class}-{app_id}-{locale}"
+
+    def __load(self, key: str) -> Dict[str, Any] | None:
+        path = self.__directory / f"{key}.pickle.gz"
+        if not path.exists():
+            return None
+
+        try:
+            with gzip.open(path, mode="rb") as file:
+                entry = pickle.load(file)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError) as exception:
+            # Запись повреждена или не читается этой версией Python: удаляем ее и загружаем страницу заново
+            logger.warning("Dropping corrupt cache entry %s: %r", path, exception)
+            self.__stats.inc_value("steam_cache/corrupt")
+            path.unlink(missing_ok=True)
+            return None
+
+        return entry
+
+    def __store(self, key: str, entry: Dict[str, Any]) -> None:
+        self.__directory.mkdir(parents=True, exist_ok=True)
+
+        # Запись через временный файл, чтобы прерванный обход не оставил поврежденную запись
+        path = self.__directory / f"{key}.pickle.gz"
+        temporary_path = path.with_suffix(".tmp")
+        with gzip.open(temporary_path, mode="wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        temporary_path.replace(path)
+
+    def __form_response(self, entry: Dict[str, Any], request: Request) -> Response:
+        headers = Headers(entry["headers"])
+        response_class = responsetypes.from_args(headers=headers, url=entry["url"], body=entry["body"])
+        return response_class(
+            url=entry["url"],
+            status=entry["status"],
+            headers=headers,
+            body=entry["body"],
+            flags=["steam_cache"],
+            request=request,
+        )
+
+
+class EndpointRate(object):
+    # Текущие ограничения одного класса ссылок
+
+    __slots__ = ["concurrency", "delay", "min_delay", "latency", "successes", "backed_off_at"]
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency: int = concurrency
+        self.delay: float = 0.0
+        self.min_delay: float = 0.0        # Задержка, ниже которой сервер уже отвечал 429
+        self.latency: float | None = None  # Экспоненциальное скользящее среднее времени ответа, с
+        self.successes: int = 0            # Успешных ответов с последнего изменения ограничений
+        self.backed_off_at: float = 0.0
+
+
+class SteamRateLimitMiddleware:
+    # Адаптивное ограничение скорости по классам ссылок Steam (поиск, API, страница продукта). У каждого класса
+    # свой слот загрузчика: ответы 429 и 5xx вдвое снижают число одновременных запросов и удваивают задержку
+    # (с разбросом и не меньше Retry-After), а серия быстрых успешных ответов постепенно снимает ограничения.
+    # Сами повторы запросов остаются за RetryMiddleware, поэтому приоритет должен быть выше 550
+
+    __slots__ = ["__crawler", "__stats", "__rates", "__max_concurrency", "__max_delay", "__target_latency", "__ramp_up_after"]
+
+    def __init__(
+        self,
+        crawler,
+        start_concurrency: Dict[str, int],
+        max_concurrency: Dict[str, int],
+        max_delay: float,
+        target_latency: float,
+        ramp_up_after: int,
+    ) -> None:
+        self.__crawler = crawler
+        self.__stats: StatsCollector = crawler.stats
+        self.__rates: Dict[str, EndpointRate] = {
+            url_class: EndpointRate(concurrency=max(1, concurrency)) for url_class, concurrency in start_concurrency.items()
+        }
+        self.__max_concurrency: Dict[str, int] = max_concurrency
+        self.__max_delay: float = max_delay
+        self.__target_latency: float = target_latency
+        self.__ramp_up_after: int = max(1, ramp_up_after)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("STEAM_RATE_CONTROL_ENABLED"):
+            raise NotConfigured
+
+        return cls(
+            crawler=crawler,
+            start_concurrency=crawler.settings.getdict("STEAM_RATE_START_CONCURRENCY"),
+            max_concurrency=crawler.settings.getdict("STEAM_RATE_MAX_CONCURRENCY"),
+            max_delay=crawler.settings.getfloat("STEAM_RATE_MAX_DELAY", 60.0),
+            target_latency=crawler.settings.getfloat("STEAM_RATE_TARGET_LATENCY", 2.0),
+            ramp_up_after=crawler.settings.getint("STEAM_RATE_RAMP_UP_AFTER", 20),
+        )
+
+    def process_request(self, request: Request) -> None:
+        url_class = get_url_class(url=request.url)
+        if url_class not in self.__rates:
+            return None
+
+        # Слот загрузчик создает уже после process_request, а простаивавший - заново: ограничения попадают
+        # в настройки слотов загрузчика (DOWNLOAD_SLOTS), с которыми он создается
+        request.meta.setdefault("download_slot", self.__get_slot_key(url_class=url_class))
+        self.__apply(url_class=url_class)
+        return None
+
+    def process_response(self, request: Request, response: Response) -> Response:
+        if "steam_cache" in response.flags:
+            return response  # Ответ из кэша ничего не говорит о нагрузке на сервер
+
+        url_class = get_url_class(url=request.url)
+        if url_class not in self.__rates:
+            return response
+
+        if response.status == 429:
+            self.__stats.inc_value(f"steam_rate/{url_class}/throttled")
+            self.__back_off(url_class=url_class, retry_after=self.__get_retry_after(response=response))
+        elif response.status >= 500:
+            self.__stats.inc_value(f"steam_rate/{url_class}/server_error")
+            self.__back_off(url_class=url_class, retry_after=self.__get_retry_after(response=response))
+        else:
+            self.__speed_up(url_class=url_class, latency=request.meta.get("download_latency"))
+
+        return response
+
+    def process_exception(self, request: Request, exception: Exception) -> None:
+        url_class = get_url_class(url=request.url)
+        if url_class in self.__rates:
+            self.__stats.inc_value(f"steam_rate/{url_class}/exception")
+            self.__back_off(url_class=url_class, retry_after=None)
+
+        return None
+
+    def __back_off(self, url_class: str, retry_after: float | None) -> None:
+        rate = self.__rates[url_class]
+        rate.successes = 0
+
+        now = time.monotonic()
+        if now - rate.backed_off_at >= max(rate.delay, 1.0):
+            # Ответы на запросы, отправленные до предыдущего отступления, повторно ограничения не ужесточают
+            rate.backed_off_at = now
+            rate.min_delay = min(max(rate.delay * 1.25, rate.min_delay * 1.5, 0.05), self.__max_delay)
+            rate.concurrency = max(1, rate.concurrency // 2)
+            rate.delay = max(rate.delay, rate.min_delay) * 2 * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+            self.__stats.inc_value(f"steam_rate/{url_class}/backoff")
+
+        rate.delay = min(rate.delay, self.__max_delay)
+        logger.debug("Backing off %s: concurrency %d, delay %.2fs", url_class, rate.concurrency, rate.delay)
+
+        # Retry-After - разовая пауза: первый же успешный ответ вернет слоту задержку отступления
+        pause = None
+        if retry_after is not None:
+            self.__stats.inc_value(f"steam_rate/{url_class}/retry_after")
+            pause = min(max(rate.delay, retry_after), self.__max_delay)
+
+        self.__apply(url_class=url_class, delay=pause)
+
+    def __speed_up(self, url_class: str, latency: float | None) -> None:
+        rate = self.__rates[url_class]
+        if latency is not None:
+            rate.latency = latency if rate.latency is None else 0.8 * rate.latency + 0.2 * latency
+            self.__stats.set_value(f"steam_rate/{url_class}/latency", round(rate.latency, 3))
+
+        if rate.latency is not None and rate.latency > self.__target_latency:
+            return  # Сервер отвечает медленно: ограничения не снимаем
+
+        if rate.delay > rate.min_delay:
+            # Задержка убывает с каждым успешным ответом, число одновременных запросов - раз в серию ответов
+            rate.delay = max(rate.min_delay, rate.delay * DELAY_DECAY)
+            self.__apply(url_class=url_class)
+            return
+
+        if rate.min_delay > 0:
+            rate.min_delay = rate.min_delay * FLOOR_DECAY if rate.min_delay > 0.01 else 0.0
+            rate.delay = rate.min_delay
+            self.__apply(url_class=url_class)
+            return
+
+        rate.successes += 1
+        if rate.successes < self.__ramp_up_after:
+            return
+
+        rate.successes = 0
+        if rate.concurrency >= self.__max_concurrency.get(url_class, rate.concurrency):
+            return
+
+        rate.concurrency += 1
+
+        self.__stats.inc_value(f"steam_rate/{url_class}/ramp_up")
+        logger.debug("Speeding up %s: concurrency %d, delay %.2fs", url_class, rate.concurrency, rate.delay)
+        self.__apply(url_class=url_class)
+
+    def __apply(self, url_class: str, delay: float | None = None) -> None:
+        rate = self.__rates[url_class]
+        self.__stats.set_value(f"steam_rate/{url_class}/concurrency", rate.concurrency)
+        self.__stats.set_value(f"steam_rate/{url_class}/delay", round(rate.delay, 3))
+
+        downloader = self.__crawler.engine.downloader
+        slot_key = self.__get_slot_key(url_class=url_class)
+        slot_settings = downloader.per_slot_settings.setdefault(slot_key, dict())
+        slot_settings.update(concurrency=rate.concurrency, delay=rate.delay)
+
+        slot = downloader.slots.get(slot_key)
+        if slot is not None:
+            slot.concurrency = rate.concurrency
+            slot.delay = rate.delay if delay is None else delay
+
+    def __get_slot_key(self, url_class: str) -> str:
+        return f"steam-{url_class}"
+
+    def __get_retry_after(self, response: Response) -> float | None:
+        # Format: число секунд либо HTTP-дата
+        value = response.headers.get(b"Retry-After")
+        if not value:
+            return None
+
+        value = value.decode("latin-1").strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+
+class SteamGateMiddleware:
+    # Проверка возраста и региональные ограничения. Ко всем запросам добавляются cookies подтвержденного возраста
+    # и языка (CookiesMiddleware хранит их в общей сессии), поэтому страницы продуктов для взрослых отдаются сразу.
+    # Страница продукта, которая все же привела на проверку возраста, один раз запрашивается повторно с этими
+    # cookies; недоступная в регионе - с параметром cc=STEAM_REGION_FALLBACK_CC, если он задан.
+    # Приоритет должен быть ниже 600, чтобы видеть ответ после перенаправлений RedirectMiddleware
+
+    __slots__ = ["__cookies", "__region_cc", "__stats"]
+
+    def __init__(self, cookies: Dict[str, str], region_cc: str | None, stats: StatsCollector) -> None:
+        self.__cookies: Dict[str, str] = cookies
+        self.__region_cc: str | None = region_cc
+        self.__stats: StatsCollector = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("STEAM_GATE_ENABLED"):
+            raise NotConfigured
+
+        cookies = dict(crawler.settings.getdict("STEAM_AGE_GATE_COOKIES"))
+        cookies.update(crawler.settings.getdict("STEAM_LOCALE_COOKIES"))
+        return cls(cookies=cookies, region_cc=crawler.settings.get("STEAM_REGION_FALLBACK_CC"), stats=crawler.stats)
+
+    def process_request(self, request: Request) -> None:
+        if isinstance(request.cookies, dict):
+            for name, value in self.__cookies.items():
+                request.cookies.setdefault(name, value)
+
+        return None
+
+    def process_response(self, request: Request, response: Response) -> Request | Response:
+        if "steam_cache" in response.flags:
+            return response
+
+        redirect_urls = request.meta.get("redirect_urls", [])
+        product_url = redirect_urls[0] if redirect_urls else request.url
+        if get_url_class(url=product_url) != "app":
+            return response
+
+        is_retry = request.meta.get("steam_gate_retry", False)
+        if self.__is_age_gate(response=response):
+            self.__stats.inc_value("steam_gate/age_gate")
+            if is_retry:
+                return response  # Повтор не помог: страницу отбросит паук
+
+            return self.__form_retry(request=request, url=product_url)
+
+        if self.__is_region_locked(response=response, is_redirected=bool(redirect_urls)):
+            self.__stats.inc_value("steam_gate/region_locked")
+            if is_retry or self.__region_cc is None:
+                return response
+
+            return self.__form_retry(request=request, url=add_or_replace_parameter(product_url, "cc", self.__region_cc))
+
+        if is_retry:
+            self.__stats.inc_value("steam_gate/recovered")
+
+        return response
+
+    def __is_age_gate(self, response: Response) -> bool:
+        return urlparse(response.url).path.startswith("/agecheck") or b'id="app_agegate"' in response.body
+
+    def __is_region_locked(self, response: Response, is_redirected: bool) -> bool:
+        # Недоступный в регионе продукт перенаправляет на главную страницу магазина либо показывает ошибку
+        if is_redirected and urlparse(response.url).path in ("", "/"):
+            return True
+
+        return b"unavailable in your region" in response.body
+
+    def __form_retry(self, request: Request, url: str) -> Request:
+        meta = {key: value for key, value in request.meta.items() if not key.startswith("redirect_")}
+        meta["steam_gate_retry"] = True
+        return request.replace(url=url, meta=meta, cookies=dict(self.__cookies), dont_filter=True)
+
+
+class SteamStageStatsMiddleware:
+    # Время загрузки ответов по классам ссылок (steam_stages/download/<класс>) и время работы обработчиков паука
+    # (steam_stages/callback/<обработчик>, включая вложенные этапы разбора, которые замеряет сам паук).
+    # Приоритет должен быть выше 900, чтобы замер не включал прочие промежуточные обработчики
+
+    __slots__ = ["__stage_stats"]
+
+    def __init__(self, stage_stats: StageStats) -> None:
+        self.__stage_stats: StageStats = stage_stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("STEAM_STAGE_STATS_ENABLED"):
+            raise NotConfigured
+
+        return cls(stage_stats=StageStats(crawler=crawler))
+
+    def process_spider_input(self, response: Response) -> None:
+        latency = response.meta.get("download_latency")  # Ответы из кэша не загружались
+        if latency is not None:
+            self.__stage_stats.add_time(stage=f"download/{get_url_class(url=response.url) or 'other'}", seconds=latency)
+
+        return None
+
+    def process_spider_output(self, response: Response, result: Iterable) -> Generator:
+        # Учитывается только время внутри обработчика, но не обработка уже отданных им запросов и предметов
+        iterator = iter(result)
+        seconds = 0.0
+        try:
+            while True:
+                started_at = time.perf_counter()
+                try:
+                    entry = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - started_at
+
+                yield entry
+        finally:
+            self.__stage_stats.add_time(stage=self.__get_stage(response=response), seconds=seconds)
+
+    async def process_spider_output_async(self, response: Response, result: AsyncIterable) -> AsyncGenerator:
+        # То же для асинхронного вывода: обработчики паука синхронны, поэтому ожидание не включает сетевых задержек
+        iterator = result.__aiter__()
+        seconds = 0.0
+        try:
+            while True:
+                started_at = time.perf_counter()
+                try:
+                    entry = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - started_at
+
+                yield entry
+        finally:
+            self.__stage_stats.add_time(stage=self.__get_stage(response=response), seconds=seconds)
+
+    def __get_stage(self, response: Response) -> str:
+        callback = response.request.callback if response.request is not None else None
+        return f"callback/{getattr(callback, '__name__', 'parse')}"
+
+
+class SteamFrontierMiddleware:
+    # Распределенный обход (FRONTIER_ENABLED): задача фронтира выполнена, когда обработчик ее ответа отдал все
+    # запросы и предметы или завершился ошибкой. Если среди запросов есть запрос с тем же frontier_key
+    # (страница продукта после api/appdetails), задача завершится вместе с ним. Приоритет должен быть ниже,
+    # чем у встроенных промежуточных обработчиков: отброшенный ими запрос задачу не продолжает
+
+    __slots__ = ["__crawler"]
+
+    def __init__(self, crawler) -> None:
+        self.__crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("FRONTIER_ENABLED"):
+            raise NotConfigured
+
+        return cls(crawler=crawler)
+
+    def process_spider_output(self, response: Response, result: Iterable) -> Generator:
+        key = response.meta.get("frontier_key")
+        is_handed_over = False
+        for entry in result:
+            is_handed_over = is_handed_over or self.__is_handed_over(key=key, entry=entry)
+            yield entry
+
+        if not is_handed_over:
+            self.__complete(key=key)
+
+    async def process_spider_output_async(self, response: Response, result: AsyncIterable) -> AsyncGenerator:
+        key = response.meta.get("frontier_key")
+        is_handed_over = False
+        async for entry in result:
+            is_handed_over = is_handed_over or self.__is_handed_over(key=key, entry=entry)
+            yield entry
+
+        if not is_handed_over:
+            self.__complete(key=key)
+
+    def process_spider_exception(self, response: Response, exception: Exception) -> None:
+        self.__complete(key=response.meta.get("frontier_key"))
+        return None
+
+    def __is_handed_over(self, key: str | None, entry: Any) -> bool:
+        return key is not None and isinstance(entry, Request) and entry.meta.get("frontier_key") == key
+
+    def __complete(self, key: str | None) -> None:
+        if key is not None:
+            self.__crawler.spider.frontier.complete(key=key)
@@ -1,27 +1,253 @@
 from itemadapter import ItemAdapter
-from typing import IO
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.statscollectors import StatsCollector
+from typing import Any, Dict, List
 
+from steam_crawler.config import CrawlConfig
+from steam_crawler.conversions import to_typed_record
+from steam_crawler.database import GameDatabase
 from steam_crawler.items import Game
 from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+from steam_crawler.writers import JsonLinesWriter, merge_outputs
 
-import json
-import user_settings
+import glob
+import os
 
 
 class SteamCrawlerPipeline(object):
+    # В пакетном режиме (BATCH_QUERIES) предметы распределяются по выходным файлам запросов (поле output).
+    # В распределенном обходе (FRONTIER_ENABLED) каждый процесс пишет свою часть FILENAME.<процесс>.part,
+    # а последний процесс, завершившийся после выполнения всех задач, объединяет части в общий выходной файл
+    # и удаляет фронтир. Прерванный обход оставляет части и фронтир: повторный запуск продолжит его.
+    # В инкрементальном режиме (INCREMENTAL) снимок сводится по сигналу spider_closed, когда известна причина завершения
 
-    __slots__ = ["__file"]
+    __slots__ = ["__config", "__stats", "__writers", "__delta_writer", "__batch_size", "__part_suffix", "__weakref__"]  # __weakref__ нужен для подписки на сигналы
 
-    def __init__(self) -> None:
-        self.__file: IO = None
+    def __init__(self, stats: StatsCollector | None = None, batch_size: int = 100) -> None:
+        self.__config: CrawlConfig = None
+        self.__stats: StatsCollector | None = stats
+        self.__writers: Dict[str, JsonLinesWriter] = dict()
+        self.__delta_writer: JsonLinesWriter = None
+        self.__batch_size: int = batch_size
+        self.__part_suffix: str = ""
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls(stats=crawler.stats, batch_size=crawler.settings.getint("OUTPUT_BATCH_SIZE", 100))
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
 
     def open_spider(self, spider: SteamGameSpider) -> None:
-        self.__file = open(file=f"{user_settings.FILENAME}.json", mode="w")
+        self.__config = spider.config  # Формат выходного файла проверен при загрузке настроек
+        if spider.frontier is not None:
+            self.__part_suffix = f".{spider.frontier.worker}.part"
+
+        if spider.incremental_state is not None:
+            # Снимок целиком записывается по окончании обхода, по ходу пишется лишь разница
+            self.__delta_writer = self.__open_writer(filename=self.__config.FILENAME, suffix=".delta")
 
     def close_spider(self, spider: SteamGameSpider) -> None:
-        self.__file.close()
+        if spider.incremental_state is not None:
+            return  # См. spider_closed
+
+        for writer in self.__writers.values():
+            writer.close()
+
+        if spider.frontier is None:
+            return
+
+        # После unregister соединение с фронтиром закрыто, поэтому выполнение задач проверяется заранее
+        is_drained = spider.frontier.is_drained()
+        if spider.frontier.unregister() and is_drained:
+            self.__merge_parts()
+            spider.frontier.drop()
+
+    def spider_closed(self, spider: SteamGameSpider, reason: str) -> None:
+        if spider.incremental_state is None:
+            return
+
+        # Непросмотренные продукты считаются удаленными лишь после полного обхода без ошибок в обработчиках
+        # и без пропущенных страниц поиска: прерванный обход (Ctrl-C, CloseSpider) не трогает сохраненное состояние
+        # и снимок, а продукты с незагрузившимися страницами паук сохраняет сам (IncrementalState.keep). Несколько
+        # процессов распределенного обхода не сводят снимок: INCREMENTAL с FRONTIER_ENABLED паук не запускает
+        state = spider.incremental_state
+        has_exceptions = self.__stats is not None and self.__stats.get_value("spider_exceptions/count", 0)
+        if reason != "finished" or has_exceptions or not state.is_complete:
+            self.__delta_writer.close()
+            return
+
+        for game in state.remove_unseen():
+            self.__delta_writer.write({"status": "removed", "game": game})
+
+        self.__delta_writer.close()
+        state.save()
+
+        writer = self.__open_writer(filename=self.__config.FILENAME)
+        for game in state.get_games():
+            writer.write(game)
+
+        writer.close()
 
     def process_item(self, game: Game, spider: SteamGameSpider) -> Game:
-        line = json.dumps(ItemAdapter(game).asdict()) + "\n"
-        self.__file.write(line)
+        if spider.incremental_state is not None:
+            status = spider.incremental_state.update(game=game)
+            if status != "unchanged":
+                self.__delta_writer.write({"status": status, "game": ItemAdapter(game).asdict()})
+
+            return game
+
+        record = ItemAdapter(game).asdict()
+        filename = record.pop("output", None) or self.__config.FILENAME
+        if filename not in self.__writers:
+            self.__writers[filename] = self.__open_writer(filename=filename, suffix=self.__part_suffix)
+
+        self.__writers[filename].write(record)
         return game
+
+    def __open_writer(self, filename: str, suffix: str = "") -> JsonLinesWriter:
+        path = f"{filename}{suffix}.{self.__config.OUTPUT_FORMAT}"
+        return JsonLinesWriter(path=path, batch_size=self.__batch_size)
+
+    def __merge_parts(self) -> None:
+        # Части всех процессов, в том числе завершившихся раньше; продукт, который обработали два процесса
+        # (задача была отдана повторно), попадает в выходной файл один раз
+        parts = sorted(glob.glob(f"{glob.escape(self.__config.FILENAME)}.*.part.{self.__config.OUTPUT_FORMAT}"))
+        if not parts:
+            return  # Ни один процесс ничего не собрал: прежний выходной файл не затирается
+
+        merge_outputs(paths=parts, path=f"{self.__config.FILENAME}.{self.__config.OUTPUT_FORMAT}")
+        for part in parts:
+            os.remove(part)
+
+
+class SteamCrawlerParquetPipeline(object):
+    # Колоночная выгрузка в FILENAME.parquet с типизированной схемой: стоимость разделена на число и валюту,
+    # число обзоров - целое, дата выхода - дата. Предметы пишутся группами строк по мере поступления,
+    # в пакетном режиме - в отдельный файл для каждого запроса
+
+    __slots__ = ["__writers", "__columns", "__row_group_size"]
+
+    def __init__(self, row_group_size: int = 10_000) -> None:
+        self.__writers: Dict[str, Any] = dict()
+        self.__columns: Dict[str, Dict[str, List[Any]]] = dict()
+        self.__row_group_size: int = row_group_size
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("PARQUET_EXPORT_ENABLED"):
+            raise NotConfigured
+        if crawler.settings.getbool("FRONTIER_ENABLED"):
+            # Процессы распределенного обхода писали бы в один файл, а части этой выгрузки не объединяются
+            raise ValueError("PARQUET_EXPORT_ENABLED does not support FRONTIER_ENABLED")
+
+        return cls(row_group_size=crawler.settings.getint("PARQUET_ROW_GROUP_SIZE", 10_000))
+
+    @staticmethod
+    def get_schema():
+        import pyarrow
+
+        string_list = pyarrow.list_(pyarrow.string())
+        return pyarrow.schema([
+            ("app_id",        pyarrow.string()),
+            ("name",          pyarrow.string()),
+            ("price",         pyarrow.float64()),
+            ("currency",      pyarrow.string()),
+            ("category",      pyarrow.string()),
+            ("genres",        string_list),
+            ("tags",          string_list),
+            ("overall",       pyarrow.string()),
+            ("reviews_count", pyarrow.int64()),
+            ("release_date",  pyarrow.date32()),
+            ("developers",    string_list),
+            ("publishers",    string_list),
+            ("franchises",    string_list),
+            ("platforms",     string_list),
+            ("languages",     string_list),
+        ])
+
+    def close_spider(self, spider: SteamGameSpider) -> None:
+        for filename, writer in self.__writers.items():
+            self.__write_row_group(filename=filename)
+            writer.close()
+
+    def process_item(self, game: Game, spider: SteamGameSpider) -> Game:
+        record = ItemAdapter(game).asdict()
+        filename = record.get("output") or spider.config.FILENAME
+        if filename not in self.__writers:
+            self.__open_writer(filename=filename)
+
+        row = to_typed_record(game=record)
+        columns = self.__columns[filename]
+        for name, values in columns.items():
+            values.append(row[name])
+
+        if len(columns["name"]) >= self.__row_group_size:
+            self.__write_row_group(filename=filename)
+
+        return game
+
+    def __open_writer(self, filename: str) -> None:
+        import pyarrow.parquet
+
+        schema = self.get_schema()
+        self.__writers[filename] = pyarrow.parquet.ParquetWriter(f"{filename}.parquet", schema=schema)
+        self.__columns[filename] = {name: list() for name in schema.names}
+
+    def __write_row_group(self, filename: str) -> None:
+        columns = self.__columns[filename]
+        if not columns["name"]:
+            return
+
+        import pyarrow
+
+        self.__writers[filename].write_table(pyarrow.Table.from_pydict(columns, schema=self.get_schema()))
+        self.__columns[filename] = {name: list() for name in columns}
+
+
+class SteamCrawlerSQLitePipeline(object):
+    # Выгрузка в базу FILENAME.sqlite3 с нормализованными таблицами меток и индексами по измерениям фильтров.
+    # Предметы копятся пачками и обновляются по app_id в одной транзакции на пачку.
+    # В пакетном режиме у каждого запроса своя база
+
+    __slots__ = ["__databases", "__records", "__batch_size"]
+
+    def __init__(self, batch_size: int = 500) -> None:
+        self.__databases: Dict[str, GameDatabase] = dict()
+        self.__records: Dict[str, List[Dict[str, Any]]] = dict()
+        self.__batch_size: int = batch_size
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("SQLITE_EXPORT_ENABLED"):
+            raise NotConfigured
+        if crawler.settings.getbool("FRONTIER_ENABLED"):
+            # Процессы распределенного обхода писали бы в один файл, а части этой выгрузки не объединяются
+            raise ValueError("SQLITE_EXPORT_ENABLED does not support FRONTIER_ENABLED")
+
+        return cls(batch_size=crawler.settings.getint("SQLITE_BATCH_SIZE", 500))
+
+    def close_spider(self, spider: SteamGameSpider) -> None:
+        for filename, database in self.__databases.items():
+            self.__flush(filename=filename)
+            database.close()
+
+    def process_item(self, game: Game, spider: SteamGameSpider) -> Game:
+        record = ItemAdapter(game).asdict()
+        filename = record.get("output") or spider.config.FILENAME
+        if filename not in self.__databases:
+            self.__databases[filename] = GameDatabase(path=f"{filename}.sqlite3")
+            self.__records[filename] = list()
+
+        self.__records[filename].append(to_typed_record(game=record))
+        if len(self.__records[filename]) >= self.__batch_size:
+            self.__flush(filename=filename)
+
+        return game
+
+    def __flush(self, filename: str) -> None:
+        if not self.__records[filename]:
+            return
+
+        self.__databases[filename].upsert(records=self.__records[filename])
+        self.__records[filename] = list()
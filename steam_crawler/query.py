@@ -0,0 +1,160 @@
+"""
+Повторное применение фильтров user_settings.py (или файла настроек, см. steam_crawler.config)
+к уже сохраненным результатам без обхода Steam.
+
+Поддерживаются выгрузки SteamCrawlerPipeline (.jsonl, .jsonl.gz, .jsonl.zst),
+SteamCrawlerParquetPipeline (.parquet) и SteamCrawlerSQLitePipeline (.sqlite3).
+
+Запуск из основной директории проекта: python -m steam_crawler.query zombie.jsonl [-c crawl.toml] [-o result.jsonl]
+"""
+from argparse import ArgumentParser
+from datetime import date
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from steam_crawler.config import CrawlConfig, load_config
+from steam_crawler.conversions import LIST_FIELDS, to_typed_record
+from steam_crawler.database import LABEL_TABLES
+from steam_crawler.filters import MAX_PRICE, MIN_PRICE, SINCE_RELEASE_YEAR, TILL_RELEASE_YEAR
+from steam_crawler.writers import dumps, open_input
+
+import json
+import sqlite3
+import sys
+
+
+class GameIndex(object):
+    # Инвертированные индексы "метка -> номера записей" по каждому списковому полю:
+    # "Любой из" - объединение списков номеров, "Все из" - их пересечение
+
+    __slots__ = ["__records", "__prices", "__years", "__postings"]
+
+    def __init__(self, records: List[Dict[str, Any]]) -> None:
+        self.__records: List[Dict[str, Any]] = records
+        self.__prices: List[float] = [record["price"] for record in records]
+        self.__years: List[int | None] = [record["release_date"].year if record["release_date"] else None for record in records]
+
+        self.__postings: Dict[str, Dict[str, Set[int]]] = {field: dict() for field in LIST_FIELDS}
+        for number, record in enumerate(records):
+            for field in LIST_FIELDS:
+                for label in record[field]:
+                    self.__postings[field].setdefault(label, set()).add(number)
+
+    def select(
+        self,
+        price_range: Tuple[float | None, float | None] | None = None,
+        release_year_range: Tuple[int | None, int | None] | None = None,
+        labels: Dict[str, Tuple[List[str] | None, bool | None]] | None = None,
+    ) -> List[Dict[str, Any]]:
+        # labels: поле -> (требуемые метки, флаг "Все из"); семантика совпадает с фильтрами паука
+        numbers = set(range(len(self.__records)))
+
+        for field, (required, all_of) in (labels or dict()).items():
+            if not required:
+                continue
+
+            postings = [self.__postings[field].get(label, set()) for label in set(required)]
+            matched = set.intersection(*postings) if all_of else set.union(*postings)
+            numbers &= matched
+
+        if price_range is not None:
+            min_price = MIN_PRICE if price_range[0] is None else price_range[0]
+            max_price = MAX_PRICE if price_range[1] is None else price_range[1]
+            numbers = {number for number in numbers if min_price <= self.__prices[number] <= max_price}
+
+        if release_year_range is not None:
+            since_year = SINCE_RELEASE_YEAR if release_year_range[0] is None else release_year_range[0]
+            till_year = TILL_RELEASE_YEAR if release_year_range[1] is None else release_year_range[1]
+            numbers = {
+                number for number in numbers
+                if self.__years[number] is not None and since_year <= self.__years[number] <= till_year
+            }
+
+        return [self.__records[number] for number in sorted(numbers)]
+
+    def select_by_config(self, config: CrawlConfig) -> List[Dict[str, Any]]:
+        labels = dict()
+        for field, (turn_on, required, all_of) in {
+            "platforms":  (config.TURN_ON_OS_SETTINGS,         config.PLATFORMS,  config.ALL_OF_OS),
+            "developers": (config.TURN_ON_DEVELOPERS_SETTINGS, config.DEVELOPERS, config.ALL_OF_DEVELOPERS),
+            "tags":       (config.TURN_ON_TAGS_SETTINGS,       config.TAGS,       config.ALL_OF_TAGS),
+            "languages":  (config.TURN_ON_LANGUAGE_SETTINGS,   config.LANGUAGES,  config.ALL_OF_LANGUAGES),
+            "genres":     (config.TURN_ON_GENRE_SETTINGS,      config.GENRES,     config.ALL_OF_GENRES),
+            "publishers": (config.TURN_ON_PUBLISHER_SETTINGS,  config.PUBLISHERS, config.ALL_OF_PUBLISHERS),
+            "franchises": (config.TURN_ON_FRANCHISE_SETTINGS,  config.FRANCHISES, config.ALL_OF_FRANCHISES),
+        }.items():
+            if turn_on:
+                labels[field] = (required, all_of)
+
+        price_range = None
+        if config.TURN_ON_PRICE_SETTINGS:
+            price_range = (config.MIN_PRICE, config.MAX_PRICE)
+
+        release_year_range = None
+        if config.TURN_ON_RELEASE_SETTINGS:
+            release_year_range = (config.SINCE_RELEASE_YEAR, config.TILL_RELEASE_YEAR)
+
+        return self.select(price_range=price_range, release_year_range=release_year_range, labels=labels)
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    # Типизированные записи (см. to_typed_record) из любой поддерживаемой выгрузки
+    if path.endswith(".parquet"):
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(path).to_pylist()
+
+    if path.endswith(".sqlite3"):
+        return _load_sqlite_records(path=path)
+
+    return [to_typed_record(game=game) for game in _read_json_lines(path=path)]
+
+
+def _read_json_lines(path: str) -> Iterable[Dict[str, Any]]:
+    with open_input(path=path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _load_sqlite_records(path: str) -> List[Dict[str, Any]]:
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+
+    records = dict()
+    for row in connection.execute("SELECT * FROM games"):
+        record = {key: row[key] for key in row.keys() if key != "release_year"}
+        record["release_date"] = date.fromisoformat(row["release_date"]) if row["release_date"] else None
+        records[row["app_id"]] = record
+
+    for field in LIST_FIELDS:
+        labels, links, label_id = LABEL_TABLES[field]
+        for record in records.values():
+            record[field] = list()
+
+        query = f"SELECT {links}.app_id, {labels}.name FROM {links} JOIN {labels} ON {labels}.id = {links}.{label_id}"
+        for app_id, name in connection.execute(query):
+            records[app_id][field].append(name)
+
+    connection.close()
+    return list(records.values())
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Применяет фильтры настроек обхода к сохраненным результатам")
+    parser.add_argument("dataset", help="Выгрузка: .jsonl[.gz|.zst], .parquet или .sqlite3")
+    parser.add_argument("-c", "--config", default=None, help="Файл настроек .py/.toml/.json (по умолчанию - user_settings.py)")
+    parser.add_argument("-o", "--output", default=None, help="Файл JSON Lines для результата (по умолчанию - stdout)")
+    arguments = parser.parse_args()
+
+    games = GameIndex(records=load_records(path=arguments.dataset)).select_by_config(config=load_config(source=arguments.config))
+
+    output = open(file=arguments.output, mode="wb") if arguments.output else sys.stdout.buffer
+    for game in games:
+        release_date = game["release_date"]
+        output.write(dumps(dict(game, release_date=release_date.isoformat() if release_date else None)) + b"\n")
+
+    if arguments.output:
+        output.close()
+
+
+if __name__ == "__main__":
+    main()
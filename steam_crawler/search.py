@@ -0,0 +1,62 @@
+from typing import List, NamedTuple
+
+from bs4 import Tag
+
+import re
+
+
+REVIEWS_COUNT_REGEXPR = re.compile(r"of the ([\d,]+) user reviews")
+
+OS_TO_FULL_NAME = {
+    "win": "Windows",
+    "mac": "macOS",
+    "linux": "SteamOS + Linux",
+}
+
+
+class SearchCandidate(NamedTuple):
+    url:            str           # Ссылка на страницу продукта
+    price:          float | None  # Итоговая стоимость (None -> не указана в строке поиска)
+    release_date:   str | None    # Дата выхода в формате страницы продукта
+    platforms:      List[str]     # Платформы по значкам строки поиска
+    review_summary: str | None    # Краткая сводка обзоров, например "Very Positive"
+    reviews_count:  str | None    # Суммарное число обзоров в формате страницы продукта, например "1,234"
+
+
+def parse_search_row(block: Tag) -> SearchCandidate:
+    # Строка результатов поиска уже содержит стоимость, дату выхода, платформы и сводку обзоров
+    price = None
+    price_block = block.find(attrs={"data-price-final": True})
+    if price_block is not None and price_block["data-price-final"].isdigit():
+        price = int(price_block["data-price-final"]) / 100  # Стоимость указана в копейках (центах)
+
+    release_date = None
+    release_block = block.find(name="div", attrs={"class": "search_released"})
+    if release_block is not None and release_block.text.strip():
+        release_date = release_block.text.strip()
+
+    platforms = list()
+    for platform_block in block.find_all(name="span", attrs={"class": "platform_img"}):
+        for css_class in platform_block["class"]:
+            if css_class in OS_TO_FULL_NAME:
+                platforms.append(OS_TO_FULL_NAME[css_class])
+
+    review_summary, reviews_count = None, None
+    review_block = block.find(name="span", attrs={"class": "search_review_summary"})
+    if review_block is not None and review_block.get("data-tooltip-html"):
+        # Format: "Very Positive<br>92% of the 1,234 user reviews for this game are positive."
+        tooltip = review_block["data-tooltip-html"]
+        review_summary = tooltip.split("<br>")[0].strip()
+
+        match = REVIEWS_COUNT_REGEXPR.search(tooltip)
+        if match is not None:
+            reviews_count = match.group(1)
+
+    return SearchCandidate(
+        url=block["href"],
+        price=price,
+        release_date=release_date,
+        platforms=platforms,
+        review_summary=review_summary,
+        reviews_count=reviews_count,
+    )
@@ -20,7 +20,54 @@ NEWSPIDER_MODULE = 'steam_crawler.spiders'
 ROBOTSTXT_OBEY = True
 
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
-#CONCURRENT_REQUESTS = 32
+CONCURRENT_REQUESTS = 32
+
+# Base URL of the Steam store. Search and API requests are sent there; product
+# URLs come from the search results. Point it at a local stand-in server to
+# crawl offline (see benchmarks/crawl_benchmark.py)
+STEAM_STORE_URL = 'https://store.steampowered.com'
+
+# Number of search pages downloaded in parallel; every non-empty search page
+# schedules the page that is SEARCH_PAGES_IN_FLIGHT positions ahead of it
+SEARCH_PAGES_IN_FLIGHT = 4
+
+# Skip product pages whose search result row (price, release date, platform
+# icons) already fails the enabled filters from user_settings.py
+SEARCH_ROWS_PREFILTER = True
+
+# Narrow the Steam search itself with the enabled filters from user_settings.py
+# that it supports: tags (tags=), languages (supportedlang=), platforms (os=)
+# and the maximum price (maxprice=), translated with steam_crawler/vocabulary.py,
+# and restrict it to the SEARCH_CATEGORY product type (category1=). Product
+# pages are still checked against every filter. SINCE_PAGE and TILL_PAGE then
+# count the pages of the narrowed search.
+# SEARCH_CATEGORY is opt-in: None lists every product type, as the site does;
+# GAMES_CATEGORY from steam_crawler/vocabulary.py (998) lists games only, so
+# DLC, soundtracks and software are neither downloaded nor exported
+SEARCH_FILTERS_PUSHDOWN = True
+SEARCH_CATEGORY = None
+
+# BeautifulSoup backend used to parse every downloaded page exactly once:
+# "html.parser" (no extra dependencies) or "lxml" (faster, requires lxml)
+HTML_PARSER = 'html.parser'
+
+# Build the tree only for the page regions the spider reads: search result
+# rows on search pages; the description block, price meta tags, category,
+# tags, review summary, system requirements, language table and DLC or
+# soundtrack heading on product pages. The rest of the page is still scanned
+# by the parser, but no elements are created for it. Disable if Steam moves
+# one of these regions under a class the spider does not expect
+HTML_FRAGMENTS_ONLY = True
+
+# Parse product pages in a pool of EXTRACTION_POOL_PROCESSES worker processes
+# (None - one per CPU core) instead of the reactor thread. At most
+# EXTRACTION_POOL_MAX_PENDING pages (None - two per process) are in the pool at
+# once; further responses wait, which in turn slows down downloads. Stage
+# timings then show the whole pool round trip as extract_pool, and product
+# filters are applied in the workers without steam_filters counters
+EXTRACTION_POOL_ENABLED = False
+EXTRACTION_POOL_PROCESSES = None
+EXTRACTION_POOL_MAX_PENDING = None
 
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
@@ -44,28 +91,158 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    'steam_crawler.middlewares.SteamCrawlerSpiderMiddleware': 543,
-#}
+SPIDER_MIDDLEWARES = {
+    'steam_crawler.middlewares.SteamFrontierMiddleware': 50,
+    'steam_crawler.middlewares.SteamStageStatsMiddleware': 990,
+}
+
+# Distributed crawl: run the same crawl command in several processes, on one
+# or several machines, with FRONTIER_ENABLED. Search pages and product pages
+# then go through a shared frontier (FRONTIER_STORE; the SQLite store keeps it
+# in FRONTIER_PATH, FILENAME.frontier.sqlite3 by default, which every worker
+# must reach, e.g. on a shared volume) that never hands out the same page
+# twice. Every worker claims FRONTIER_CLAIM_SIZE tasks at a time and polls
+# every FRONTIER_POLL_INTERVAL seconds while other workers still run theirs;
+# new tasks and completed ones are written to the store in one transaction at
+# the same interval, off the reactor thread. A worker that stops cleanly
+# returns its unfinished tasks at once; the tasks of a crashed worker are
+# handed to another one FRONTIER_CLAIM_TIMEOUT seconds after it claimed them.
+# Workers write FILENAME.<worker>.part files (worker name: FRONTIER_WORKER,
+# host and pid by default); once every task is done, the last one to finish
+# merges them into FILENAME and removes the frontier. A worker that runs out
+# of tasks waits for the others, a crashed one included until it has been
+# silent for FRONTIER_CLAIM_TIMEOUT seconds. An interrupted crawl keeps the
+# parts and the frontier, so running it again resumes it. Single-query
+# crawls with the pages search backend only, without the Parquet and SQLite
+# exports
+FRONTIER_ENABLED = False
+FRONTIER_STORE = 'steam_crawler.frontier.SqliteFrontierStore'
+FRONTIER_PATH = None
+FRONTIER_WORKER = None
+FRONTIER_CLAIM_SIZE = 16
+FRONTIER_POLL_INTERVAL = 1.0
+FRONTIER_CLAIM_TIMEOUT = 600
+
+# Per-stage timings: download latency by URL class, spider callbacks, page
+# parsing into a soup, description parsing, every field extractor and every
+# enabled filter add up in steam_stages/<stage>/seconds and /calls stats;
+# search row and product filters count their outcomes in
+# steam_filters/<source>/<field>/checked and /rejected. The overhead is below
+# a microsecond per measured stage; the values reach the crawl stats on every
+# export of SteamStatsExporter and when the crawl ends
+STEAM_STAGE_STATS_ENABLED = True
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    'steam_crawler.middlewares.SteamCrawlerDownloaderMiddleware': 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    'steam_crawler.middlewares.SteamCrawlerDownloaderMiddleware': 543,
+    'steam_crawler.middlewares.SteamRateLimitMiddleware': 560,
+    'steam_crawler.middlewares.SteamGateMiddleware': 580,
+}
+
+# Persistent on-disk cache of Steam responses (SteamCrawlerDownloaderMiddleware).
+# Entries are gzip-compressed, keyed by URL class + app id + locale, served
+# without a request while younger than the TTL of their URL class (seconds)
+# and revalidated with ETag / Last-Modified afterwards
+STEAM_CACHE_ENABLED = False
+STEAM_CACHE_DIR = '.steam_cache'
+STEAM_CACHE_TTL = {
+    'search': 60 * 60,          # Search pages change with every sale
+    'api': 24 * 60 * 60,
+    'app': 7 * 24 * 60 * 60,    # Store pages of old games barely change
+}
+
+# Adaptive rate control (SteamRateLimitMiddleware): search pages, api/appdetails
+# and product pages get separate download slots. A 429 or 5xx response halves
+# the concurrency of its slot and doubles its delay (with jitter, never below
+# Retry-After, at most STEAM_RATE_MAX_DELAY seconds). While the mean latency
+# stays below STEAM_RATE_TARGET_LATENCY seconds, every successful response
+# shrinks the delay by 10% until it reaches zero, and then every
+# STEAM_RATE_RAMP_UP_AFTER successful responses add one concurrent request up
+# to STEAM_RATE_MAX_CONCURRENCY. Current limits are exposed as
+# steam_rate/<class>/* stats
+STEAM_RATE_CONTROL_ENABLED = True
+STEAM_RATE_START_CONCURRENCY = {
+    'search': 4,
+    'api': 2,       # api/appdetails is limited far more strictly than the store pages
+    'app': 8,
+}
+STEAM_RATE_MAX_CONCURRENCY = {
+    'search': 8,
+    'api': 4,
+    'app': 16,
+}
+STEAM_RATE_MAX_DELAY = 60
+STEAM_RATE_TARGET_LATENCY = 2.0
+STEAM_RATE_RAMP_UP_AFTER = 20
+
+# Throttled requests are retried by RetryMiddleware after the slot delay grows
+RETRY_TIMES = 5
+
+# Age gate and region handling (SteamGateMiddleware): every request carries the
+# age confirmation and locale cookies, so mature titles are served without the
+# agecheck redirect. A product page that still ends up on the age gate is
+# requested once more with these cookies; a region-locked one is retried once
+# with ?cc=STEAM_REGION_FALLBACK_CC when it is set (prices are then in the
+# currency of that country). Outcomes are counted in steam_gate/* stats
+STEAM_GATE_ENABLED = True
+STEAM_AGE_GATE_COOKIES = {
+    'birthtime': '283996800',           # 1 January 1979, UTC
+    'lastagecheckage': '1-January-1979',
+    'mature_content': '1',
+    'wants_mature_content': '1',
+}
+STEAM_LOCALE_COOKIES = {
+    'Steam_Language': 'english',        # Product page parsing relies on English labels
+}
+STEAM_REGION_FALLBACK_CC = None
+
+# Store country (?cc=) of every search, product and api/appdetails request, so
+# that prices and the price filter use one currency. When it is not set, the
+# store picks the country by IP and the price of api/appdetails, which may
+# answer in another currency, is ignored: it is taken from the product page
+STEAM_COUNTRY_CC = None
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    'scrapy.extensions.telnet.TelnetConsole': None,
-#}
+EXTENSIONS = {
+    'steam_crawler.extensions.SteamStatsExporter': 500,
+}
+
+# Export of the crawl stats every STEAM_STATS_EXPORT_INTERVAL seconds and when
+# the crawl ends (SteamStatsExporter): a single JSON line in the log and/or a
+# file in the Prometheus text format, e.g. for the textfile collector of
+# node_exporter. Disabled unless one of them is turned on
+STEAM_STATS_EXPORT_INTERVAL = 60
+STEAM_STATS_JSON_LOG = False
+STEAM_STATS_PROMETHEUS_FILE = None
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
    'steam_crawler.pipelines.SteamCrawlerPipeline': 300,
+   'steam_crawler.pipelines.SteamCrawlerParquetPipeline': 400,
+   'steam_crawler.pipelines.SteamCrawlerSQLitePipeline': 500,
 }
 
+# Columnar export of the scraped items to FILENAME.parquet with a typed schema
+# (requires pyarrow). Items are written in row groups of PARQUET_ROW_GROUP_SIZE
+# as they arrive; in incremental mode only the items scraped in this run are exported
+PARQUET_EXPORT_ENABLED = False
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+# Storage of the scraped items in the FILENAME.sqlite3 database: one row per
+# app in `games`, normalized label tables for genres, tags, developers,
+# publishers, franchises, platforms and languages, and indexes on every filter
+# dimension from user_settings.py. Items are upserted by app id in
+# transactions of SQLITE_BATCH_SIZE items
+SQLITE_EXPORT_ENABLED = False
+SQLITE_BATCH_SIZE = 500
+
+# Number of items serialized and flushed together by the background writer
+# thread of SteamCrawlerPipeline (see steam_crawler/writers.py)
+OUTPUT_BATCH_SIZE = 100
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
@@ -87,6 +264,19 @@ ITEM_PIPELINES = {
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 
+# Product requests are fingerprinted by their canonical URL (product type and
+# id without the slug and the snr tracking parameter), so an app listed on
+# several search pages or by several batch queries is downloaded only once
+REQUEST_FINGERPRINTER_CLASS = 'steam_crawler.fingerprints.SteamRequestFingerprinter'
+
+# Resumable crawls: with a job directory the pending requests, the fingerprints
+# of downloaded requests and the spider state (completed search pages, batch
+# routing) survive a graceful stop (a single Ctrl-C) and the crawl continues
+# where it stopped when started again with the same JOBDIR, e.g.
+# scrapy crawl SteamGameSpider -s JOBDIR=crawls/zombie-1
+# Not supported together with INCREMENTAL
+#JOBDIR = 'crawls/steam-1'
+
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = '2.7'
 TWISTED_REACTOR = 'twisted.internet.asyncioreactor.AsyncioSelectorReactor'
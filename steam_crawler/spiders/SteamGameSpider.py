@@ -1,28 +1,74 @@
-from typing import Generator, List
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, List, Set, Tuple
+from urllib.parse import urlencode, urlparse
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from scrapy import Spider, Request
+from scrapy.exceptions import CloseSpider
 from scrapy.http import Response
-
+from scrapy.utils.misc import load_object
+from scrapy.utils.request import request_from_dict
+from twisted.python.failure import Failure
+from w3lib.url import add_or_replace_parameter
+
+from steam_crawler.appdetails import (
+    APPDETAILS_URL,
+    canonicalize_product_url,
+    get_app_id,
+    get_product_key,
+    is_required_app_type,
+    parse_appdetails,
+)
+from steam_crawler.config import CrawlConfig, load_config
+from steam_crawler.description import GameDescription
+from steam_crawler.extraction import (
+    EXTRACTORS,
+    PRODUCT_FRAGMENTS,
+    SEARCH_ROW_FRAGMENTS,
+    ExtractionPool,
+    Extractor,
+    extract_fields,
+    get_game_description,
+    make_soup,
+)
+from steam_crawler.filters import (
+    form_candidate_filters_plan,
+    form_filters_plan,
+    form_search_parameters,
+    is_past_search_order_bound,
+    is_required_game,
+)
+from steam_crawler.frontier import FrontierStore, FrontierTask
+from steam_crawler.incremental import IncrementalState
+from steam_crawler.instrumentation import StageStats
 from steam_crawler.items import Game
+from steam_crawler.search import SearchCandidate, parse_search_row
 
+import asyncio
+import json
 import re
-import requests
-import user_settings
-
+import time
 
-DESCRIPTION_WITH_FRANCHISE_REGEXPR = r"(Title:)(.*)(Genre:)(.+)(Developer:)(.+)(Publisher:)(.+)(Franchise:)(.+)(Release Date:)(.+)"
-DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR = r"(Title: )(.*)(Genre:)(.+)(Developer:)(.+)(Publisher:)(.+)(Release Date:)(.+)"
-
-RELEASE_DATE_WITH_DAY_REGEXPR = r"^(\d+) ([a-zA-Z]+)(, )(\d+)"
-RELEASE_DATE_WITHOUT_DAY_REGEXPR = r"^([a-zA-Z]+)( )(\d+)"
 
 URL_SETTINGS = [
     "ndl=1",                 # Отключаем английский как обязательный поддерживаемый язык
     "ignore_preferences=1",  # Отключаем поиск по рекомендациям, который может отсеивать какие-то продукты
 ]
 
-SEARCH_URL = "https://store.steampowered.com/search/?" + "&".join(URL_SETTINGS)
+STORE_URL = "https://store.steampowered.com"
+
+SEARCH_URL = STORE_URL + "/search/?" + "&".join(URL_SETTINGS)
+
+# JSON-выдача бесконечной прокрутки: те же строки результатов, но произвольными порциями через start/count
+SEARCH_RESULTS_URL = STORE_URL + "/search/results/?" + "&".join(URL_SETTINGS + ["infinite=1"])
+
+SEARCH_PAGE_SIZE = 25       # Число результатов на одной странице поиска
+MAX_SEARCH_BATCH_SIZE = 100  # Больше результатов за один запрос Steam не отдает
+
+# Значения sort_by= для SEARCH_ORDER
+SEARCH_ORDER_PARAMETERS = {
+    "release": "Released_DESC",  # Сначала новые
+    "price":   "Price_ASC",      # Сначала дешевые
+}
 
 TRANSFORMATIONS = {
             r"+": r"%2B",
@@ -55,410 +101,660 @@ class SteamGameSpider(Spider):
     allowed_domains: List[str] = ["store.steampowered.com"]
 
     # Public:
-    def start_requests(self) -> Generator:
-        since_page = user_settings.SINCE_PAGE
-        if not user_settings.TURN_ON_PAGE_SETTINGS or since_page is None:
-            since_page = 1
+    def __init__(self, config: CrawlConfig | str | None = None, *args, **kwargs) -> None:
+        # config: CrawlConfig или источник для load_config (None -> user_settings.py); аргументы паука с именами
+        # настроек (-a QUERY=... -a TAGS=Zombies,Horror) переопределяют его значения
+        overrides = {name: kwargs.pop(name) for name in list(kwargs) if name in CrawlConfig._fields}
+        super().__init__(*args, **kwargs)
+
+        self.config: CrawlConfig = load_config(source=config, overrides=overrides)
+
+        # Извлечение полей; замеры этапов (STEAM_STAGE_STATS_ENABLED) заменяют их обертками
+        self.__extractors: Dict[str, Extractor] = dict(EXTRACTORS)
+
+        # Запросы обхода: единственный либо список BATCH_QUERIES в пакетном режиме
+        self.__is_batch: bool = bool(self.config.BATCH_QUERIES)
+        self.__queries: List[CrawlConfig] = list(self.config.BATCH_QUERIES or [self.config])
+
+        # В пакетном режиме продукт может подойти любому из запросов: фильтры применяются при распределении
+        self.__filters_plan: List[Tuple[str, Callable[[Any], bool]]] = list()
+        if not self.__is_batch:
+            self.__filters_plan = form_filters_plan(settings=self.config)
+
+        # Фильтры, которые проверяет сам поиск Steam (SEARCH_FILTERS_PUSHDOWN), и фильтры строк поиска; у каждого запроса свои
+        self.__search_parameters: List[List[Tuple[str, str]]] = [form_search_parameters(settings=settings) for settings in self.__queries]
+        self.__candidate_filters_plans: List[List[Tuple[str, Callable[[SearchCandidate], bool]]]] = [
+            form_candidate_filters_plan(settings=settings) for settings in self.__queries
+        ]
 
-        till_page = user_settings.TILL_PAGE
-        if not user_settings.TURN_ON_PAGE_SETTINGS or till_page is None:
-            till_page = 10_000
+        # Замеры этапов (STEAM_STAGE_STATS_ENABLED) и пул процессов разбора (EXTRACTION_POOL_ENABLED) подключаются в from_crawler
+        self.__stage_stats: StageStats | None = None
+        self.__extraction_pool: ExtractionPool | None = None
 
-        anchor = self.__form_query_anchor(user_settings.QUERY)
-        query_url = "&".join([SEARCH_URL,  anchor]) if anchor else SEARCH_URL
+        # Общий фронтир распределенного обхода (FRONTIER_ENABLED): подключается в from_crawler, нужен и SteamCrawlerPipeline
+        self.frontier: FrontierStore | None = None
 
-        for page_number in range(since_page, till_page + 1):
-            
-            url = "&".join([query_url, self.__form_page_anchor(page=page_number)])
-            request = requests.get(url)
-            if request.status_code != 200:
-                continue
+        # Состояние прошлых запусков: общее для паука и SteamCrawlerPipeline
+        self.incremental_state: IncrementalState | None = None
+        if self.config.INCREMENTAL:
+            self.incremental_state = IncrementalState(path=f"{self.config.FILENAME}.state.json")
 
-            page = request.content.decode(encoding="utf-8")
-            if self.__is_empty_query_search_page(page=page):
-                return
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
 
-            for product_url in self.__get_products_urls_from_query_search_page(page=page):
-                yield Request(url=product_url)
+        # Обход локального сервера-заменителя (STEAM_STORE_URL, см. benchmarks) не должен отсеиваться OffsiteMiddleware
+        store_host = urlparse(crawler.settings.get("STEAM_STORE_URL", STORE_URL)).hostname
+        if store_host not in spider.allowed_domains:
+            spider.allowed_domains = spider.allowed_domains + [store_host]
+        if spider.config.INCREMENTAL and crawler.settings.get("JOBDIR"):
+            # Приостановленный обход счел бы непросмотренные продукты удаленными
+            raise ValueError("INCREMENTAL mode does not support JOBDIR")
 
-    def parse(self, response: Response) -> Generator:
-        page = response.text
-        if not self.__is_product_page(page=page):
-            return
+        if crawler.settings.getbool("STEAM_STAGE_STATS_ENABLED"):
+            spider.__measure_stages(stage_stats=StageStats(crawler=crawler))
 
-        if not self.__is_released_product(page=page):
-            return
+        if crawler.settings.getbool("EXTRACTION_POOL_ENABLED"):
+            spider.__extraction_pool = ExtractionPool.from_crawler(crawler)
 
-        if self.__is_dlc_page(page=page):
-            return
+        if crawler.settings.getbool("FRONTIER_ENABLED"):
+            config = spider.config
+            if config.BATCH_QUERIES or config.INCREMENTAL or config.MAX_ITEMS is not None or config.SEARCH_BACKEND != "pages":
+                # Состояние этих режимов хранится в каждом процессе отдельно
+                raise ValueError("FRONTIER_ENABLED supports neither BATCH_QUERIES, INCREMENTAL, MAX_ITEMS nor the infinite search backend")
 
-        if self.__is_soundtrack_page(page=page):
-            return
+            store_class = load_object(crawler.settings.get("FRONTIER_STORE"))
+            spider.frontier = store_class.from_crawler(crawler, filename=config.FILENAME)
 
-        soup = BeautifulSoup(page, "html.parser")
-        game = Game()
-
-        name = self.__get_name(soup=soup)
-        category = self.__get_category(soup=soup)
-        overall = self.__get_overall(soup=soup)
-        reviews_count = self.__get_reviews_count(soup=soup)
+        return spider
 
-        price = self.__get_price(soup=soup)
-        if user_settings.TURN_ON_PRICE_SETTINGS and not self.__is_required_price(price):
-            return
+    async def start(self) -> AsyncGenerator:
+        # Scrapy 2.13+ начинает обход с start(); start_requests() оставлен для прежних версий
+        for request in self.start_requests():
+            yield request
 
-        genres = self.__get_genres(soup=soup)
-        if user_settings.TURN_ON_GENRE_SETTINGS and not self.__has_required_genres(genres):
+        if self.frontier is None:
             return
 
-        tags = self.__get_tags(soup=soup)
-        if user_settings.TURN_ON_TAGS_SETTINGS and not self.__has_required_tags(tags):
-            return
-        
-        release_date = self.__get_release_date(soup=soup)
-        if user_settings.TURN_ON_RELEASE_SETTINGS and not self.__is_required_release_year(release_date):
-            return
+        # Распределенный обход: первые страницы поиска уже во фронтире, дальше запросы забираются из него,
+        # пока все процессы не выполнят все задачи. Scrapy забирает отсюда запросы, лишь пока у загрузчика есть
+        # свободные места, поэтому процесс не берет больше задач, чем успевает обработать. Фронтир ждет блокировок
+        # хранилища в потоке пула, а не в потоке реактора; новые задачи и отметки о выполнении, которые обработчики
+        # лишь запоминают, он записывает и между выдачами задач - раз в FRONTIER_POLL_INTERVAL
+        claim_size = self.settings.getint("FRONTIER_CLAIM_SIZE", 16)
+        poll_interval = self.settings.getfloat("FRONTIER_POLL_INTERVAL", 1.0)
+        flusher = asyncio.ensure_future(self.__flush_frontier(poll_interval=poll_interval))
+        try:
+            while True:
+                tasks = await asyncio.to_thread(self.frontier.claim, limit=claim_size)
+                for task in tasks:
+                    yield request_from_dict(task.request, spider=self)
+
+                if tasks:
+                    continue
+
+                # Выполнивший все задачи процесс ждет остальных, в том числе остановившегося посреди обхода, пока тот
+                # не будет считаться остановившимся: последний процесс объединит части выходного файла
+                if await asyncio.to_thread(self.frontier.is_drained) and await asyncio.to_thread(self.frontier.finish):
+                    return
+
+                await asyncio.sleep(poll_interval)  # Задачи еще выполняют другие процессы
+        finally:
+            flusher.cancel()
 
-        developers = self.__get_developers(soup=soup)
-        if user_settings.DEVELOPERS and not self.__has_required_developers(developers):
+    def start_requests(self) -> Generator:
+        for query in range(len(self.__queries)):
+            yield from self.__form_first_search_requests(query=query)
+
+    def parse_search_page(self, response: Response) -> Generator:
+        query, page = response.meta["query"], response.meta["page"]
+        offset = (page - 1) * SEARCH_PAGE_SIZE
+        if offset >= self.__get_search_end(query=query):
+            return  # Страница загружалась, пока поиск запроса останавливался
+
+        soup = self.__make_soup(page=response.text, fragments=SEARCH_ROW_FRAGMENTS)
+        if self.__is_empty_query_search_page(soup=soup):
+            return  # Дальше страниц с результатами нет
+
+        candidates = self.__get_candidates_from_query_search_page(soup=soup)
+        yield from self.__form_product_requests(query=query, candidates=candidates, offset=offset)
+        self.__get_job_state()["search_pages"].setdefault(query, set()).add(page)
+
+        next_request = self.__form_next_search_page_request(query=query, page=page)
+        if next_request is not None:
+            yield from self.__schedule(request=next_request)
+
+    def parse_search_page_error(self, failure: Failure) -> Generator:
+        # Страница не загрузилась (аналог status_code != 200): пропускаем ее, но не обрываем пагинацию
+        meta = failure.request.meta
+        self.__mark_search_incomplete()
+        next_request = self.__form_next_search_page_request(query=meta["query"], page=meta["page"])
+        if next_request is not None:
+            yield from self.__schedule(request=next_request)
+
+        self.__complete_frontier_task(meta=meta)
+
+    def parse_search_results(self, response: Response) -> Generator:
+        query, start = response.meta["query"], response.meta["start"]
+        if start >= self.__get_search_end(query=query):
+            return  # Порция загружалась, пока поиск запроса останавливался
+
+        results = self.__load_search_results(response=response)
+        if results is None:
+            # Неразборчивый ответ пропускаем, как и незагрузившуюся порцию
+            yield from self.__skip_search_results(meta=response.meta)
             return
 
-        publishers = self.__get_publishers(soup=soup)
-        if user_settings.TURN_ON_PUBLISHER_SETTINGS and not self.__has_required_publishers(publishers):
-            return
+        soup = self.__make_soup(page=results.get("results_html", ""), fragments=SEARCH_ROW_FRAGMENTS)
+        if self.__is_empty_query_search_page(soup=soup):
+            return  # Дальше результатов нет
 
-        franchises = self.__get_franchises(soup=soup)
-        if user_settings.TURN_ON_FRANCHISE_SETTINGS and not self.__has_required_franchises(franchises):
-            return
+        candidates = self.__get_candidates_from_query_search_page(soup=soup)
+        yield from self.__form_product_requests(query=query, candidates=candidates, offset=start)
 
-        platforms = self.__get_platforms(soup=soup)
-        if user_settings.TURN_ON_OS_SETTINGS and not self.__has_required_platforms(platforms):
+        if not response.meta["is_first"]:
+            next_request = self.__form_next_search_results_request(query=query, start=start, till_start=response.meta["till_start"])
+            if next_request is not None:
+                yield next_request
             return
 
-        languages = self.__get_languages(soup=soup)
-        if user_settings.TURN_ON_LANGUAGE_SETTINGS and not self.__has_required_languages(languages):
-            return
+        batch_size = self.__get_search_batch_size()
+        till_start = min(int(results.get("total_count", 0)), self.__get_search_end(query=query))
 
-        game["name"] = name
-        game["price"] = price
-        game["category"] = category
-        game["genres"] = genres
-        game["tags"] = tags
-        game["overall"] = overall
-        game["reviews_count"] = reviews_count
-        game["release_date"] = release_date
-        game["developers"] = developers
-        game["publishers"] = publishers
-        game["franchises"] = franchises
-        game["platforms"] = platforms
-        game["languages"] = languages
-
-        yield game
+        requested_till_start = till_start
+        if self.__is_stoppable_search(query=query):
+            # Остановка поиска зависит от уже полученных результатов: одновременно запрашивается лишь
+            # SEARCH_PAGES_IN_FLIGHT порций, и каждая полученная порция запрашивает следующую за ними
+            requested_till_start = min(till_start, start + (self.__get_pages_in_flight() + 1) * batch_size)
 
-    # Private:
-    def __get_name(self, soup: BeautifulSoup) -> str:
-        description = self.__get_game_description(soup=soup)
-        belongs_to_franchise = self.__belongs_to_franchise(game_description=description)
-        
-        regexpr = DESCRIPTION_WITH_FRANCHISE_REGEXPR if belongs_to_franchise else DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR
-        return re.sub(regexpr, r"\2", description).strip()
+        for next_start in range(start + batch_size, requested_till_start, batch_size):
+            yield self.__form_search_results_request(query=query, start=next_start, is_first=False, till_start=till_start)
 
-    def __get_price(self, soup: BeautifulSoup) -> str:
-        price = soup.find(name="meta", attrs={"itemprop": "price"})["content"].strip()
-        currency = soup.find(name="meta", attrs={"itemprop": "priceCurrency"})["content"].strip()
+    def parse_search_results_error(self, failure: Failure) -> Generator:
+        yield from self.__skip_search_results(meta=failure.request.meta)
 
-        return f"{price} {currency}"
-
-    def __get_category(self, soup: BeautifulSoup) -> str:
-        category_blocks = soup.find(name="div", attrs={"class": "blockbg"}).find_all(name="a")
-        labels = list()
-
-        for index in range(1, len(category_blocks) - 1):
-            category = category_blocks[index]
-
-            label = category.text.strip()
-            labels.append(label)
-
-        return " > ".join(labels)
-
-    def __get_genres(self, soup: BeautifulSoup) -> List[str]:
-        description = self.__get_game_description(soup=soup)
-        belongs_to_franchise = self.__belongs_to_franchise(game_description=description)
-
-        regexpr = DESCRIPTION_WITH_FRANCHISE_REGEXPR if belongs_to_franchise else DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR
-        genres_str = re.sub(regexpr, r"\4", description).strip()
-
-        genres = list(map(lambda genre: genre.strip(), genres_str.split(",")))
-        return genres
-
-    def __get_tags(self, soup: BeautifulSoup) -> List[str]:
-        tags = list()
-        for block in soup.find_all(name="a", attrs={"class": "app_tag"}):
-
-            tag = block.text.strip()
-            tags.append(tag)
-
-        return tags
-
-    def __has_reviews(self, soup: BeautifulSoup) -> bool:
-        block = soup.find(name="div", attrs={"class": "noReviewsYetTitle"})
-        if block is None:
-            return True
-
-        text = block.string.strip()
-        if text == "There are no reviews for this product":
-            return False
+    def parse(self, response: Response) -> Generator:
+        soup = self.__make_soup(page=response.text, fragments=PRODUCT_FRAGMENTS)  # Единственный разбор страницы на весь parse
+        fields = extract_fields(
+            soup=soup,
+            filters_plan=self.__filters_plan,
+            extractors=self.__extractors,
+            get_description=self.__get_game_description,
+            api_fields=response.meta.get("api_fields"),
+        )
+        if fields is None:
+            return
 
-        block = soup.find(name="span", attrs={"class": "game_review_summary no_reviews"})
-        if block is None:
-            return True
+        yield from self.__form_game(response=response, fields=fields)
+
+    async def parse_in_pool(self, response: Response) -> AsyncGenerator:
+        # То же, что parse, но страница разбирается в пуле процессов (EXTRACTION_POOL_ENABLED) вместе с фильтрами
+        started_at = time.perf_counter()
+        fields = await self.__extraction_pool.extract(
+            page=response.text,
+            parser=self.settings.get("HTML_PARSER", "html.parser"),
+            settings=None if self.__is_batch else self.config,
+            api_fields=response.meta.get("api_fields"),
+            is_fragments_only=self.settings.getbool("HTML_FRAGMENTS_ONLY", True),
+        )
+        if self.__stage_stats is not None:
+            self.__stage_stats.add_time(stage="extract_pool", seconds=time.perf_counter() - started_at)
+
+        if fields is None:
+            return
 
-        text = block.string.strip()
-        return text.lower() != "no user reviews"
+        for item in self.__form_game(response=response, fields=fields):
+            yield item
 
-    def __get_overall(self, soup: BeautifulSoup) -> str:
-        if not self.__has_reviews(soup=soup):
-            return "No User Reviews"
+    def parse_appdetails(self, response: Response) -> Generator:
+        data = self.__load_appdetails(response=response)
+        if data is None:
+            # API не знает продукт: разбираем страницу целиком
+            yield self.__form_product_request(url=response.meta["product_url"], meta=self.__get_product_meta(meta=response.meta))
+            return
 
-        return soup.find(name="span", attrs={"itemprop": "description"}).string.strip()
+        if not is_required_app_type(data=data):
+            return
 
-    def __get_reviews_count(self, soup: BeautifulSoup) -> str:
-        if not self.__has_reviews(soup=soup):
-            return "0"
+        fields = parse_appdetails(data=data)
+        if not self.settings.get("STEAM_COUNTRY_CC"):
+            fields.pop("price", None)  # Без cc валюта API может не совпасть с валютой страницы продукта
 
-        count = soup.find(name="label", attrs={"for": "review_type_all"}).span.text
-        return re.sub(r"(\()(.*)(\))", r"\2", count)  # Format before re: "(count)"
+        for field, is_required in self.__filters_plan:
+            if field in fields and not is_required(fields[field]):
+                return
 
-    def __get_release_date(self, soup: BeautifulSoup) -> str:
-        description = self.__get_game_description(soup=soup)
-        belongs_to_franchise = self.__belongs_to_franchise(game_description=description)
+        # Тэги, категория, оценка, число обзоров и франшизы есть только на странице продукта
+        yield self.__form_product_request(url=response.meta["product_url"], meta=self.__get_product_meta(meta=response.meta, api_fields=fields))
 
-        regexpr = DESCRIPTION_WITH_FRANCHISE_REGEXPR if belongs_to_franchise else DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR
-        substitution = r"\12" if belongs_to_franchise else r"\10"
+    def parse_appdetails_error(self, failure: Failure) -> Generator:
+        meta = failure.request.meta
+        yield self.__form_product_request(url=meta["product_url"], meta=self.__get_product_meta(meta=meta))
 
-        return re.sub(regexpr, substitution, description).strip()
+    def parse_product_error(self, failure: Failure) -> None:
+        # Страница продукта не загрузилась (ошибка загрузки, ответ HttpError или исчерпанные повторы): продукт
+        # из прошлого запуска не считается удаленным, а задача фронтира выполнена
+        request = failure.request
+        self.logger.warning("Product page %s failed: %r", request.url, failure.value)
+        if self.incremental_state is not None:
+            app_id = get_app_id(url=request.url)
+            if app_id is not None:
+                self.incremental_state.keep(key=app_id)
+            else:
+                self.incremental_state.mark_incomplete()  # Ключ набора в состоянии - его название
 
-    def __get_developers(self, soup: BeautifulSoup) -> List[str]:
-        description = self.__get_game_description(soup=soup)
-        belongs_to_franchise = self.__belongs_to_franchise(game_description=description)
+        self.__complete_frontier_task(meta=request.meta)
 
-        regexpr = DESCRIPTION_WITH_FRANCHISE_REGEXPR if belongs_to_franchise else DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR
-        developers_str = re.sub(regexpr, r"\6", description).strip()
+    # Private:
+    def __get_game_description(self, soup: BeautifulSoup) -> GameDescription:
+        return get_game_description(soup=soup)
 
-        developers = list(map(lambda dev: dev.strip(), developers_str.split(",")))
-        return developers
+    def __form_game(self, response: Response, fields: Dict[str, Any]) -> Generator:
+        game = Game()
+        game["app_id"] = get_app_id(url=response.url)
+        for field, value in fields.items():
+            game[field] = value
 
-    def __get_publishers(self, soup: BeautifulSoup) -> List[str]:
-        description = self.__get_game_description(soup=soup)
-        belongs_to_franchise = self.__belongs_to_franchise(game_description=description)
+        if not self.__is_batch:
+            if not self.__take_item(query=0):
+                return
 
-        regexpr = DESCRIPTION_WITH_FRANCHISE_REGEXPR if belongs_to_franchise else DESCRIPTION_WITHOUT_FRANCHISE_REGEXPR
-        publishers_str = re.sub(regexpr, r"\8", description).strip()
+            yield game
+            if self.__is_items_budget_spent():
+                raise CloseSpider(reason="max_items")
+            return
 
-        publishers = list(map(lambda pub: pub.strip(), publishers_str.split(",")))
-        return publishers
+        # Сам продукт не хранится: лишь номера запросов, фильтрам которых он удовлетворяет и в файлы которых
+        # еще не попал
+        key = response.meta["product_key"]
+        job_state = self.__get_job_state()
+        pending = job_state["scraped"].get(key)
+        if pending is None:
+            pending = {query for query, settings in enumerate(self.__queries) if is_required_game(game=game, settings=settings)}
 
-    def __get_franchises(self, soup: BeautifulSoup) -> List[str]:
-        description = self.__get_game_description(soup=soup)
-        if not self.__belongs_to_franchise(game_description=description):
-            return []
+        queries = job_state["listed"].pop(key, set()) & pending
+        job_state["scraped"][key] = pending - queries
+        yield from self.__route(game=game, queries=queries)
 
-        franchises_str = re.sub(DESCRIPTION_WITH_FRANCHISE_REGEXPR, r"\10", description).strip()
-        return list(map(lambda fr: fr.strip(), franchises_str.split(",")))
+    def __form_query_anchor(self, query: str) -> str:
+        if not query:
+            return ""
 
-    def __get_platforms(self, soup: BeautifulSoup) -> List[str]:
-        systems = list()
-        os_to_full_name = {
-            "win": "Windows",
-            "mac": "macOS",
-            "linux": "SteamOS + Linux",
-        }
+        anchor = query
+        for before, after in TRANSFORMATIONS.items():
+            anchor = anchor.replace(before, after)
 
-        for block in soup.find_all(name="div", attrs={"class": re.compile(r"game_area_sys_req sysreq_content")}):
-            op_sys = block["data-os"]  # One of: "win", "max", "linux"
-            systems.append(os_to_full_name[op_sys])
+        return f'term={"+".join(anchor.split(" "))}'
 
-        return systems
+    def __form_filters_anchor(self, query: int) -> str:
+        if not self.settings.getbool("SEARCH_FILTERS_PUSHDOWN", True):
+            return ""
 
-    def __get_languages(self, soup: BeautifulSoup) -> List[str]:
-        languages = list()
-        for block in soup.find_all("td", attrs={"class": "ellipsis"}):
-            
-            language = block.string.strip()
-            languages.append(language)
+        parameters = list(self.__search_parameters[query])
+        if self.settings.get("SEARCH_CATEGORY"):
+            parameters.append(("category1", str(self.settings.get("SEARCH_CATEGORY"))))
 
-        return languages
+        return urlencode(parameters)
 
-    def __get_game_description(self, soup: BeautifulSoup) -> str:
-        about_block = soup.find(name="div", attrs={"class": "details_block", "id": "genresAndManufacturer"})
-        return about_block.text.replace("\n", " ").strip()
+    def __form_order_anchor(self, query: int) -> str:
+        order = self.__queries[query].SEARCH_ORDER
+        if order is None:
+            return ""
 
-    def __belongs_to_franchise(self, game_description: str) -> bool:
-        return True if re.match(DESCRIPTION_WITH_FRANCHISE_REGEXPR, game_description) else False
+        return f"sort_by={SEARCH_ORDER_PARAMETERS[order]}"
 
-    def __any_of_in(self, required: List[str], existing: List[str]) -> bool:
-        if required is None or required == []:
-            return True
+    def __form_page_anchor(self, page: int) -> str:
+        return f"page={page}"
 
-        if existing is None or existing == []:
-            return False
+    def __get_till_page(self, query: int) -> int:
+        settings = self.__queries[query]
 
-        required_labels = set()
-        for label in required:
-            required_labels.add(label)
+        till_page = settings.TILL_PAGE
+        if not settings.TURN_ON_PAGE_SETTINGS or till_page is None:
+            till_page = 10_000
 
-        for label in existing:
-            if label in required_labels:
-                return True
+        return till_page
 
-        return False
+    def __get_since_page(self, query: int) -> int:
+        settings = self.__queries[query]
 
-    def __all_of_in(self, required: List[str], existing: List[str]) -> bool:
-        if required is None or required == []:
-            return True
+        since_page = settings.SINCE_PAGE
+        if not settings.TURN_ON_PAGE_SETTINGS or since_page is None:
+            since_page = 1
 
-        if existing is None or existing == []:
-            return False
+        return since_page
 
-        required_labels = set()
-        for label in required:
-            required_labels.add(label)
+    def __get_search_end(self, query: int) -> int:
+        # Номер результата выдачи, начиная с которого поиск запроса не просматривается: граница TILL_PAGE,
+        # бюджет MAX_RESULTS или остановка обхода поиска (граница упорядоченной выдачи, исчерпанный MAX_ITEMS)
+        settings = self.__queries[query]
 
-        for label in existing:
-            required_labels.discard(label)
+        end = self.__get_till_page(query=query) * SEARCH_PAGE_SIZE
+        if settings.MAX_RESULTS is not None:
+            end = min(end, (self.__get_since_page(query=query) - 1) * SEARCH_PAGE_SIZE + settings.MAX_RESULTS)
 
-        return not required_labels  # Must be empty if OK
+        return min(end, self.__get_job_state()["search_ends"].get(query, end))
 
-    def __is_required_price(self, price: str) -> bool:
-        min_price = user_settings.MIN_PRICE
-        if min_price is None:
-            min_price = 0
+    def __stop_search(self, query: int, end: int) -> None:
+        search_ends = self.__get_job_state()["search_ends"]
+        search_ends[query] = min(end, search_ends.get(query, end))
 
-        max_price = user_settings.MAX_PRICE
-        if max_price is None:
-            max_price = 1_000_000_000
+    def __is_stoppable_search(self, query: int) -> bool:
+        settings = self.__queries[query]
+        return settings.SEARCH_ORDER is not None or settings.MAX_ITEMS is not None
 
-        float_price = float(price.replace(",", ".").split()[0])  # Format: "Price Currency"
-        return min_price <= float_price <= max_price
+    def __get_pages_in_flight(self) -> int:
+        return max(1, self.settings.getint("SEARCH_PAGES_IN_FLIGHT", 1))
 
-    def __is_required_release_year(self, release_date: str) -> bool:
-        since_year = user_settings.SINCE_RELEASE_YEAR
-        if since_year is None:
-            since_year = 1900
+    def __form_first_search_requests(self, query: int) -> Generator:
+        since_page = self.__get_since_page(query=query)
+        search_end = self.__get_search_end(query=query)
 
-        till_year = user_settings.TILL_RELEASE_YEAR
-        if till_year is None:
-            till_year = 3000
+        if self.config.SEARCH_BACKEND == "infinite":
+            # Первая порция сообщает общее число результатов, после чего остальные запрашиваются разом
+            start = (since_page - 1) * SEARCH_PAGE_SIZE
+            if start < search_end:
+                yield self.__form_search_results_request(query=query, start=start, is_first=True)
+            return
 
-        is_date_with_day = True if re.match(RELEASE_DATE_WITH_DAY_REGEXPR, release_date) else False
-        regexpr = RELEASE_DATE_WITH_DAY_REGEXPR if is_date_with_day else RELEASE_DATE_WITHOUT_DAY_REGEXPR
-        substitution = r"\4" if is_date_with_day else r"\3"
+        # Несколько страниц поиска запрашиваются параллельно: каждая непустая страница
+        # порождает запрос страницы, отстоящей от нее на число одновременно загружаемых страниц
+        # После возобновления обхода (JOBDIR) уже разобранные страницы не запрашиваются: следующие за ними
+        # страницы сохранены в очереди запросов
+        completed_pages = self.__get_job_state()["search_pages"].get(query, set())
 
-        year = int(re.sub(regexpr, substitution, release_date))
-        return since_year <= year <= till_year
+        till_page = min(since_page + self.__get_pages_in_flight() - 1, self.__get_till_page(query=query))
+        for page_number in range(since_page, till_page + 1):
+            if page_number not in completed_pages and (page_number - 1) * SEARCH_PAGE_SIZE < search_end:
+                yield from self.__schedule(request=self.__form_search_page_request(query=query, page=page_number))
+
+    def __form_search_page_request(self, query: int, page: int) -> Request:
+        anchors = [
+            self.__form_query_anchor(self.__queries[query].QUERY),
+            self.__form_filters_anchor(query=query),
+            self.__form_order_anchor(query=query),
+        ]
+        query_url = "&".join([SEARCH_URL] + [anchor for anchor in anchors if anchor])
+
+        url = "&".join([query_url, self.__form_page_anchor(page=page)])
+        return Request(
+            url=self.__to_store_url(url=url),
+            callback=self.parse_search_page,
+            errback=self.parse_search_page_error,
+            meta={"query": query, "page": page},
+        )
+
+    def __form_next_search_page_request(self, query: int, page: int) -> Request | None:
+        next_page = page + self.__get_pages_in_flight()
+        if (next_page - 1) * SEARCH_PAGE_SIZE >= self.__get_search_end(query=query):
+            return None
+
+        return self.__form_search_page_request(query=query, page=next_page)
+
+    def __get_search_batch_size(self) -> int:
+        return min(max(1, self.config.SEARCH_BATCH_SIZE), MAX_SEARCH_BATCH_SIZE)
+
+    def __form_search_results_request(self, query: int, start: int, is_first: bool, till_start: int | None = None) -> Request:
+        anchors = [
+            self.__form_query_anchor(self.__queries[query].QUERY),
+            self.__form_filters_anchor(query=query),
+            self.__form_order_anchor(query=query),
+        ]
+        query_url = "&".join([SEARCH_RESULTS_URL] + [anchor for anchor in anchors if anchor])
+
+        batch_size = min(self.__get_search_batch_size(), self.__get_search_end(query=query) - start)
+        url = "&".join([query_url, f"start={start}", f"count={batch_size}"])
+        return Request(
+            url=self.__to_store_url(url=url),
+            callback=self.parse_search_results,
+            errback=self.parse_search_results_error,
+            meta={"query": query, "start": start, "is_first": is_first, "till_start": till_start},
+        )
+
+    def __form_next_search_results_request(self, query: int, start: int, till_start: int) -> Request | None:
+        # Только для поиска с остановкой (__is_stoppable_search): без нее все порции запрошены первой
+        if not self.__is_stoppable_search(query=query):
+            return None
+
+        next_start = start + self.__get_pages_in_flight() * self.__get_search_batch_size()
+        if next_start >= min(till_start, self.__get_search_end(query=query)):
+            return None
+
+        return self.__form_search_results_request(query=query, start=next_start, is_first=False, till_start=till_start)
+
+    def __skip_search_results(self, meta: Dict[str, Any]) -> Generator:
+        # Порция не загрузилась или не разобралась
+        self.__mark_search_incomplete()
+        if not meta["is_first"]:
+            # Пропускаем порцию, но не обрываем запросы следующих
+            next_request = self.__form_next_search_results_request(query=meta["query"], start=meta["start"], till_start=meta["till_start"])
+            if next_request is not None:
+                yield next_request
+            return
 
-    def __has_required_platforms(self, platforms: List[str] | None) -> bool:
-        if user_settings.ALL_OF_OS:
-            return self.__all_of_in(user_settings.PLATFORMS, platforms)
-        else:
-            return self.__any_of_in(user_settings.PLATFORMS, platforms)
+        # Без первой порции общее число результатов неизвестно: пробуем следующую порцию как первую
+        start = meta["start"] + self.__get_search_batch_size()
+        if start < self.__get_search_end(query=meta["query"]):
+            yield self.__form_search_results_request(query=meta["query"], start=start, is_first=True)
+
+    def __load_search_results(self, response: Response) -> Dict[str, Any] | None:
+        # Format: {"success": 1, "results_html": "...", "total_count": N, ...}; None -> ответ не разобран
+        try:
+            results = json.loads(response.text)
+        except ValueError:
+            results = None
+
+        if not isinstance(results, dict) or not isinstance(results.get("results_html", ""), str):
+            self.logger.warning("Malformed search results at %s", response.url)
+            return None
+
+        return results
+
+    def __load_appdetails(self, response: Response) -> Dict[str, Any] | None:
+        # Поле "data" ответа. Format: {"<app id>": {"success": bool, "data": {...}}}; None -> API не знает продукт или ответ не разобран
+        try:
+            results = json.loads(response.text)
+        except ValueError:
+            results = None
+
+        details = results.get(response.meta["app_id"]) if isinstance(results, dict) else None
+        if not isinstance(details, dict) or not details.get("success") or not isinstance(details.get("data"), dict):
+            return None
+
+        return details["data"]
+
+    def __form_product_requests(self, query: int, candidates: List[SearchCandidate], offset: int) -> Generator:
+        # offset: номер первого из candidates результата в выдаче поиска
+        candidates = candidates[:max(0, self.__get_search_end(query=query) - offset)]
+        if is_past_search_order_bound(candidates=candidates, settings=self.__queries[query]):
+            self.__stop_search(query=query, end=offset + len(candidates))  # Следующие результаты фильтры не пройдут
+
+        for candidate in candidates:
+            if self.__get_search_end(query=query) == 0:
+                return  # Исчерпан MAX_ITEMS запроса
+
+            if self.settings.getbool("SEARCH_ROWS_PREFILTER", True):
+                if not all(is_required(candidate) for _, is_required in self.__candidate_filters_plans[query]):
+                    continue  # Продукт заведомо не проходит фильтры: страницу не загружаем
+
+            app_id = get_app_id(url=candidate.url)
+            if self.incremental_state is not None and app_id is not None:
+                if self.incremental_state.is_unchanged_candidate(app_id=app_id, candidate=candidate):
+                    continue  # Стоимость и число обзоров не изменились с прошлого запуска
+
+            url = canonicalize_product_url(url=candidate.url)  # Ссылки одного продукта различаются параметром snr
+            key = get_product_key(url=url) or url
+            is_scraped = False
+            if self.__is_batch:
+                job_state = self.__get_job_state()
+                if key in job_state["listed"]:
+                    job_state["listed"][key].add(query)
+                    continue  # Продукт уже запрошен другим запросом
+
+                if key in job_state["scraped"]:
+                    if query not in job_state["scraped"][key]:
+                        continue  # Уже собранный продукт фильтрам этого запроса не удовлетворяет или уже в его файле
+
+                    # Собранный для другого запроса продукт не хранится: страница загружается снова
+                    # (с STEAM_CACHE_ENABLED - из кэша)
+                    is_scraped = True
+
+                job_state["listed"][key] = {query}
+
+            if is_scraped:
+                request = self.__form_product_request(url=url, meta={"product_key": key}).replace(dont_filter=True)
+                yield from self.__schedule(request=request)
+                continue
 
-    def __has_required_developers(self, developers: List[str] | None) -> bool:
-        if user_settings.ALL_OF_DEVELOPERS:
-            return self.__all_of_in(user_settings.DEVELOPERS, developers)
-        else:
-            return self.__any_of_in(user_settings.DEVELOPERS, developers)
+            if self.config.PRODUCT_BACKEND == "api" and app_id is not None:
+                request = Request(
+                    url=self.__to_store_url(url=APPDETAILS_URL + app_id),
+                    callback=self.parse_appdetails,
+                    errback=self.parse_appdetails_error,
+                    meta={"app_id": app_id, "product_url": url, "product_key": key},
+                )
+            else:
+                # В том числе наборы (bundle, sub), которых нет в API
+                request = self.__form_product_request(url=url, meta={"product_key": key})
+
+            yield from self.__schedule(request=request)
+
+    def __form_product_request(self, url: str, meta: Dict[str, Any]) -> Request:
+        # С пулом процессов страница продукта разбирается вне потока реактора
+        callback = self.parse_in_pool if self.__extraction_pool is not None else None
+        return Request(url=self.__add_country(url=url), callback=callback, errback=self.parse_product_error, meta=meta)
+
+    def __mark_search_incomplete(self) -> None:
+        if self.incremental_state is not None:
+            self.incremental_state.mark_incomplete()
+
+    def __get_product_meta(self, meta: Dict[str, Any], api_fields: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        # Страница продукта после api/appdetails: задача фронтира переходит к ней и завершится вместе с ней
+        product_meta = {"product_key": meta["product_key"]}
+        if api_fields is not None:
+            product_meta["api_fields"] = api_fields
+        if "frontier_key" in meta:
+            product_meta["frontier_key"] = meta["frontier_key"]
+
+        return product_meta
+
+    def __schedule(self, request: Request) -> Generator:
+        # В распределенном обходе страницы поиска и продукты отдаются не движку Scrapy, а в общий фронтир,
+        # откуда их заберет любой процесс. Повторы отсеивает фронтир, поэтому фильтр повторов Scrapy не нужен
+        if self.frontier is None:
+            yield request
+            return
 
-    def __has_required_tags(self, tags: List[str] | None) -> bool:
-        if user_settings.ALL_OF_TAGS:
-            return self.__all_of_in(user_settings.TAGS, tags)
+        if "page" in request.meta:
+            key = f"search/{request.meta['query']}/{request.meta['page']}"
         else:
-            return self.__any_of_in(user_settings.TAGS, tags)
+            key = f"product/{request.meta['product_key']}"
+
+        request = request.replace(dont_filter=True, meta=dict(request.meta, frontier_key=key))
+        self.frontier.add(tasks=[FrontierTask(key=key, request=request.to_dict(spider=self))])
+
+    def __complete_frontier_task(self, meta: Dict[str, Any]) -> None:
+        # Ответы отмечает SteamFrontierMiddleware, обработчики ошибок - сами
+        if self.frontier is not None and "frontier_key" in meta:
+            self.frontier.complete(key=meta["frontier_key"])
+
+    async def __flush_frontier(self, poll_interval: float) -> None:
+        while True:
+            await asyncio.sleep(poll_interval)
+            await asyncio.to_thread(self.frontier.flush)
+
+    def __to_store_url(self, url: str) -> str:
+        # Ссылки на страницы продуктов приходят из выдачи поиска и уже указывают на нужный сервер
+        store_url = self.settings.get("STEAM_STORE_URL", STORE_URL).rstrip("/")
+        url = store_url + url[len(STORE_URL):] if store_url != STORE_URL and url.startswith(STORE_URL) else url
+        return self.__add_country(url=url)
+
+    def __add_country(self, url: str) -> str:
+        # Страна магазина (STEAM_COUNTRY_CC) одна для поиска, страниц продуктов и api/appdetails
+        country = self.settings.get("STEAM_COUNTRY_CC")
+        return add_or_replace_parameter(url, "cc", country) if country else url
+
+    def __get_job_state(self) -> Dict[str, Any]:
+        # Состояние обхода: разобранные страницы поиска, остановки поиска и число собранных продуктов по номерам
+        # запросов и, в пакетном режиме, запросы, в выдаче которых встретился еще не собранный продукт, и запросы,
+        # фильтрам которых удовлетворяют уже собранные продукты, но в файлы которых они еще не попали.
+        # С JOBDIR это spider.state, которое расширение SpiderState сохраняет при остановке и загружает при возобновлении обхода
+        state = getattr(self, "state", None)
+        if state is None:
+            state = self.state = dict()
+
+        for key in ("search_pages", "listed", "scraped", "search_ends", "items"):
+            state.setdefault(key, dict())
+
+        return state
+
+    def __route(self, game: Game, queries: Set[int]) -> Generator:
+        # Копия продукта попадает в выходной файл каждого из queries - запросов, в выдаче которых он встретился
+        # и фильтрам которых удовлетворяет
+        for query in sorted(queries):
+            settings = self.__queries[query]
+            if self.__take_item(query=query):
+                routed_game = game.copy()
+                routed_game["output"] = settings.FILENAME
+                yield routed_game
+
+        if self.__is_items_budget_spent():
+            raise CloseSpider(reason="max_items")
+
+    def __take_item(self, query: int) -> bool:
+        # Учитывает продукт в MAX_ITEMS запроса; False -> бюджет запроса уже исчерпан
+        budget = self.__queries[query].MAX_ITEMS
+        if budget is None:
+            return True
 
-    def __has_required_languages(self, languages: List[str] | None) -> bool:
-        if user_settings.ALL_OF_LANGUAGES:
-            return self.__all_of_in(user_settings.LANGUAGES, languages)
-        else:
-            return self.__any_of_in(user_settings.LANGUAGES, languages)
+        items = self.__get_job_state()["items"]
+        if items.get(query, 0) >= budget:
+            return False
 
-    def __has_required_genres(self, genres: List[str] | None) -> bool:
-        if user_settings.ALL_OF_GENRES:
-            return self.__all_of_in(user_settings.GENRES, genres)
-        else:
-            return self.__any_of_in(user_settings.GENRES, genres)
+        items[query] = items.get(query, 0) + 1
+        if items[query] >= budget:
+            self.__stop_search(query=query, end=0)
 
-    def __has_required_publishers(self, publishers: List[str] | None) -> bool:
-        if user_settings.ALL_OF_PUBLISHERS:
-            return self.__all_of_in(user_settings.PUBLISHERS, publishers)
-        else:
-            return self.__any_of_in(user_settings.PUBLISHERS, publishers)
+        return True
 
-    def __has_required_franchises(self, franchises: List[str] | None) -> bool:
-        if user_settings.ALL_OF_FRANCHISES:
-            return self.__all_of_in(user_settings.FRANCHISES, franchises)
-        else:
-            return self.__any_of_in(user_settings.FRANCHISES, franchises)
+    def __is_items_budget_spent(self) -> bool:
+        items = self.__get_job_state()["items"]
+        return all(
+            settings.MAX_ITEMS is not None and items.get(query, 0) >= settings.MAX_ITEMS
+            for query, settings in enumerate(self.__queries)
+        )
 
-    def __form_query_anchor(self, query: str) -> str:
-        if not query:
-            return ""
+    def __measure_stages(self, stage_stats: StageStats) -> None:
+        # Замеры оборачивают этапы разбора и фильтры: без STEAM_STAGE_STATS_ENABLED паук не тратит на них время
+        self.__stage_stats = stage_stats  # Сигналы обхода хранят лишь слабую ссылку на получателя
+        self.__make_soup = stage_stats.measure(stage="soup", function=self.__make_soup)
+        self.__get_game_description = stage_stats.measure(stage="description", function=self.__get_game_description)
 
-        anchor = query
-        for before, after in TRANSFORMATIONS.items():
-            anchor = anchor.replace(before, after)
+        self.__extractors = {
+            field: stage_stats.measure(stage=f"extract/{field}", function=extract) for field, extract in self.__extractors.items()
+        }
 
-        return f'term={"+".join(anchor.split(" "))}'
+        self.__filters_plan = [
+            (field, stage_stats.measure_filter(source="product", field=field, is_required=is_required))
+            for field, is_required in self.__filters_plan
+        ]
+        self.__candidate_filters_plans = [
+            [(field, stage_stats.measure_filter(source="search_row", field=field, is_required=is_required)) for field, is_required in plan]
+            for plan in self.__candidate_filters_plans
+        ]
 
-    def __form_page_anchor(self, page: int) -> str:
-        return f"page={page}"
+    def __make_soup(self, page: str, fragments: SoupStrainer | None = None) -> BeautifulSoup:
+        # fragments: области страницы, которые нужны пауку; с HTML_FRAGMENTS_ONLY дерево строится только для них
+        parse_only = fragments if self.settings.getbool("HTML_FRAGMENTS_ONLY", True) else None
+        return make_soup(page=page, parser=self.settings.get("HTML_PARSER", "html.parser"), parse_only=parse_only)
 
-    def __is_empty_query_search_page(self, page: str) -> bool:
-        soup = BeautifulSoup(page, "html.parser")
+    def __is_empty_query_search_page(self, soup: BeautifulSoup) -> bool:
         return not soup.find_all(name="a", attrs={"class": re.compile("search_result_row ds_collapse_flag")})
 
-    def __get_products_urls_from_query_search_page(self, page: str) -> List[str]:
-        soup = BeautifulSoup(page, "html.parser")
-        urls = list()
+    def __get_candidates_from_query_search_page(self, soup: BeautifulSoup) -> List[SearchCandidate]:
+        candidates = list()
 
         for block in soup.find_all(name="a", attrs={"class": re.compile("search_result_row ds_collapse_flag")}):
-            urls.append(block["href"])
+            candidates.append(parse_search_row(block=block))
 
-        return urls
-
-    def __is_product_page(self, page: str) -> bool:
-        soup = BeautifulSoup(page, "html.parser")
-        about_block = soup.find(name="div", attrs={"class": "details_block", "id": "genresAndManufacturer"})
-        return about_block is not None
-
-    def __is_dlc_page(self, page: str) -> bool:
-        if not self.__is_product_page(page):
-            return False
-
-        soup = BeautifulSoup(page, "html.parser")
-        block = soup.find(name="div", attrs={"class": "block responsive_apppage_details_right heading responsive_hidden"})
-
-        text = block.string.strip()
-        return text == "Is this DLC relevant to you?"
-
-    def __is_soundtrack_page(self, page: str) -> bool:
-        if not self.__is_product_page(page):
-            return False
-
-        soup = BeautifulSoup(page, "html.parser")
-        block = soup.find(name="div", attrs={"class": "block responsive_apppage_details_right heading responsive_hidden"})
-
-        text = block.string.strip()
-        return text == "Is this soundtrack relevant to you?"
-
-    def __is_released_product(self, page: str) -> bool:
-        soup = BeautifulSoup(page, "html.parser")
-
-        block = soup.find(name="span", attrs={"class": "not_yet"})
-        if block is not None:
-            return False
-
-        release_date = self.__get_release_date(soup=soup)
-        return release_date.lower() not in [
-            "coming soon",
-            "to be announced",
-        ]
+        return candidates
@@ -0,0 +1,164 @@
+"""
+Словарь параметров поиска Steam: названия тэгов, языков и платформ в том виде, в каком они указаны на страницах
+продуктов (и в user_settings.py), и их значения в параметрах tags=, supportedlang= и os= страницы поиска.
+
+Тэги, которых здесь нет, к поисковому запросу не добавляются и проверяются только на странице продукта.
+Идентификатор тэга можно узнать по ссылке тэга в магазине: https://store.steampowered.com/tags/en/<Тэг>/ ведет
+на поиск с параметром tags=<id>.
+"""
+from steam_crawler.search import OS_TO_FULL_NAME
+
+
+TAG_IDS = {
+    "Action":                  19,
+    "Adventure":               21,
+    "Strategy":                9,
+    "RPG":                     122,
+    "Indie":                   492,
+    "Casual":                  597,
+    "Simulation":              599,
+    "Sports":                  701,
+    "Racing":                  699,
+    "Massively Multiplayer":   128,
+    "Free to Play":            113,
+    "Early Access":            493,
+
+    "Singleplayer":            4182,
+    "Multiplayer":             3859,
+    "Co-op":                   1685,
+    "Online Co-Op":            3843,
+    "Local Co-Op":             3841,
+    "Local Multiplayer":       7368,
+    "PvP":                     1775,
+    "PvE":                     6730,
+    "Team-Based":              5711,
+    "Battle Royale":           176981,
+    "MMORPG":                  1754,
+    "MOBA":                    1718,
+
+    "Zombies":                 1659,
+    "Horror":                  1667,
+    "Survival":                1662,
+    "Survival Horror":         3978,
+    "Psychological Horror":    1721,
+    "Post-apocalyptic":        3835,
+    "Shooter":                 1774,
+    "FPS":                     1663,
+    "Third-Person Shooter":    3814,
+    "Open World":              1695,
+    "Sandbox":                 3810,
+    "Exploration":             3834,
+    "Crafting":                1702,
+    "Building":                1643,
+    "Stealth":                 1687,
+    "Hack and Slash":          1646,
+    "Action RPG":              4231,
+    "JRPG":                    4434,
+    "Roguelike":               1716,
+    "Roguelite":               3959,
+    "Metroidvania":            1628,
+    "Souls-like":              29482,
+    "Platformer":              1625,
+    "Puzzle":                  1664,
+    "Puzzle Platformer":       5537,
+    "Point & Click":           1698,
+    "Visual Novel":            3799,
+    "Card Game":               1666,
+    "Turn-Based":              1677,
+    "Turn-Based Strategy":     1741,
+    "RTS":                     1676,
+    "Tower Defense":           1645,
+    "City Builder":            4328,
+    "Management":              12472,
+    "Fighting":                1743,
+    "Arcade":                  1773,
+    "Rhythm":                  1752,
+    "Bullet Hell":             4885,
+    "Shoot 'Em Up":            4255,
+    "Beat 'em up":             4158,
+
+    "Atmospheric":             4166,
+    "Story Rich":              1742,
+    "Choices Matter":          6426,
+    "Multiple Endings":        6971,
+    "Sci-fi":                  3942,
+    "Fantasy":                 1684,
+    "Cyberpunk":               4115,
+    "Space":                   1755,
+    "Mystery":                 5716,
+    "Detective":               5613,
+    "Comedy":                  1719,
+    "Funny":                   4136,
+    "Dark":                    4342,
+    "Cute":                    4726,
+    "Relaxing":                1654,
+    "Family Friendly":         5350,
+    "Difficult":               4026,
+    "Anime":                   4085,
+    "Female Protagonist":      7208,
+    "Gore":                    4345,
+    "Violent":                 4667,
+    "Nudity":                  6650,
+    "Sexual Content":          12095,
+    "Mature":                  5611,
+
+    "2D":                      3871,
+    "3D":                      4191,
+    "Pixel Graphics":          3964,
+    "First-Person":            3839,
+    "Third Person":            1697,
+    "Great Soundtrack":        1756,
+    "Classic":                 1693,
+    "Retro":                   4004,
+    "Tactical":                1708,
+    "Military":                4168,
+    "War":                     1678,
+    "Historical":              3987,
+    "Medieval":                4172,
+    "World War II":            4150,
+    "Physics":                 3968,
+    "Moddable":                1669,
+    "Replay Value":            4711,
+    "Character Customization": 4747,
+    "Economy":                 4695,
+    "Controller":              7481,
+    "VR":                      21978,
+}
+
+# Коды языков Steam (как в параметре l= магазина)
+LANGUAGE_CODES = {
+    "English":                 "english",
+    "Russian":                 "russian",
+    "Ukrainian":               "ukrainian",
+    "French":                  "french",
+    "German":                  "german",
+    "Italian":                 "italian",
+    "Spanish - Spain":         "spanish",
+    "Spanish - Latin America": "latam",
+    "Portuguese - Portugal":   "portuguese",
+    "Portuguese - Brazil":     "brazilian",
+    "Polish":                  "polish",
+    "Czech":                   "czech",
+    "Dutch":                   "dutch",
+    "Danish":                  "danish",
+    "Finnish":                 "finnish",
+    "Norwegian":               "norwegian",
+    "Swedish":                 "swedish",
+    "Hungarian":               "hungarian",
+    "Romanian":                "romanian",
+    "Bulgarian":               "bulgarian",
+    "Greek":                   "greek",
+    "Turkish":                 "turkish",
+    "Arabic":                  "arabic",
+    "Thai":                    "thai",
+    "Vietnamese":              "vietnamese",
+    "Indonesian":              "indonesian",
+    "Japanese":                "japanese",
+    "Korean":                  "koreana",
+    "Simplified Chinese":      "schinese",
+    "Traditional Chinese":     "tchinese",
+}
+
+PLATFORM_CODES = {full_name: op_sys for op_sys, full_name in OS_TO_FULL_NAME.items()}
+
+GAMES_CATEGORY = 998  # category1= для игр: без DLC, саундтреков, программ и видео
@@ -0,0 +1,127 @@
+from queue import Queue
+from typing import Any, BinaryIO, Callable, Dict, List
+
+import gzip
+import io
+import json
+import threading
+
+
+def _get_dumps() -> Callable[[Dict[str, Any]], bytes]:
+    # Самый быстрый из доступных сериализаторов: orjson, затем msgspec, затем стандартный json
+    try:
+        import orjson
+        return orjson.dumps
+    except ImportError:
+        pass
+
+    try:
+        import msgspec
+        return msgspec.json.encode
+    except ImportError:
+        pass
+
+    return lambda record: json.dumps(record).encode("utf-8")
+
+
+dumps: Callable[[Dict[str, Any]], bytes] = _get_dumps()
+
+OUTPUT_FORMATS = [
+    "jsonl",      # JSON Lines без сжатия
+    "jsonl.gz",   # JSON Lines, сжатый gzip
+    "jsonl.zst",  # JSON Lines, сжатый zstd (требует zstandard)
+]
+
+
+def open_output(path: str) -> BinaryIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode="wb")
+
+    if path.endswith(".zst"):
+        import zstandard
+        return zstandard.ZstdCompressor().stream_writer(open(file=path, mode="wb"))
+
+    return open(file=path, mode="wb")
+
+
+def open_input(path: str) -> BinaryIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode="rb")
+
+    if path.endswith(".zst"):
+        import zstandard
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(file=path, mode="rb")))
+
+    return open(file=path, mode="rb")
+
+
+def merge_outputs(paths: List[str], path: str) -> int:
+    # Объединяет выходные файлы в один без повторов продуктов (по app_id, у наборов без него - по названию);
+    # строки копируются без повторной сериализации. Возвращает число записанных продуктов
+    keys = set()
+    with open_output(path=path) as output:
+        for input_path in paths:
+            with open_input(path=input_path) as file:
+                for line in file:
+                    record = json.loads(line)
+                    key = record.get("app_id") or record.get("name")
+                    if key in keys:
+                        continue
+
+                    keys.add(key)
+                    output.write(line if line.endswith(b"\n") else line + b"\n")
+
+    return len(keys)
+
+
+class JsonLinesWriter(object):
+    # Записи копятся пачками по batch_size; сериализация и запись пачек идут в отдельном потоке,
+    # чтобы обработка предметов не блокировала движок Scrapy
+
+    __slots__ = ["__file", "__batch", "__batch_size", "__queue", "__thread", "__error"]
+
+    def __init__(self, path: str, batch_size: int = 100, max_pending_batches: int = 16) -> None:
+        self.__file: BinaryIO = open_output(path=path)
+        self.__batch: List[Dict[str, Any]] = list()
+        self.__batch_size: int = max(1, batch_size)
+        self.__queue: Queue = Queue(maxsize=max_pending_batches)  # Ограничивает память при медленном диске
+        self.__error: BaseException | None = None
+
+        self.__thread = threading.Thread(target=self.__run, name=f"JsonLinesWriter({path})", daemon=True)
+        self.__thread.start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.__raise_error()
+
+        self.__batch.append(record)
+        if len(self.__batch) >= self.__batch_size:
+            self.__queue.put(self.__batch)
+            self.__batch = list()
+
+    def close(self) -> None:
+        if self.__batch:
+            self.__queue.put(self.__batch)
+            self.__batch = list()
+
+        self.__queue.put(None)  # Сигнал завершения потока записи
+        self.__thread.join()
+        self.__file.close()
+        self.__raise_error()
+
+    def __run(self) -> None:
+        while True:
+            batch = self.__queue.get()
+            if batch is None:
+                return
+
+            if self.__error is not None:
+                continue  # После ошибки пачки лишь вычитываются, чтобы не заблокировать очередь
+
+            try:
+                self.__file.write(b"".join(dumps(record) + b"\n" for record in batch))
+            except BaseException as error:
+                self.__error = error
+
+    def __raise_error(self) -> None:
+        if self.__error is not None:
+            raise self.__error
@@ -0,0 +1,114 @@
+"""
+Ответы api/appdetails (PRODUCT_BACKEND = "api"): продукт, отсеянный фильтрами API, страница продукта с полями API
+в том же виде, что и у страницы продукта, неразборчивые ответы и поля, которые извлекает страница продукта,
+и страна магазина (STEAM_COUNTRY_CC), без которой стоимость берется со страницы продукта.
+"""
+from typing import Any, Dict, List
+
+from scrapy import Request
+from scrapy.http import TextResponse
+from scrapy.utils.test import get_crawler
+
+from steam_crawler.appdetails import parse_appdetails
+from steam_crawler.config import load_config
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import json
+import pytest
+
+
+APPDETAILS = {
+    "550": {
+        "success": True,
+        "data": {
+            "type": "game",
+            "name": "Left 4 Dead 2",
+            "price_overview": {"currency": "EUR", "initial": 999, "final": 999},
+            "developers": ["Valve"],
+            "publishers": ["Valve"],
+            "platforms": {"windows": True, "mac": True, "linux": True},
+            "genres": [{"id": "1", "description": "Action"}],
+            "release_date": {"coming_soon": False, "date": "Nov 16, 2009"},
+        },
+    },
+}
+
+PRODUCT_URL = "https://store.steampowered.com/app/550/"
+
+
+def respond(body: str, settings: Dict[str, Any] | None = None, **overrides: Any) -> List[Request]:
+    crawler = get_crawler(SteamGameSpider, settings_dict=settings)
+    spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME="api", PRODUCT_BACKEND="api", **overrides)))
+
+    request = Request(
+        url="https://store.steampowered.com/api/appdetails?l=english&appids=550",
+        meta={"app_id": "550", "product_url": PRODUCT_URL, "product_key": "app/550"},
+    )
+    response = TextResponse(url=request.url, body=body.encode("utf-8"), encoding="utf-8", request=request)
+    return list(spider.parse_appdetails(response))
+
+
+def test_product_page_gets_api_fields():
+    requests = respond(body=json.dumps(APPDETAILS))
+
+    assert [request.url for request in requests] == [PRODUCT_URL]
+    assert requests[0].meta["api_fields"]["developers"] == ["Valve"]
+
+
+def test_api_filters_reject_product():
+    assert respond(body=json.dumps(APPDETAILS), TURN_ON_GENRE_SETTINGS=True, GENRES=["RPG"]) == []
+
+
+def test_malformed_response_falls_back_to_product_page():
+    for body in ("null", "[]", "<html></html>", '{"550": null}', '{"550": []}', '{"550": {"success": true, "data": []}}', '{"550": {"success": false}}'):
+        requests = respond(body=body)
+
+        assert [request.url for request in requests] == [PRODUCT_URL]
+        assert "api_fields" not in requests[0].meta
+
+
+def test_release_date_matches_product_page_format():
+    requests = respond(body=json.dumps(APPDETAILS), TURN_ON_RELEASE_SETTINGS=True, SINCE_RELEASE_YEAR=2009)
+
+    assert requests[0].meta["api_fields"]["release_date"] == "16 Nov, 2009"
+    assert respond(body=json.dumps(APPDETAILS), TURN_ON_RELEASE_SETTINGS=True, SINCE_RELEASE_YEAR=2010) == []
+
+
+@pytest.mark.parametrize("date, expected", [("16 Nov, 2009", "16 Nov, 2009"), ("Feb 6, 2020", "6 Feb, 2020"), ("Q1 2025", "Q1 2025")])
+def test_parse_appdetails_release_date(date, expected):
+    assert parse_appdetails(data={"release_date": {"coming_soon": False, "date": date}})["release_date"] == expected
+
+
+def test_malformed_fields_are_left_to_product_page():
+    data = dict(APPDETAILS["550"]["data"])
+    data.update(
+        price_overview={"final": 999},
+        release_date="Nov 16, 2009",
+        genres="Action",
+        developers=[None],
+        platforms=["windows"],
+    )
+    body = json.dumps({"550": {"success": True, "data": data}})
+
+    api_fields = respond(body=body)[0].meta["api_fields"]
+
+    assert sorted(api_fields) == ["name", "publishers"]
+
+
+def test_api_price_is_ignored_without_country():
+    requests = respond(body=json.dumps(APPDETAILS), TURN_ON_PRICE_SETTINGS=True, MAX_PRICE=5)
+
+    assert [request.url for request in requests] == [PRODUCT_URL]
+    assert "price" not in requests[0].meta["api_fields"]
+
+
+def test_country_is_passed_to_every_store_request():
+    settings = {"STEAM_COUNTRY_CC": "de"}
+    requests = respond(body=json.dumps(APPDETAILS), settings=settings)
+
+    assert [request.url for request in requests] == [PRODUCT_URL + "?cc=de"]
+    assert requests[0].meta["api_fields"]["price"] == "9.99 EUR"
+    assert respond(body=json.dumps(APPDETAILS), settings=settings, TURN_ON_PRICE_SETTINGS=True, MAX_PRICE=5) == []
+
+    spider = SteamGameSpider.from_crawler(get_crawler(SteamGameSpider, settings_dict=settings), config=load_config(source=dict(FILENAME="api")))
+    assert all("cc=de" in request.url for request in spider.start_requests())
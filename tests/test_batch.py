@@ -0,0 +1,98 @@
+"""
+Пакетный режим (BATCH_QUERIES): продукт из выдачи нескольких запросов загружается один раз и попадает в файл
+каждого запроса, фильтрам которого удовлетворяет. Собранные продукты не хранятся - лишь запросы, фильтрам
+которых они удовлетворяют, поэтому найденный позже продукт загружается снова. Страницы берутся
+из корпуса локального сервера-заменителя (benchmarks/corpus.py).
+"""
+from typing import Any, Dict, List, Tuple
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import Corpus
+from steam_crawler.appdetails import get_app_id
+from steam_crawler.config import load_config
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import pytest
+
+
+STORE_URL = "https://store.steampowered.com"
+SEARCH_URL = f"{STORE_URL}/search/?term=zombie"
+
+QUERIES = [
+    {"QUERY": "zombie", "FILENAME": "all"},
+    {"QUERY": "zombie", "FILENAME": "multiplayer", "TURN_ON_TAGS_SETTINGS": True, "TAGS": ["Multiplayer"]},
+]
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Corpus:
+    return Corpus(store_url=STORE_URL, filler=False)
+
+
+def form_spider() -> SteamGameSpider:
+    crawler = get_crawler(SteamGameSpider)
+    return SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME="batch", BATCH_QUERIES=QUERIES)))
+
+
+def list_products(spider: SteamGameSpider, corpus: Corpus, query: int, page: int) -> List[Request]:
+    # Запросы страниц продуктов, порожденные страницей поиска query
+    request = Request(url=f"{SEARCH_URL}&page={page}", meta={"query": query, "page": page})
+    response = HtmlResponse(url=request.url, body=corpus.get_search_page(page=page), request=request)
+    return [request for request in spider.parse_search_page(response) if request.callback is None]
+
+
+def download(spider: SteamGameSpider, corpus: Corpus, requests: List[Request]) -> List[Tuple[str, str]]:
+    # Пары "выходной файл, id продукта" предметов, собранных со страниц продуктов
+    games = list()
+    for request in requests:
+        body = corpus.get_product_page(app_id=int(get_app_id(url=request.url)))
+        games.extend(spider.parse(HtmlResponse(url=request.url, body=body, request=request)))
+
+    return sorted((game["output"], game["app_id"]) for game in games)
+
+
+def get_expected(corpus: Corpus, pages: List[int], filename: str) -> List[Tuple[str, str]]:
+    products = [product for product in corpus.get_products()[(min(pages) - 1) * 25:max(pages) * 25] if product.variant in ("game", "no_reviews")]
+    if filename == "multiplayer":
+        products = [product for product in products if "Multiplayer" in product.game["tags"]]
+
+    return [(filename, str(product.app_id)) for product in products]
+
+
+def test_product_listed_by_both_queries_is_downloaded_once(corpus):
+    spider = form_spider()
+    requests = list_products(spider=spider, corpus=corpus, query=0, page=1)
+
+    # Страницы продуктов еще загружаются: второй запрос лишь дописывается к ним
+    assert list_products(spider=spider, corpus=corpus, query=1, page=1) == []
+
+    games = download(spider=spider, corpus=corpus, requests=requests)
+    assert games == sorted(get_expected(corpus=corpus, pages=[1], filename="all") + get_expected(corpus=corpus, pages=[1], filename="multiplayer"))
+
+
+def test_scraped_products_keep_only_routing(corpus):
+    spider = form_spider()
+    download(spider=spider, corpus=corpus, requests=list_products(spider=spider, corpus=corpus, query=0, page=1))
+    rejected = {product.app_id for product in corpus.get_products() if product.variant not in ("game", "no_reviews")}
+
+    scraped = spider.state["scraped"]
+    assert all(isinstance(queries, set) for queries in scraped.values())
+    assert sorted(key for key, queries in scraped.items() if 1 in queries) == sorted(
+        f"app/{app_id}" for _, app_id in get_expected(corpus=corpus, pages=[1], filename="multiplayer")
+    )
+    # Дополнения, саундтреки и не вышедшие продукты паук отбрасывает: они так и остаются запрошенными
+    assert all(int(key.split("/")[1]) in rejected for key in spider.state["listed"])
+
+
+def test_product_listed_after_scraping_is_downloaded_again_for_matching_query(corpus):
+    spider = form_spider()
+    games = download(spider=spider, corpus=corpus, requests=list_products(spider=spider, corpus=corpus, query=0, page=2))
+    assert games == get_expected(corpus=corpus, pages=[2], filename="all")
+
+    # Повторно загружаются лишь продукты, удовлетворяющие фильтрам второго запроса, и в его файл
+    requests = list_products(spider=spider, corpus=corpus, query=1, page=2)
+    assert all(request.dont_filter for request in requests)
+    assert download(spider=spider, corpus=corpus, requests=requests) == get_expected(corpus=corpus, pages=[2], filename="multiplayer")
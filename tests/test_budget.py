@@ -0,0 +1,115 @@
+"""
+Бюджеты обхода: MAX_ITEMS (в том числе исчерпанный посреди страницы поиска и раздельный у запросов пакетного
+режима), остановка обхода поиска после исчерпания бюджета, CloseSpider("max_items") и MAX_RESULTS.
+Страницы берутся из корпуса локального сервера-заменителя (benchmarks/corpus.py).
+"""
+from typing import Any, Dict, List, Tuple
+
+from scrapy import Request
+from scrapy.exceptions import CloseSpider
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import Corpus
+from steam_crawler.appdetails import get_app_id
+from steam_crawler.config import load_config
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import pytest
+
+
+STORE_URL = "https://store.steampowered.com"
+SEARCH_URL = f"{STORE_URL}/search/?term=zombie"
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Corpus:
+    return Corpus(store_url=STORE_URL, filler=False)
+
+
+def form_spider(**overrides: Any) -> SteamGameSpider:
+    crawler = get_crawler(SteamGameSpider)
+    return SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME="budget", QUERY="zombie", **overrides)))
+
+
+def search(spider: SteamGameSpider, corpus: Corpus, page: int, query: int = 0) -> Tuple[List[Request], List[Request]]:
+    # Запросы страниц продуктов и следующих страниц поиска, порожденные страницей поиска
+    request = Request(url=f"{SEARCH_URL}&page={page}", meta={"query": query, "page": page})
+    response = HtmlResponse(url=request.url, body=corpus.get_search_page(page=page), request=request)
+    output = list(spider.parse_search_page(response))
+    return [entry for entry in output if entry.callback is None], [entry for entry in output if entry.callback == spider.parse_search_page]
+
+
+def download(spider: SteamGameSpider, corpus: Corpus, requests: List[Request]) -> Tuple[List[Dict[str, Any]], str | None]:
+    # Предметы со страниц продуктов и причина остановки обхода, если обработчик ее потребовал
+    games = list()
+    for request in requests:
+        body = corpus.get_product_page(app_id=int(get_app_id(url=request.url)))
+        try:
+            for game in spider.parse(HtmlResponse(url=request.url, body=body, request=request)):
+                games.append(dict(game))
+        except CloseSpider as exception:
+            return games, exception.reason
+
+    return games, None
+
+
+def test_max_items_spent_mid_page_closes_spider(corpus):
+    spider = form_spider(MAX_ITEMS=3)
+    products, next_pages = search(spider=spider, corpus=corpus, page=1)
+    assert len(products) == 25 and len(next_pages) == 1
+
+    games, reason = download(spider=spider, corpus=corpus, requests=products)
+    assert (len(games), reason) == (3, "max_items")
+
+    # Ответы на уже отправленные запросы предметов не добавляют, а поиск дальше не идет
+    remaining = products[products.index(next(request for request in products if get_app_id(url=request.url) == games[-1]["app_id"])) + 1:]
+    assert download(spider=spider, corpus=corpus, requests=remaining) == ([], None)
+    assert search(spider=spider, corpus=corpus, page=2) == ([], [])
+
+
+def test_spent_budget_stops_listing_rest_of_page(corpus):
+    spider = form_spider(MAX_ITEMS=3)
+    products, _ = search(spider=spider, corpus=corpus, page=1)
+    download(spider=spider, corpus=corpus, requests=products)
+
+    # Страница поиска, загруженная после исчерпания бюджета, продуктов не запрашивает
+    assert search(spider=spider, corpus=corpus, page=1) == ([], [])
+
+
+def test_budgets_of_batch_queries_are_separate(corpus):
+    spider = form_spider(BATCH_QUERIES=[
+        {"QUERY": "zombie", "FILENAME": "two", "MAX_ITEMS": 2},
+        {"QUERY": "zombie", "FILENAME": "five", "MAX_ITEMS": 5},
+    ])
+    products, _ = search(spider=spider, corpus=corpus, page=1, query=0)
+    search(spider=spider, corpus=corpus, page=1, query=1)
+
+    games, reason = download(spider=spider, corpus=corpus, requests=products)
+
+    assert [game["output"] for game in games].count("two") == 2
+    assert [game["output"] for game in games].count("five") == 5
+    assert reason == "max_items"  # Бюджеты всех запросов исчерпаны
+
+
+def test_spent_batch_query_stops_only_its_search(corpus):
+    spider = form_spider(BATCH_QUERIES=[
+        {"QUERY": "zombie", "FILENAME": "two", "MAX_ITEMS": 2},
+        {"QUERY": "zombie", "FILENAME": "all"},
+    ])
+    products, _ = search(spider=spider, corpus=corpus, page=1, query=0)
+    games, reason = download(spider=spider, corpus=corpus, requests=products)
+    assert reason is None  # Бюджет второго запроса не ограничен
+
+    assert search(spider=spider, corpus=corpus, page=2, query=0) == ([], [])
+    products, next_pages = search(spider=spider, corpus=corpus, page=2, query=1)
+    assert len(products) == 25 and len(next_pages) == 1
+
+
+def test_max_results_limits_listed_results(corpus):
+    spider = form_spider(MAX_RESULTS=30)
+    products, next_pages = search(spider=spider, corpus=corpus, page=1)
+    assert (len(products), [request.meta["page"] for request in next_pages]) == (25, [2])
+
+    products, next_pages = search(spider=spider, corpus=corpus, page=2)
+    assert (len(products), next_pages) == (5, [])
@@ -0,0 +1,120 @@
+"""
+Постоянный кэш ответов (SteamCrawlerDownloaderMiddleware): время жизни записей по классам ссылок, перепроверка
+устаревших записей условным запросом, ключ "класс ссылки + id продукта + язык" и поврежденные записи.
+"""
+from typing import Any, Tuple
+
+from scrapy import Request
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.test import get_crawler
+
+from steam_crawler.middlewares import SteamCrawlerDownloaderMiddleware
+
+import gzip
+import pytest
+import time
+
+
+PRODUCT_URL = "https://store.steampowered.com/app/550/"
+APPDETAILS_URL = "https://store.steampowered.com/api/appdetails?l=english&appids=550"
+SEARCH_URL = "https://store.steampowered.com/search/?term=zombie&page=1"
+
+TTLS = {"search": 60, "api": 600, "app": 3600}
+
+
+def form_middleware(tmp_path) -> Tuple[SteamCrawlerDownloaderMiddleware, Any]:
+    crawler = get_crawler(settings_dict={"STEAM_CACHE_ENABLED": True, "STEAM_CACHE_DIR": str(tmp_path), "STEAM_CACHE_TTL": TTLS})
+    crawler.stats.open_spider()
+    return SteamCrawlerDownloaderMiddleware.from_crawler(crawler), crawler.stats
+
+
+def download(middleware: SteamCrawlerDownloaderMiddleware, url: str, body: bytes = b"<html>page</html>", status: int = 200, **headers: str) -> Response:
+    # Запрос через кэш: ответ из кэша или ответ "сервера" после process_response
+    request = Request(url=url)
+    response = middleware.process_request(request)
+    if response is not None:
+        return response
+
+    response = HtmlResponse(url=url, status=status, headers=headers, body=body, request=request)
+    return middleware.process_response(request, response)
+
+
+def shift_time(monkeypatch, seconds: float) -> None:
+    now = time.time() + seconds
+    monkeypatch.setattr(time, "time", lambda: now)
+
+
+@pytest.mark.parametrize("url, url_class", [(SEARCH_URL, "search"), (APPDETAILS_URL, "api"), (PRODUCT_URL, "app")])
+def test_entries_live_for_their_url_class_ttl(tmp_path, monkeypatch, url, url_class):
+    middleware, stats = form_middleware(tmp_path=tmp_path)
+    download(middleware=middleware, url=url)
+
+    shift_time(monkeypatch=monkeypatch, seconds=TTLS[url_class] - 5)
+    assert "steam_cache" in middleware.process_request(Request(url=url)).flags
+
+    shift_time(monkeypatch=monkeypatch, seconds=TTLS[url_class] + 5)
+    assert middleware.process_request(Request(url=url)) is None
+    assert (stats.get_value("steam_cache/store"), stats.get_value("steam_cache/hit")) == (1, 1)
+
+
+def test_uncached_url_classes_pass_through(tmp_path):
+    middleware, stats = form_middleware(tmp_path=tmp_path)
+    download(middleware=middleware, url="https://store.steampowered.com/bundle/1/")
+
+    assert list(tmp_path.iterdir()) == []
+    assert stats.get_value("steam_cache/miss") is None
+
+
+def test_stale_entry_is_revalidated_with_304(tmp_path, monkeypatch):
+    middleware, stats = form_middleware(tmp_path=tmp_path)
+    download(middleware=middleware, url=PRODUCT_URL, body=b"<html>cached</html>", ETag='"v1"', **{"Last-Modified": "Mon, 16 Nov 2009 00:00:00 GMT"})
+    shift_time(monkeypatch=monkeypatch, seconds=TTLS["app"] + 5)
+
+    request = Request(url=PRODUCT_URL)
+    assert middleware.process_request(request) is None
+    assert request.headers[b"If-None-Match"] == b'"v1"'
+    assert request.headers[b"If-Modified-Since"] == b"Mon, 16 Nov 2009 00:00:00 GMT"
+
+    # 304 без тела заменяется сохраненным ответом, и запись снова свежая
+    response = middleware.process_response(request, Response(url=PRODUCT_URL, status=304, request=request))
+    assert (response.status, response.body, response.flags) == (200, b"<html>cached</html>", ["steam_cache"])
+    assert stats.get_value("steam_cache/revalidated") == 1
+    assert "steam_cache" in middleware.process_request(Request(url=PRODUCT_URL)).flags
+
+
+def test_changed_page_replaces_stale_entry(tmp_path, monkeypatch):
+    middleware, _ = form_middleware(tmp_path=tmp_path)
+    download(middleware=middleware, url=PRODUCT_URL, body=b"<html>old</html>", ETag='"v1"')
+    shift_time(monkeypatch=monkeypatch, seconds=TTLS["app"] + 5)
+
+    assert download(middleware=middleware, url=PRODUCT_URL, body=b"<html>new</html>", ETag='"v2"').body == b"<html>new</html>"
+    assert middleware.process_request(Request(url=PRODUCT_URL)).body == b"<html>new</html>"
+
+
+def test_key_is_url_class_app_id_and_locale(tmp_path):
+    middleware, _ = form_middleware(tmp_path=tmp_path)
+    download(middleware=middleware, url=PRODUCT_URL + "Left_4_Dead_2/?snr=1_7_7_151_150_1")
+    download(middleware=middleware, url=PRODUCT_URL + "?cc=de")
+    download(middleware=middleware, url=APPDETAILS_URL)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "api-550-english.pickle.gz",
+        "app-550-de.pickle.gz",
+        "app-550-default.pickle.gz",
+    ]
+    # Ссылки одного продукта с другим slug и snr - та же запись
+    assert "steam_cache" in middleware.process_request(Request(url=PRODUCT_URL)).flags
+
+
+@pytest.mark.parametrize("content", [b"not gzip at all", gzip.compress(b"not a pickle"), gzip.compress(b"\x80\x05truncated")[:-4]])
+def test_corrupt_entry_is_dropped(tmp_path, content):
+    middleware, stats = form_middleware(tmp_path=tmp_path)
+    path = tmp_path / "app-550-default.pickle.gz"
+    path.write_bytes(content)
+
+    assert middleware.process_request(Request(url=PRODUCT_URL)) is None
+    assert not path.exists()
+    assert stats.get_value("steam_cache/corrupt") == 1
+
+    download(middleware=middleware, url=PRODUCT_URL)
+    assert "steam_cache" in middleware.process_request(Request(url=PRODUCT_URL)).flags
@@ -0,0 +1,109 @@
+"""
+Настройки обхода (load_config): источники .toml, .json и .py, разбор аргументов паука (-a) поверх источника,
+наследование настроек запросами пакетного режима и отказ от противоречивых настроек.
+"""
+from pathlib import Path
+from typing import Any, Dict
+
+from steam_crawler.config import CrawlConfig, load_config
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import json
+import pytest
+
+
+SOURCES = {
+    "crawl.toml": 'FILENAME = "zombie"\nQUERY = "Zombie games"\nMAX_ITEMS = 50\nTURN_ON_TAGS_SETTINGS = true\nTAGS = ["Zombies", "Horror"]\n',
+    "crawl.json": json.dumps({"FILENAME": "zombie", "QUERY": "Zombie games", "MAX_ITEMS": 50, "TURN_ON_TAGS_SETTINGS": True, "TAGS": ["Zombies", "Horror"]}),
+    "crawl.py": 'FILENAME = "zombie"\nQUERY = "Zombie games"\nMAX_ITEMS = 50\nTURN_ON_TAGS_SETTINGS = True\nTAGS = ["Zombies", "Horror"]\nhelper = "ignored"\n',
+}
+
+
+def write_source(tmp_path: Path, name: str) -> str:
+    path = tmp_path / name
+    path.write_text(SOURCES[name], encoding="utf-8")
+    return str(path)
+
+
+def form_config(**values: Any) -> CrawlConfig:
+    return load_config(source=dict(FILENAME="zombie", **values))
+
+
+@pytest.mark.parametrize("name", list(SOURCES))
+def test_file_sources_give_same_config(tmp_path, name):
+    config = load_config(source=write_source(tmp_path=tmp_path, name=name))
+
+    assert config == CrawlConfig(
+        FILENAME="zombie",
+        QUERY="Zombie games",
+        MAX_ITEMS=50,
+        TURN_ON_TAGS_SETTINGS=True,
+        TAGS=frozenset({"Zombies", "Horror"}),
+    )
+
+
+def test_unsupported_source_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported config source"):
+        load_config(source=str(tmp_path / "crawl.yaml"))
+
+
+@pytest.mark.parametrize("name, value, expected", [
+    ("QUERY", "1984", "1984"),
+    ("MAX_ITEMS", "50", 50),
+    ("MAX_PRICE", "9.99", 9.99),
+    ("MAX_PRICE", "none", None),
+    ("INCREMENTAL", "true", True),
+    ("ALL_OF_TAGS", "0", False),
+    ("TAGS", "Zombies, Horror,", frozenset({"Zombies", "Horror"})),
+    ("TAGS", '["Zombies, Undead"]', frozenset({"Zombies, Undead"})),
+])
+def test_arguments_are_parsed(name, value, expected):
+    config = load_config(source=dict(FILENAME="zombie"), overrides={name: value})
+    assert getattr(config, name) == expected
+
+
+@pytest.mark.parametrize("name, value, message", [
+    ("INCREMENTAL", "yes", "INCREMENTAL must be a boolean"),
+    ("MAX_ITEMS", "fifty", "MAX_ITEMS must be a number"),
+])
+def test_malformed_arguments_are_rejected(name, value, message):
+    with pytest.raises(ValueError, match=message):
+        load_config(source=dict(FILENAME="zombie"), overrides={name: value})
+
+
+def test_spider_arguments_override_source(tmp_path):
+    spider = SteamGameSpider(config=write_source(tmp_path=tmp_path, name="crawl.toml"), MAX_ITEMS="10", TAGS="Horror")
+
+    assert (spider.config.QUERY, spider.config.MAX_ITEMS, spider.config.TAGS) == ("Zombie games", 10, frozenset({"Horror"}))
+
+
+def test_batch_queries_inherit_settings():
+    config = form_config(MAX_ITEMS=50, BATCH_QUERIES=[{"FILENAME": "horror", "QUERY": "horror"}, {"FILENAME": "all", "MAX_ITEMS": 5}])
+
+    assert [(query.FILENAME, query.QUERY, query.MAX_ITEMS) for query in config.BATCH_QUERIES] == [("horror", "horror", 50), ("all", None, 5)]
+    assert all(query.BATCH_QUERIES is None for query in config.BATCH_QUERIES)
+
+
+@pytest.mark.parametrize("values, message", [
+    ({"UNKNOWN": 1}, "Unknown settings: UNKNOWN"),
+    ({"FILENAME": ""}, "FILENAME is required"),
+    ({"TAGS": "Zombies"}, "TAGS must be a list of labels"),
+    ({"OUTPUT_FORMAT": "xml"}, "OUTPUT_FORMAT must be one of"),
+    ({"SEARCH_BACKEND": "api"}, "SEARCH_BACKEND must be one of"),
+    ({"PRODUCT_BACKEND": "json"}, "PRODUCT_BACKEND must be one of"),
+    ({"SEARCH_ORDER": "name"}, "SEARCH_ORDER must be one of"),
+    ({"MAX_ITEMS": 0}, "MAX_ITEMS must be positive"),
+    ({"MAX_RESULTS": -1}, "MAX_RESULTS must be positive"),
+    ({"INCREMENTAL": True, "MAX_ITEMS": 10}, "INCREMENTAL mode does not support MAX_RESULTS and MAX_ITEMS"),
+    ({"SEARCH_BATCH_SIZE": 0}, "SEARCH_BATCH_SIZE must be positive"),
+    ({"SINCE_PAGE": 0}, "SINCE_PAGE must be at least 1"),
+    ({"SINCE_PAGE": 3, "TILL_PAGE": 2}, "SINCE_PAGE must not exceed TILL_PAGE"),
+    ({"MIN_PRICE": 10, "MAX_PRICE": 5}, "MIN_PRICE must not exceed MAX_PRICE"),
+    ({"SINCE_RELEASE_YEAR": 2020, "TILL_RELEASE_YEAR": 2010}, "SINCE_RELEASE_YEAR must not exceed TILL_RELEASE_YEAR"),
+    ({"INCREMENTAL": True, "BATCH_QUERIES": [{"FILENAME": "horror"}]}, "INCREMENTAL mode does not support BATCH_QUERIES"),
+    ({"BATCH_QUERIES": [{"FILENAME": "horror"}, {"FILENAME": "horror"}]}, "needs its own FILENAME"),
+    ({"BATCH_QUERIES": [{"FILENAME": "horror", "MAX_ITEMS": 0}]}, "MAX_ITEMS must be positive"),
+])
+def test_invalid_settings_are_rejected(values: Dict[str, Any], message: str):
+    with pytest.raises(ValueError, match=message):
+        load_config(source=dict(dict(FILENAME="zombie"), **values))
@@ -0,0 +1,126 @@
+"""
+Выгрузки с типизированной схемой: SteamCrawlerParquetPipeline записывает предметы в FILENAME.parquet,
+из которого они читаются теми же типизированными записями, в пакетном режиме - в файл каждого запроса;
+SteamCrawlerSQLitePipeline обновляет в FILENAME.sqlite3 изменившийся продукт, а не добавляет его снова.
+"""
+from datetime import date
+from typing import Any, Dict, List
+
+from scrapy.utils.test import get_crawler
+
+from steam_crawler.config import load_config
+from steam_crawler.items import Game
+from steam_crawler.pipelines import SteamCrawlerParquetPipeline, SteamCrawlerSQLitePipeline
+from steam_crawler.query import load_records
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import pytest
+import sqlite3
+
+
+def form_game(app_id: str, **fields: Any) -> Game:
+    return Game(dict({
+        "app_id": app_id,
+        "name": f"Game {app_id}",
+        "price": "499 RUB",
+        "category": "All Games",
+        "genres": ["Action"],
+        "tags": ["Zombies", "Co-op"],
+        "overall": "Very Positive",
+        "reviews_count": "1,234",
+        "release_date": "17 Nov, 2009",
+        "developers": ["Valve"],
+        "publishers": ["Valve"],
+        "franchises": [],
+        "platforms": ["Windows", "Linux"],
+        "languages": ["English"],
+    }, **fields))
+
+
+def form_record(app_id: str, **fields: Any) -> Dict[str, Any]:
+    return dict({
+        "app_id": app_id,
+        "name": f"Game {app_id}",
+        "price": 499.0,
+        "currency": "RUB",
+        "category": "All Games",
+        "genres": ["Action"],
+        "tags": ["Zombies", "Co-op"],
+        "overall": "Very Positive",
+        "reviews_count": 1234,
+        "release_date": date(2009, 11, 17),
+        "developers": ["Valve"],
+        "publishers": ["Valve"],
+        "franchises": [],
+        "platforms": ["Windows", "Linux"],
+        "languages": ["English"],
+    }, **fields)
+
+
+def form_spider(pipeline_class: type, filename: str, **settings: Any):
+    crawler = get_crawler(SteamGameSpider, settings_dict=settings)
+    spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME=filename)))
+    return spider, pipeline_class.from_crawler(crawler)
+
+
+def test_parquet_round_trip_keeps_types(tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    spider, pipeline = form_spider(SteamCrawlerParquetPipeline, str(tmp_path / "zombie"), PARQUET_EXPORT_ENABLED=True, PARQUET_ROW_GROUP_SIZE=2)
+
+    for game in [form_game("550"), form_game("500", price="9,99 EUR", reviews_count="", release_date="Coming soon", franchises=["Left 4 Dead"]), form_game("1623730")]:
+        pipeline.process_item(game, spider)
+    pipeline.close_spider(spider)
+
+    table = pyarrow_parquet.read_table(tmp_path / "zombie.parquet")
+    assert table.schema == SteamCrawlerParquetPipeline.get_schema()
+    assert pyarrow_parquet.ParquetFile(tmp_path / "zombie.parquet").num_row_groups == 2
+    assert table.to_pylist() == [
+        form_record("550"),
+        form_record("500", price=9.99, currency="EUR", reviews_count=0, release_date=None, franchises=["Left 4 Dead"]),
+        form_record("1623730"),
+    ]
+
+
+def test_parquet_batch_queries_get_own_files(tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    spider, pipeline = form_spider(SteamCrawlerParquetPipeline, str(tmp_path / "batch"), PARQUET_EXPORT_ENABLED=True)
+
+    pipeline.process_item(form_game("550", output=str(tmp_path / "all")), spider)
+    pipeline.process_item(form_game("500", output=str(tmp_path / "horror")), spider)
+    pipeline.close_spider(spider)
+
+    assert [row["app_id"] for row in pyarrow_parquet.read_table(tmp_path / "all.parquet").to_pylist()] == ["550"]
+    assert [row["app_id"] for row in pyarrow_parquet.read_table(tmp_path / "horror.parquet").to_pylist()] == ["500"]
+    assert not (tmp_path / "batch.parquet").exists()
+
+
+def sort_labels(record: Dict[str, Any]) -> Dict[str, Any]:
+    # Порядок меток в таблицах связей не задан
+    return {name: sorted(value) if isinstance(value, list) else value for name, value in record.items()}
+
+
+def read_database(path: str) -> List[Dict[str, Any]]:
+    return [sort_labels(record=record) for record in sorted(load_records(path=path), key=lambda record: record["app_id"])]
+
+
+def test_sqlite_updates_changed_game(tmp_path):
+    path = str(tmp_path / "zombie.sqlite3")
+    spider, pipeline = form_spider(SteamCrawlerSQLitePipeline, str(tmp_path / "zombie"), SQLITE_EXPORT_ENABLED=True, SQLITE_BATCH_SIZE=2)
+
+    # Изменившийся продукт попадает в пачку, следующую за уже записанной
+    for game in [form_game("550"), form_game("500"), form_game("550", price="99 RUB", tags=["Zombies", "Horror"])]:
+        pipeline.process_item(game, spider)
+    pipeline.close_spider(spider)
+
+    expected = [form_record("500"), form_record("550", price=99.0, tags=["Zombies", "Horror"])]
+    assert read_database(path=path) == [sort_labels(record=record) for record in expected]
+
+    # Повторный обход в ту же базу: продукт обновляется, связи с метками пересоздаются
+    spider, pipeline = form_spider(SteamCrawlerSQLitePipeline, str(tmp_path / "zombie"), SQLITE_EXPORT_ENABLED=True)
+    pipeline.process_item(form_game("550", reviews_count="2,000", tags=["Co-op"], platforms=["Windows"]), spider)
+    pipeline.close_spider(spider)
+
+    assert read_database(path=path)[1] == sort_labels(record=form_record("550", reviews_count=2000, tags=["Co-op"], platforms=["Windows"]))
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM games").fetchone() == (2,)
+        assert connection.execute("SELECT COUNT(*) FROM game_tags WHERE app_id = '550'").fetchone() == (1,)
@@ -0,0 +1,91 @@
+"""
+Пул процессов разбора (EXTRACTION_POOL_ENABLED): страница, разобранная в рабочем процессе, дает те же поля
+и тот же предмет, что и разбор в процессе паука, а по сигналу spider_closed пул останавливает рабочие процессы.
+Страницы берутся из корпуса локального сервера-заменителя (benchmarks/corpus.py).
+"""
+from typing import Any, Dict, List
+
+from scrapy import Request, signals
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import Corpus
+from steam_crawler.config import load_config
+from steam_crawler.extraction import ExtractionPool, extract_product
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import asyncio
+import multiprocessing
+import pytest
+
+
+STORE_URL = "https://store.steampowered.com"
+POOL_SETTINGS = {"EXTRACTION_POOL_ENABLED": True, "EXTRACTION_POOL_PROCESSES": 1}
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Corpus:
+    return Corpus(store_url=STORE_URL, filler=False)
+
+
+def get_pages(corpus: Corpus) -> List[str]:
+    # По продукту каждого вида: дополнения, саундтреки и не вышедшие продукты паук отбрасывает, игры (в том числе
+    # без обзоров) - нет; игры идут последними
+    products = dict()
+    for product in corpus.get_products():
+        products.setdefault(product.variant, product)
+
+    return [corpus.get_product_page(app_id=product.app_id).decode("utf-8") for product in products.values()]
+
+
+def test_pool_matches_in_process_extraction(corpus):
+    pages = get_pages(corpus=corpus)
+    config = load_config(source=dict(FILENAME="zombie", TURN_ON_TAGS_SETTINGS=True, TAGS=["Multiplayer"]))
+    pool = ExtractionPool.from_crawler(get_crawler(settings_dict=POOL_SETTINGS))
+
+    async def extract(page: str, settings: Any) -> Dict[str, Any] | None:
+        return await pool.extract(page=page, parser="html.parser", settings=settings)
+
+    async def extract_all() -> List[Dict[str, Any] | None]:
+        return await asyncio.gather(*(extract(page=page, settings=settings) for page in pages for settings in (None, config)))
+
+    try:
+        fields = asyncio.run(extract_all())
+    finally:
+        pool.close()
+
+    assert fields == [extract_product(page=page, parser="html.parser", settings=settings) for page in pages for settings in (None, config)]
+    assert any(entry is None for entry in fields) and any(entry is not None for entry in fields)
+
+
+def test_parse_in_pool_matches_parse(corpus):
+    crawler = get_crawler(SteamGameSpider, settings_dict=POOL_SETTINGS)
+    spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME="zombie")))
+    responses = list()
+    for product in corpus.get_products()[:25]:
+        url = corpus.get_product_url(product=product)
+        responses.append(HtmlResponse(url=url, body=corpus.get_product_page(app_id=product.app_id), request=Request(url=url)))
+
+    async def parse_all() -> List[Dict[str, Any]]:
+        return [dict(game) for response in responses async for game in spider.parse_in_pool(response)]
+
+    try:
+        games = asyncio.run(parse_all())
+    finally:
+        crawler.signals.send_catch_log(signal=signals.spider_closed, spider=spider, reason="finished")
+
+    assert games and games == [dict(game) for response in responses for game in spider.parse(response)]
+
+
+def test_pool_shuts_down_on_spider_closed(corpus):
+    crawler = get_crawler(settings_dict=POOL_SETTINGS)
+    pool = ExtractionPool.from_crawler(crawler)
+    page = get_pages(corpus=corpus)[-1]
+    assert asyncio.run(pool.extract(page=page, parser="html.parser", settings=None)) is not None
+    assert multiprocessing.active_children()
+
+    crawler.signals.send_catch_log(signal=signals.spider_closed, spider=None, reason="finished")
+
+    assert multiprocessing.active_children() == []
+    with pytest.raises(RuntimeError):
+        asyncio.run(pool.extract(page=page, parser="html.parser", settings=None))
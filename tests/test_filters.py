@@ -0,0 +1,110 @@
+"""
+Проверки фильтров: год выхода в форматах дат Steam разных локалей, граница упорядоченной выдачи, фильтры строк поиска
+и параметры, которыми фильтры сужают поиск Steam (SEARCH_FILTERS_PUSHDOWN).
+"""
+from steam_crawler.config import load_config
+from steam_crawler.filters import (
+    form_candidate_filters_plan,
+    form_filters_plan,
+    form_search_parameters,
+    get_release_year,
+    is_past_search_order_bound,
+    is_required_game,
+)
+from steam_crawler.search import SearchCandidate
+
+import pytest
+import steam_crawler.filters as filters
+
+
+@pytest.mark.parametrize("release_date, year", [
+    ("16 Nov, 2009", 2009),
+    ("Nov 16, 2009", 2009),
+    ("Nov 2009", 2009),
+    ("16 November, 2009", 2009),
+    ("2009", 2009),
+    (" Nov 16, 2009 ", 2009),
+    ("Coming soon", None),
+    ("To be announced", None),
+    ("Q1 2025", None),
+    ("", None),
+])
+def test_get_release_year(release_date, year):
+    assert get_release_year(release_date) == year
+
+
+def form_candidate(release_date: str | None) -> SearchCandidate:
+    return SearchCandidate(
+        url="https://store.steampowered.com/app/550/",
+        price=None,
+        release_date=release_date,
+        platforms=[],
+        review_summary=None,
+        reviews_count=None,
+    )
+
+
+def test_release_filters_accept_us_locale_dates():
+    config = load_config(source=dict(FILENAME="filters", TURN_ON_RELEASE_SETTINGS=True, SINCE_RELEASE_YEAR=2010, SEARCH_ORDER="release"))
+
+    (_, is_required_candidate), = form_candidate_filters_plan(settings=config)
+    assert not is_required_candidate(form_candidate(release_date="Nov 16, 2009"))
+    assert is_required_candidate(form_candidate(release_date="Jan 19, 2024"))
+    assert is_required_candidate(form_candidate(release_date="Coming soon"))  # Данных нет: решит страница продукта
+
+    (_, is_required_date), = form_filters_plan(settings=config)
+    assert not is_required_date("Nov 16, 2009")
+
+    candidates = [form_candidate(release_date="Jan 19, 2024"), form_candidate(release_date="Nov 16, 2009")]
+    assert is_past_search_order_bound(candidates=candidates, settings=config)
+
+
+def form_search_config(**overrides):
+    return load_config(source=dict(FILENAME="filters", **overrides))
+
+
+@pytest.mark.parametrize("max_price, parameter", [(0, "free"), (0.0, "free"), (9.99, "10"), (10, "10"), (10.01, "11")])
+def test_max_price_is_rounded_up(max_price, parameter):
+    config = form_search_config(TURN_ON_PRICE_SETTINGS=True, MIN_PRICE=None, MAX_PRICE=max_price)
+    assert form_search_parameters(settings=config) == [("maxprice", parameter)]
+
+
+def test_search_parameters_of_enabled_filters():
+    config = form_search_config(
+        TURN_ON_TAGS_SETTINGS=True, ALL_OF_TAGS=True, TAGS=["Zombies", "Survival", "Unknown tag"],
+        TURN_ON_LANGUAGE_SETTINGS=True, ALL_OF_LANGUAGES=False, LANGUAGES=["Russian"],
+        TURN_ON_OS_SETTINGS=True, ALL_OF_OS=True, PLATFORMS=["Windows", "SteamOS + Linux"],
+        TURN_ON_PRICE_SETTINGS=True, MAX_PRICE=None,
+    )
+
+    assert form_search_parameters(settings=config) == [
+        ("tags", "1659,1662"),  # Неизвестного словарю тэга в поиске нет: его проверит страница продукта
+        ("supportedlang", "russian"),
+        ("os", "linux,win"),
+    ]
+
+
+def test_any_of_several_labels_is_not_pushed_down():
+    config = form_search_config(
+        TURN_ON_TAGS_SETTINGS=True, ALL_OF_TAGS=False, TAGS=["Zombies", "Survival"],
+        TURN_ON_LANGUAGE_SETTINGS=True, ALL_OF_LANGUAGES=False, LANGUAGES=["Russian", "English"],
+        TURN_ON_OS_SETTINGS=True, ALL_OF_OS=False, PLATFORMS=["Windows", "macOS"],
+    )
+
+    assert form_search_parameters(settings=config) == []
+
+
+def test_disabled_filters_add_no_parameters():
+    config = form_search_config(TAGS=["Zombies"], LANGUAGES=["Russian"], PLATFORMS=["Windows"], MAX_PRICE=10)
+    assert form_search_parameters(settings=config) == []
+
+
+def test_filters_plan_is_built_once_per_config(monkeypatch):
+    calls = list()
+    form_plan = filters.form_filters_plan
+    monkeypatch.setattr(filters, "form_filters_plan", lambda settings: calls.append(settings) or form_plan(settings=settings))
+    config = form_search_config(TURN_ON_PRICE_SETTINGS=True, MIN_PRICE=None, MAX_PRICE=10)
+
+    assert is_required_game(game={"price": "9.99 EUR"}, settings=config)
+    assert not is_required_game(game={"price": "19.99 EUR"}, settings=config)
+    assert calls == [config]
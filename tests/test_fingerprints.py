@@ -0,0 +1,114 @@
+"""
+Отпечатки запросов (SteamRequestFingerprinter) и возобновление обхода из JOBDIR: ссылки одного продукта,
+различающиеся названием в пути и параметром snr, дают один отпечаток, а возобновленный пакетный обход
+не загружает снова продукты, уже запрошенные или собранные до остановки.
+"""
+from typing import List
+
+from scrapy import Request
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.extensions.spiderstate import SpiderState
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import Corpus
+from steam_crawler.appdetails import get_app_id
+from steam_crawler.config import load_config
+from steam_crawler.fingerprints import SteamRequestFingerprinter
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import pytest
+
+
+STORE_URL = "https://store.steampowered.com"
+SEARCH_URL = f"{STORE_URL}/search/?term=zombie"
+PRODUCT_URL = f"{STORE_URL}/app/550/"
+
+QUERIES = [
+    {"QUERY": "zombie", "FILENAME": "all"},
+    {"QUERY": "zombie", "FILENAME": "multiplayer", "TURN_ON_TAGS_SETTINGS": True, "TAGS": ["Multiplayer"]},
+]
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Corpus:
+    return Corpus(store_url=STORE_URL, filler=False)
+
+
+def fingerprint(url: str) -> bytes:
+    return SteamRequestFingerprinter.from_crawler(get_crawler()).fingerprint(Request(url=url))
+
+
+@pytest.mark.parametrize("url", [
+    f"{STORE_URL}/app/550/Left_4_Dead_2/",
+    f"{STORE_URL}/app/550/Left_4_Dead_2/?snr=1_7_7_151_150_1",
+    f"{STORE_URL}/app/550/?snr=1_7_7_151_150_2",
+    f"{STORE_URL}/app/550",
+])
+def test_product_urls_share_fingerprint(url):
+    assert fingerprint(url) == fingerprint(PRODUCT_URL)
+
+
+@pytest.mark.parametrize("url", [
+    f"{STORE_URL}/app/500/Left_4_Dead/",
+    f"{STORE_URL}/sub/550/",
+    f"{STORE_URL}/app/550/?l=russian",
+    f"{SEARCH_URL}&snr=1_7_7_151_150_1",
+])
+def test_other_urls_keep_fingerprint(url):
+    assert fingerprint(url) != fingerprint(PRODUCT_URL)
+
+
+def test_seen_product_is_filtered_after_resume(tmp_path):
+    fingerprinter = SteamRequestFingerprinter.from_crawler(get_crawler())
+    dupefilter = RFPDupeFilter(path=str(tmp_path), fingerprinter=fingerprinter)
+    assert not dupefilter.request_seen(Request(url=f"{STORE_URL}/app/550/Left_4_Dead_2/?snr=1_7_7_151_150_1"))
+    dupefilter.close("shutdown")
+
+    # Отпечатки загруженных запросов сохранены в JOBDIR: тот же продукт с другой страницы поиска не загружается
+    dupefilter = RFPDupeFilter(path=str(tmp_path), fingerprinter=fingerprinter)
+    assert dupefilter.request_seen(Request(url=f"{STORE_URL}/app/550/Left_4_Dead_2/?snr=1_7_7_151_150_2"))
+    dupefilter.close("finished")
+
+
+def open_spider(jobdir: str) -> SteamGameSpider:
+    # Паук, чье состояние расширение SpiderState загрузило из JOBDIR
+    crawler = get_crawler(SteamGameSpider, settings_dict={"JOBDIR": jobdir})
+    spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME="batch", BATCH_QUERIES=QUERIES)))
+    SpiderState(jobdir=jobdir).spider_opened(spider)
+    return spider
+
+
+def list_products(spider: SteamGameSpider, corpus: Corpus, query: int, page: int) -> List[Request]:
+    request = Request(url=f"{SEARCH_URL}&page={page}", meta={"query": query, "page": page})
+    response = HtmlResponse(url=request.url, body=corpus.get_search_page(page=page), request=request)
+    return [request for request in spider.parse_search_page(response) if request.callback is None]
+
+
+def download(spider: SteamGameSpider, corpus: Corpus, requests: List[Request]) -> List[str]:
+    games = list()
+    for request in requests:
+        body = corpus.get_product_page(app_id=int(get_app_id(url=request.url)))
+        games.extend(spider.parse(HtmlResponse(url=request.url, body=body, request=request)))
+
+    return [game["output"] for game in games]
+
+
+def test_resumed_batch_skips_listed_and_scraped_products(tmp_path, corpus):
+    jobdir = str(tmp_path)
+    spider = open_spider(jobdir=jobdir)
+    requests = list_products(spider=spider, corpus=corpus, query=0, page=1)
+    download(spider=spider, corpus=corpus, requests=requests[:10])
+    SpiderState(jobdir=jobdir).spider_closed(spider)  # Остановка: 15 страниц продуктов еще не загружены
+
+    spider = open_spider(jobdir=jobdir)
+    assert spider.state["scraped"] and spider.state["listed"]
+
+    # Та же выдача первого запроса: собранные продукты уже в его файле, остальные уже запрошены
+    assert list_products(spider=spider, corpus=corpus, query=0, page=1) == []
+
+    # Второй запрос снова загружает лишь собранные продукты, удовлетворяющие его фильтрам, и лишь для себя
+    requests = list_products(spider=spider, corpus=corpus, query=1, page=1)
+    assert requests and all(request.dont_filter for request in requests)
+    assert set(download(spider=spider, corpus=corpus, requests=requests)) == {"multiplayer"}
+    assert list_products(spider=spider, corpus=corpus, query=1, page=1) == []
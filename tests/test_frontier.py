@@ -0,0 +1,257 @@
+"""
+Распределенный обход (FRONTIER_ENABLED): выдача задач SqliteFrontierStore, запись запомненных изменений,
+завершение процессов, ожидание остановившегося посреди обхода процесса и объединение частей выходного файла,
+в том числе при повторном запуске завершенного обхода.
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+
+from scrapy.utils.test import get_crawler
+
+from steam_crawler.config import load_config
+from steam_crawler.frontier import FrontierStore, FrontierTask, SqliteFrontierStore
+
+import steam_crawler.frontier as frontier
+from steam_crawler.items import Game
+from steam_crawler.pipelines import SteamCrawlerParquetPipeline, SteamCrawlerPipeline, SteamCrawlerSQLitePipeline
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import json
+import pytest
+import time
+
+
+def form_task(key: str) -> FrontierTask:
+    return FrontierTask(key=key, request={"url": f"https://store.steampowered.com/{key}/"})
+
+
+def form_game(app_id: str) -> Game:
+    return Game(app_id=app_id, name=f"Game {app_id}")
+
+
+class Worker(object):
+    # Процесс распределенного обхода: паук со своим фронтиром и SteamCrawlerPipeline
+
+    def __init__(self, filename: str, name: str) -> None:
+        crawler = get_crawler(SteamGameSpider, settings_dict={
+            "FRONTIER_ENABLED": True,
+            "FRONTIER_STORE": "steam_crawler.frontier.SqliteFrontierStore",
+            "FRONTIER_WORKER": name,
+        })
+        self.spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME=filename)))
+        self.pipeline = SteamCrawlerPipeline.from_crawler(crawler)
+        self.pipeline.open_spider(self.spider)
+
+    def scrape(self, app_ids: List[str]) -> None:
+        for app_id in app_ids:
+            self.pipeline.process_item(form_game(app_id=app_id), self.spider)
+
+    def close(self) -> None:
+        self.pipeline.close_spider(self.spider)
+
+
+def read_lines(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_frontier_store_is_abstract():
+    with pytest.raises(TypeError):
+        FrontierStore()
+
+
+def test_tasks_are_claimed_once_and_completed(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    first = SqliteFrontierStore(path=path, worker="first")
+    second = SqliteFrontierStore(path=path, worker="second")
+
+    first.add(tasks=[form_task("search/0/1"), form_task("product/app/550")])
+    first.flush()
+    second.add(tasks=[form_task("product/app/550")])
+
+    assert [task.key for task in first.claim(limit=1)] == ["search/0/1"]
+    assert [task.key for task in second.claim(limit=16)] == ["product/app/550"]
+    assert first.claim(limit=16) == []
+
+    first.complete(key="search/0/1")
+    assert not first.is_drained()
+    second.complete(key="product/app/550")
+    second.flush()
+    assert first.is_drained()
+
+
+def test_stale_claims_are_handed_out_again(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    first = SqliteFrontierStore(path=path, worker="first")
+    second = SqliteFrontierStore(path=path, worker="second", claim_timeout=-1.0)
+
+    first.add(tasks=[form_task("search/0/1")])
+    task = first.claim(limit=1)[0]
+
+    assert second.claim(limit=1) == [task]
+
+
+def test_last_worker_unregisters(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    first = SqliteFrontierStore(path=path, worker="first")
+    second = SqliteFrontierStore(path=path, worker="second")
+
+    assert not first.unregister()
+    assert second.unregister()
+
+    second.drop()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_last_worker_merges_parts_and_drops_frontier(tmp_path):
+    filename = str(tmp_path / "zombie")
+    first, second = Worker(filename=filename, name="first"), Worker(filename=filename, name="second")
+
+    first.scrape(app_ids=["550", "500"])
+    second.scrape(app_ids=["500", "1623730"])
+    first.close()
+    assert not (tmp_path / "zombie.jsonl").exists()
+
+    second.close()
+    assert [game["app_id"] for game in read_lines(tmp_path / "zombie.jsonl")] == ["550", "500", "1623730"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["zombie.jsonl"]
+
+
+def test_rerun_of_finished_crawl_keeps_output(tmp_path):
+    filename = str(tmp_path / "zombie")
+    worker = Worker(filename=filename, name="first")
+    worker.scrape(app_ids=["550"])
+    worker.close()
+    output = (tmp_path / "zombie.jsonl").read_text()
+
+    # Повторный запуск, не собравший ни одного продукта, не затирает выходной файл пустым
+    Worker(filename=filename, name="first").close()
+
+    assert (tmp_path / "zombie.jsonl").read_text() == output
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["zombie.jsonl"]
+
+
+def test_interrupted_crawl_keeps_parts_and_frontier(tmp_path):
+    filename = str(tmp_path / "zombie")
+    worker = Worker(filename=filename, name="first")
+    worker.spider.frontier.add(tasks=[form_task("search/0/2")])
+    worker.scrape(app_ids=["550"])
+    worker.close()
+
+    assert not (tmp_path / "zombie.jsonl").exists()
+    assert (tmp_path / "zombie.first.part.jsonl").exists()
+
+    # Повторный запуск выполняет оставшиеся задачи и объединяет части обоих запусков
+    worker = Worker(filename=filename, name="second")
+    for task in worker.spider.frontier.claim(limit=16):
+        worker.spider.frontier.complete(key=task.key)
+    worker.scrape(app_ids=["500"])
+    worker.close()
+
+    assert [game["app_id"] for game in read_lines(tmp_path / "zombie.jsonl")] == ["550", "500"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["zombie.jsonl"]
+
+
+@pytest.mark.parametrize("pipeline_class, setting", [
+    (SteamCrawlerParquetPipeline, "PARQUET_EXPORT_ENABLED"),
+    (SteamCrawlerSQLitePipeline, "SQLITE_EXPORT_ENABLED"),
+])
+def test_exports_without_parts_are_rejected(pipeline_class, setting):
+    crawler = get_crawler(SteamGameSpider, settings_dict={"FRONTIER_ENABLED": True, setting: True})
+    with pytest.raises(ValueError, match="FRONTIER_ENABLED"):
+        pipeline_class.from_crawler(crawler)
+
+
+def test_changes_are_written_together_on_flush(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    first = SqliteFrontierStore(path=path, worker="first")
+    second = SqliteFrontierStore(path=path, worker="second")
+    first.add(tasks=[form_task("search/0/1")])
+    first.flush()
+    task, = second.claim(limit=1)
+
+    # Задача и порожденная ею задача попадают во фронтир одной транзакцией
+    second.add(tasks=[form_task("search/0/2")])
+    second.complete(key=task.key)
+    assert first.claim(limit=16) == []
+    assert not first.is_drained()
+
+    second.flush()
+    assert [task.key for task in first.claim(limit=16)] == ["search/0/2"]
+
+
+def test_finished_worker_waits_for_dead_worker(tmp_path, monkeypatch):
+    path = str(tmp_path / "frontier.sqlite3")
+    alive = SqliteFrontierStore(path=path, worker="alive", claim_timeout=60.0)
+    dead = SqliteFrontierStore(path=path, worker="dead", claim_timeout=60.0)
+    alive.add(tasks=[form_task("search/0/1"), form_task("search/0/2")])
+    alive.flush()
+
+    # Процесс "dead" забрал задачу и остановился, не выполнив ее и не отметившись завершившимся
+    dead.claim(limit=1)
+    task, = alive.claim(limit=16)
+    alive.complete(key=task.key)
+    assert alive.claim(limit=16) == []
+    assert not alive.is_drained()
+
+    now = time.time() + 61
+    monkeypatch.setattr(frontier.time, "time", lambda: now)
+
+    # Истекшие задачи остановившегося процесса забирает живой, и лишь затем объединяет части выходного файла
+    task, = alive.claim(limit=16)
+    assert task.key == "search/0/1"
+    alive.complete(key=task.key)
+    assert alive.is_drained()
+    assert alive.finish()
+    assert alive.unregister()
+
+
+def test_finished_worker_waits_for_recently_seen_worker(tmp_path, monkeypatch):
+    path = str(tmp_path / "frontier.sqlite3")
+    alive = SqliteFrontierStore(path=path, worker="alive", claim_timeout=60.0)
+    idle = SqliteFrontierStore(path=path, worker="idle", claim_timeout=60.0)
+    idle.claim(limit=16)  # Остановился, не держа задач
+
+    assert alive.is_drained()
+    assert not alive.finish()
+
+    now = time.time() + 61
+    monkeypatch.setattr(frontier.time, "time", lambda: now)
+    assert alive.finish()
+    assert alive.unregister()
+
+
+def test_finished_workers_do_not_wait_for_each_other(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    first = SqliteFrontierStore(path=path, worker="first")
+    second = SqliteFrontierStore(path=path, worker="second")
+
+    assert not first.finish()
+    assert second.finish()
+    assert first.finish()
+
+    # Объединяет части только последний завершившийся
+    assert not first.unregister()
+    assert second.unregister()
+
+
+def test_unregistered_worker_returns_its_claims(tmp_path):
+    path = str(tmp_path / "frontier.sqlite3")
+    first = SqliteFrontierStore(path=path, worker="first")
+    second = SqliteFrontierStore(path=path, worker="second")
+    first.add(tasks=[form_task("search/0/1"), form_task("search/0/2")])
+    done, interrupted = first.claim(limit=16)
+    first.complete(key=done.key)
+
+    first.unregister()
+
+    assert second.claim(limit=16) == [interrupted]
+
+
+def test_store_does_nothing_after_unregister(tmp_path):
+    store = SqliteFrontierStore(path=str(tmp_path / "frontier.sqlite3"), worker="first")
+    store.unregister()
+
+    store.complete(key="search/0/1")
+    store.flush()
+    assert store.claim(limit=16) == []
+    assert not store.is_drained()
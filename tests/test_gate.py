@@ -0,0 +1,120 @@
+"""
+Проверка возраста и региональные ограничения (SteamGateMiddleware): cookies подтвержденного возраста и языка
+у каждого запроса, повтор после перенаправления на проверку возраста, повтор недоступной в регионе страницы
+с cc=STEAM_REGION_FALLBACK_CC и остановка после единственного повтора.
+"""
+from typing import Any, Tuple
+
+from scrapy import Request
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.test import get_crawler
+
+from steam_crawler.middlewares import SteamGateMiddleware
+
+import pytest
+
+
+PRODUCT_URL = "https://store.steampowered.com/app/550/"
+AGECHECK_URL = "https://store.steampowered.com/agecheck/app/550/"
+STORE_URL = "https://store.steampowered.com/"
+
+AGE_GATE_COOKIES = {"birthtime": "283996800", "mature_content": "1"}
+LOCALE_COOKIES = {"Steam_Language": "english"}
+
+
+def form_middleware(**settings: Any) -> Tuple[SteamGateMiddleware, Any]:
+    crawler = get_crawler(settings_dict=dict(
+        STEAM_GATE_ENABLED=True,
+        STEAM_AGE_GATE_COOKIES=AGE_GATE_COOKIES,
+        STEAM_LOCALE_COOKIES=LOCALE_COOKIES,
+        **settings,
+    ))
+    crawler.stats.open_spider()
+    return SteamGateMiddleware.from_crawler(crawler), crawler.stats
+
+
+def redirect(request: Request, url: str, body: bytes = b"<html></html>") -> Response:
+    # Ответ, к которому RedirectMiddleware привел запрос request
+    redirected = request.replace(url=url, meta=dict(request.meta, redirect_urls=[request.url]))
+    return HtmlResponse(url=url, body=body, request=redirected)
+
+
+def respond(middleware: SteamGateMiddleware, response: Response) -> Request | Response:
+    return middleware.process_response(response.request, response)
+
+
+def test_cookies_are_seeded_without_overriding_request_cookies():
+    middleware, _ = form_middleware()
+    request = Request(url=PRODUCT_URL, cookies={"Steam_Language": "russian"})
+    middleware.process_request(request)
+
+    assert request.cookies == {"Steam_Language": "russian", "birthtime": "283996800", "mature_content": "1"}
+
+
+def test_age_gate_is_retried_with_cookies():
+    middleware, stats = form_middleware()
+    request = Request(url=PRODUCT_URL, meta={"product_key": "app/550"})
+
+    retry = respond(middleware=middleware, response=redirect(request=request, url=AGECHECK_URL))
+
+    assert isinstance(retry, Request)
+    assert (retry.url, retry.dont_filter, retry.cookies) == (PRODUCT_URL, True, dict(AGE_GATE_COOKIES, **LOCALE_COOKIES))
+    assert retry.meta == {"product_key": "app/550", "steam_gate_retry": True}
+    assert stats.get_value("steam_gate/age_gate") == 1
+
+    page = HtmlResponse(url=PRODUCT_URL, body=b"<html>Left 4 Dead 2</html>", request=retry)
+    assert respond(middleware=middleware, response=page) is page
+    assert stats.get_value("steam_gate/recovered") == 1
+
+
+def test_age_gate_markup_without_redirect_is_retried():
+    middleware, _ = form_middleware()
+    request = Request(url=PRODUCT_URL)
+    page = HtmlResponse(url=PRODUCT_URL, body=b'<div id="app_agegate"></div>', request=request)
+
+    assert respond(middleware=middleware, response=page).url == PRODUCT_URL
+
+
+@pytest.mark.parametrize("url, body", [(STORE_URL, b"<html>Featured</html>"), (PRODUCT_URL, b"This item is currently unavailable in your region")])
+def test_region_lock_is_retried_with_fallback_cc(url, body):
+    middleware, stats = form_middleware(STEAM_REGION_FALLBACK_CC="us")
+    request = Request(url=PRODUCT_URL)
+    response = redirect(request=request, url=url, body=body) if url != PRODUCT_URL else HtmlResponse(url=url, body=body, request=request)
+
+    retry = respond(middleware=middleware, response=response)
+
+    assert retry.url == PRODUCT_URL + "?cc=us"
+    assert retry.meta["steam_gate_retry"]
+    assert stats.get_value("steam_gate/region_locked") == 1
+
+
+def test_region_lock_without_fallback_cc_is_given_to_spider():
+    middleware, _ = form_middleware()
+    response = redirect(request=Request(url=PRODUCT_URL), url=STORE_URL)
+
+    assert respond(middleware=middleware, response=response) is response
+
+
+@pytest.mark.parametrize("url", [AGECHECK_URL, STORE_URL])
+def test_gate_stops_after_one_retry(url):
+    middleware, stats = form_middleware(STEAM_REGION_FALLBACK_CC="us")
+    result = Request(url=PRODUCT_URL)
+
+    # Сервер каждый раз отвечает тем же перенаправлением: за первым повтором следует отказ, а не новый повтор
+    requests = 0
+    while isinstance(result, Request) and requests < 5:
+        requests += 1
+        result = respond(middleware=middleware, response=redirect(request=result, url=url))
+
+    assert requests == 2
+    assert isinstance(result, Response)
+    assert stats.get_value("steam_gate/recovered") is None
+
+
+def test_other_urls_and_cached_responses_pass_through():
+    middleware, _ = form_middleware(STEAM_REGION_FALLBACK_CC="us")
+    search = redirect(request=Request(url="https://store.steampowered.com/search/?term=zombie"), url=STORE_URL)
+    cached = HtmlResponse(url=AGECHECK_URL, flags=["steam_cache"], request=Request(url=PRODUCT_URL))
+
+    assert respond(middleware=middleware, response=search) is search
+    assert respond(middleware=middleware, response=cached) is cached
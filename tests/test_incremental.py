@@ -0,0 +1,133 @@
+"""
+Инкрементальный режим (INCREMENTAL): снимок и сохраненное состояние сводятся лишь после полного обхода без ошибок.
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+
+from scrapy import Request, signals
+from scrapy.http import Response
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.test import get_crawler
+from twisted.python.failure import Failure
+
+from steam_crawler.config import load_config
+from steam_crawler.items import Game
+from steam_crawler.pipelines import SteamCrawlerPipeline
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import json
+import pytest
+
+
+def form_game(app_id: str, price: str = "499 RUB") -> Game:
+    return Game(
+        app_id=app_id,
+        name=f"Game {app_id}",
+        price=price,
+        category="All Games > Action Games",
+        genres=["Action"],
+        tags=["Zombies"],
+        overall="Very Positive",
+        reviews_count="1,234",
+        release_date="16 Nov, 2009",
+        developers=["Valve"],
+        publishers=["Valve"],
+        franchises=[],
+        platforms=["Windows"],
+        languages=["English"],
+    )
+
+
+def form_failure(request: Request, status: int = 503) -> Failure:
+    # Как errback получает ответ, отброшенный HttpErrorMiddleware после исчерпанных повторов
+    failure = Failure(HttpError(Response(url=request.url, status=status, request=request), "Ignoring non-200 response"))
+    failure.request = request
+    return failure
+
+
+def crawl(
+    filename: str,
+    games: List[Game],
+    reason: str = "finished",
+    spider_exceptions: int = 0,
+    failed_products: List[str] = (),
+    failed_search_pages: List[int] = (),
+) -> None:
+    crawler = get_crawler(SteamGameSpider)
+    spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME=filename, INCREMENTAL=True)))
+    crawler.stats.open_spider()
+    if spider_exceptions:
+        crawler.stats.set_value("spider_exceptions/count", spider_exceptions)
+
+    pipeline = SteamCrawlerPipeline.from_crawler(crawler)
+    pipeline.open_spider(spider)
+    for game in games:
+        pipeline.process_item(game, spider)
+    for app_id in failed_products:
+        spider.parse_product_error(form_failure(request=Request(url=f"https://store.steampowered.com/app/{app_id}/")))
+    for page in failed_search_pages:
+        request = Request(url=f"https://store.steampowered.com/search/?page={page}", meta={"query": 0, "page": page})
+        list(spider.parse_search_page_error(form_failure(request=request)))
+
+    pipeline.close_spider(spider)
+    crawler.signals.send_catch_log(signal=signals.spider_closed, spider=spider, reason=reason)
+
+
+def read_lines(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_finished_crawl_reports_removed_products(tmp_path):
+    filename = str(tmp_path / "zombie")
+    crawl(filename=filename, games=[form_game("1"), form_game("2")])
+    crawl(filename=filename, games=[form_game("1", price="99 RUB")])
+
+    delta = read_lines(tmp_path / "zombie.delta.jsonl")
+    assert [(entry["status"], entry["game"]["app_id"]) for entry in delta] == [("changed", "1"), ("removed", "2")]
+    assert [game["app_id"] for game in read_lines(tmp_path / "zombie.jsonl")] == ["1"]
+
+
+@pytest.mark.parametrize("reason, spider_exceptions", [("shutdown", 0), ("max_items", 0), ("finished", 1)])
+def test_interrupted_crawl_keeps_state_and_snapshot(tmp_path, reason, spider_exceptions):
+    filename = str(tmp_path / "zombie")
+    crawl(filename=filename, games=[form_game("1"), form_game("2")])
+    state = (tmp_path / "zombie.state.json").read_text()
+    snapshot = (tmp_path / "zombie.jsonl").read_text()
+
+    crawl(filename=filename, games=[form_game("3")], reason=reason, spider_exceptions=spider_exceptions)
+
+    assert [(entry["status"], entry["game"]["app_id"]) for entry in read_lines(tmp_path / "zombie.delta.jsonl")] == [("new", "3")]
+    assert (tmp_path / "zombie.state.json").read_text() == state
+    assert (tmp_path / "zombie.jsonl").read_text() == snapshot
+
+
+def test_failed_product_keeps_its_record(tmp_path):
+    filename = str(tmp_path / "zombie")
+    crawl(filename=filename, games=[form_game("1"), form_game("2"), form_game("3")])
+
+    crawl(filename=filename, games=[form_game("1", price="99 RUB")], failed_products=["2"])
+
+    # Продукт 2 не загрузился и остается в снимке, продукт 3 в выдаче не встретился и удален
+    delta = read_lines(tmp_path / "zombie.delta.jsonl")
+    assert [(entry["status"], entry["game"]["app_id"]) for entry in delta] == [("changed", "1"), ("removed", "3")]
+    assert [game["app_id"] for game in read_lines(tmp_path / "zombie.jsonl")] == ["1", "2"]
+    assert "2" in json.loads((tmp_path / "zombie.state.json").read_text())
+
+
+def test_skipped_search_page_keeps_state_and_snapshot(tmp_path):
+    filename = str(tmp_path / "zombie")
+    crawl(filename=filename, games=[form_game("1"), form_game("2")])
+    state = (tmp_path / "zombie.state.json").read_text()
+    snapshot = (tmp_path / "zombie.jsonl").read_text()
+
+    crawl(filename=filename, games=[form_game("1")], failed_search_pages=[2])
+
+    assert read_lines(tmp_path / "zombie.delta.jsonl") == []
+    assert (tmp_path / "zombie.state.json").read_text() == state
+    assert (tmp_path / "zombie.jsonl").read_text() == snapshot
+
+
+def test_frontier_is_rejected(tmp_path):
+    crawler = get_crawler(SteamGameSpider, settings_dict={"FRONTIER_ENABLED": True})
+    with pytest.raises(ValueError, match="INCREMENTAL"):
+        SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME=str(tmp_path / "zombie"), INCREMENTAL=True)))
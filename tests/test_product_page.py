@@ -0,0 +1,60 @@
+"""
+Страница продукта (tests/fixtures/product_page_550.html - Left 4 Dead 2 в разметке магазина Steam, восстановленная
+вручную): разбор дерева только из нужных пауку фрагментов (HTML_FRAGMENTS_ONLY) дает тот же предмет, что и полный,
+и совпадает с записью, сохраненной пауком для этого продукта в examples/shooter.json. То же для всех страниц
+продуктов корпуса локального сервера-заменителя в полном объеме (описание, скрипты, обзоры, рекомендации).
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import Corpus
+from steam_crawler.config import load_config
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import json
+import pytest
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PRODUCT_PAGE = ROOT_DIR / "tests" / "fixtures" / "product_page_550.html"
+PRODUCT_URL = "https://store.steampowered.com/app/550/"
+
+
+def parse(parser: str, is_fragments_only: bool, url: str = PRODUCT_URL, body: bytes | None = None) -> List[Dict[str, Any]]:
+    crawler = get_crawler(SteamGameSpider, settings_dict={"HTML_PARSER": parser, "HTML_FRAGMENTS_ONLY": is_fragments_only})
+    spider = SteamGameSpider.from_crawler(crawler, config=load_config(source=dict(FILENAME="product_page")))
+
+    body = PRODUCT_PAGE.read_bytes() if body is None else body
+    response = HtmlResponse(url=url, body=body, encoding="utf-8", request=Request(url=url))
+    return [dict(game) for game in spider.parse(response)]
+
+
+def get_saved_game(name: str) -> Dict[str, Any]:
+    with open(file=ROOT_DIR / "examples" / "shooter.json", mode="r", encoding="utf-8") as file:
+        return next(game for game in map(json.loads, file) if game["name"] == name)
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_fragments_match_full_tree(parser):
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+
+    games = parse(parser=parser, is_fragments_only=True)
+
+    assert games == parse(parser=parser, is_fragments_only=False)
+    assert len(games) == 1
+    assert games[0] == dict(get_saved_game(name="Left 4 Dead 2"), app_id="550")
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_fragments_match_full_tree_on_corpus(parser):
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+
+    corpus = Corpus(store_url="https://store.steampowered.com")
+    for product in corpus.get_products()[:25]:
+        url, body = corpus.get_product_url(product=product), corpus.get_product_page(app_id=product.app_id)
+        assert parse(parser=parser, is_fragments_only=True, url=url, body=body) == parse(parser=parser, is_fragments_only=False, url=url, body=body)
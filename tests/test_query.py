@@ -0,0 +1,60 @@
+"""
+Офлайн-запросы к сохраненным результатам: чтение выгрузок JSON Lines и фильтры GameIndex.select_by_config.
+"""
+from typing import Any, Dict
+
+from steam_crawler.config import load_config
+from steam_crawler.query import GameIndex, load_records
+from steam_crawler.writers import OUTPUT_FORMATS, JsonLinesWriter
+
+import pytest
+
+
+def form_game(app_id: str, genres: list, release_date: str) -> Dict[str, Any]:
+    return {
+        "app_id": app_id,
+        "name": f"Game {app_id}",
+        "price": "499 RUB",
+        "category": "All Games",
+        "genres": genres,
+        "tags": ["Zombies"],
+        "overall": "Very Positive",
+        "reviews_count": "1,234",
+        "release_date": release_date,
+        "developers": ["Valve"],
+        "publishers": ["Valve"],
+        "franchises": [],
+        "platforms": ["Windows"],
+        "languages": ["English"],
+    }
+
+
+GAMES = [
+    form_game(app_id="1", genres=["Action"], release_date="16 Nov, 2009"),
+    form_game(app_id="2", genres=["Action", "RPG"], release_date="Jan 19, 2024"),
+    form_game(app_id="3", genres=["RPG"], release_date="Coming soon"),
+]
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+def test_select_by_config_reads_every_output_format(tmp_path, output_format):
+    if output_format.endswith(".zst"):
+        pytest.importorskip("zstandard")
+
+    path = str(tmp_path / f"games.{output_format}")
+    writer = JsonLinesWriter(path=path)
+    for game in GAMES:
+        writer.write(game)
+    writer.close()
+
+    records = load_records(path=path)
+    assert [record["app_id"] for record in records] == ["1", "2", "3"]
+
+    config = load_config(source=dict(
+        FILENAME="query",
+        TURN_ON_GENRE_SETTINGS=True,
+        GENRES=["RPG"],
+        TURN_ON_RELEASE_SETTINGS=True,
+        SINCE_RELEASE_YEAR=2010,
+    ))
+    assert [record["app_id"] for record in GameIndex(records=records).select_by_config(config=config)] == ["2"]
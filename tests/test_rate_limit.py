@@ -0,0 +1,148 @@
+"""
+Адаптивное ограничение скорости (SteamRateLimitMiddleware): отступление на 429 и 5xx, разовая пауза Retry-After,
+постепенное снятие ограничений после серии быстрых успешных ответов и ограничения слота, который загрузчик
+создал заново.
+"""
+from types import SimpleNamespace
+from typing import Any, Tuple
+
+from scrapy import Request
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+from steam_crawler.middlewares import SteamRateLimitMiddleware
+
+import pytest
+
+
+PRODUCT_URL = "https://store.steampowered.com/app/550/"
+
+
+def form_middleware(**settings: Any) -> Tuple[SteamRateLimitMiddleware, SimpleNamespace, Any]:
+    middleware, downloader, stats = form_middleware_with_downloader(**settings)
+    return middleware, downloader.slots["steam-app"], stats
+
+
+def form_middleware_with_downloader(**settings: Any) -> Tuple[SteamRateLimitMiddleware, SimpleNamespace, Any]:
+    crawler = get_crawler(settings_dict=dict({
+        "STEAM_RATE_CONTROL_ENABLED": True,
+        "STEAM_RATE_START_CONCURRENCY": {"app": 8},
+        "STEAM_RATE_MAX_CONCURRENCY": {"app": 9},
+    }, **settings))
+    crawler.stats.open_spider()
+
+    # Слот загрузчика для класса "app" - как его создал бы Downloader
+    slot = SimpleNamespace(concurrency=8, delay=0.0)
+    downloader = SimpleNamespace(slots={"steam-app": slot}, per_slot_settings={})
+    crawler.engine = SimpleNamespace(downloader=downloader)
+
+    middleware = SteamRateLimitMiddleware.from_crawler(crawler)
+    return middleware, downloader, crawler.stats
+
+
+def create_slot(downloader: SimpleNamespace, key: str) -> SimpleNamespace:
+    # Как Downloader создает слот: с настройками из DOWNLOAD_SLOTS, иначе - по умолчанию
+    slot_settings = downloader.per_slot_settings.get(key, {})
+    slot = downloader.slots[key] = SimpleNamespace(concurrency=slot_settings.get("concurrency", 8), delay=slot_settings.get("delay", 0.0))
+    return slot
+
+
+def respond(middleware: SteamRateLimitMiddleware, status: int = 200, latency: float = 0.1, **headers: str) -> Response:
+    request = Request(url=PRODUCT_URL, meta={"download_latency": latency})
+    middleware.process_request(request)
+    return middleware.process_response(request, Response(url=PRODUCT_URL, status=status, headers=headers, request=request))
+
+
+@pytest.mark.parametrize("status, stat", [(429, "throttled"), (503, "server_error")])
+def test_back_off_halves_concurrency_and_adds_delay(status, stat):
+    middleware, slot, stats = form_middleware()
+    respond(middleware=middleware, status=status)
+
+    assert slot.concurrency == 4
+    assert slot.delay > 0
+    assert stats.get_value(f"steam_rate/app/{stat}") == 1
+    assert stats.get_value("steam_rate/app/backoff") == 1
+
+
+def test_responses_to_earlier_requests_do_not_back_off_again():
+    middleware, slot, stats = form_middleware()
+    respond(middleware=middleware, status=429)
+    delay = slot.delay
+
+    respond(middleware=middleware, status=429)
+
+    assert (slot.concurrency, slot.delay) == (4, delay)
+    assert stats.get_value("steam_rate/app/throttled") == 2
+    assert stats.get_value("steam_rate/app/backoff") == 1
+
+
+def test_retry_after_is_a_one_time_pause():
+    middleware, slot, stats = form_middleware()
+    respond(middleware=middleware, status=429, **{"Retry-After": "30"})
+
+    assert slot.delay == 30
+    assert stats.get_value("steam_rate/app/retry_after") == 1
+
+    respond(middleware=middleware)
+    assert 0 < slot.delay < 1
+
+
+def test_retry_after_is_capped_by_max_delay():
+    middleware, slot, _ = form_middleware(STEAM_RATE_MAX_DELAY=10)
+    respond(middleware=middleware, status=429, **{"Retry-After": "3600"})
+
+    assert slot.delay == 10
+
+
+def test_fast_responses_ramp_up_to_max_concurrency():
+    middleware, slot, stats = form_middleware(STEAM_RATE_RAMP_UP_AFTER=2)
+    for _ in range(6):
+        respond(middleware=middleware)
+
+    assert (slot.concurrency, slot.delay) == (9, 0.0)
+    assert stats.get_value("steam_rate/app/ramp_up") == 1
+
+
+def test_slow_responses_keep_limits():
+    middleware, slot, stats = form_middleware(STEAM_RATE_RAMP_UP_AFTER=2, STEAM_RATE_TARGET_LATENCY=1.0)
+    for _ in range(6):
+        respond(middleware=middleware, latency=5.0)
+
+    assert slot.concurrency == 8
+    assert stats.get_value("steam_rate/app/ramp_up") is None
+
+
+def test_cached_responses_are_ignored():
+    middleware, slot, stats = form_middleware()
+    request = Request(url=PRODUCT_URL)
+    middleware.process_request(request)
+    middleware.process_response(request, Response(url=PRODUCT_URL, status=429, flags=["steam_cache"], request=request))
+
+    assert (slot.concurrency, slot.delay) == (8, 0.0)
+    assert stats.get_value("steam_rate/app/throttled") is None
+
+
+def test_recreated_slot_keeps_limits():
+    middleware, downloader, _ = form_middleware_with_downloader()
+    respond(middleware=middleware, status=429)
+    concurrency, delay = downloader.slots["steam-app"].concurrency, downloader.slots["steam-app"].delay
+
+    # Простаивавший слот загрузчик удаляет, а следующий запрос создает его заново уже после process_request
+    del downloader.slots["steam-app"]
+    request = Request(url=PRODUCT_URL)
+    middleware.process_request(request)
+    slot = create_slot(downloader=downloader, key=request.meta["download_slot"])
+
+    assert (slot.concurrency, slot.delay) == (concurrency, delay)
+    assert concurrency == 4 and delay > 0
+
+
+def test_first_slot_is_created_with_start_concurrency():
+    middleware, downloader, _ = form_middleware_with_downloader(STEAM_RATE_START_CONCURRENCY={"app": 3})
+    downloader.slots.clear()
+
+    request = Request(url=PRODUCT_URL)
+    middleware.process_request(request)
+
+    assert request.meta["download_slot"] == "steam-app"
+    assert create_slot(downloader=downloader, key="steam-app").concurrency == 3
@@ -0,0 +1,213 @@
+"""
+Порции JSON-выдачи бесконечной прокрутки (SEARCH_BACKEND = "infinite"): первая, последняя, пустая и неразборчивая,
+и настоящие обходы локального сервера-заменителя (benchmarks/standin_server.py) обоими способами получения выдачи:
+планирование, промежуточные обработчики, переход по страницам поиска и завершение обхода.
+
+fixtures/search_results_infinite.json - ответ search/results/?infinite=1 в формате Steam (три строки результатов).
+"""
+from pathlib import Path
+from threading import Thread
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from scrapy import Request
+from scrapy.http import TextResponse
+from scrapy.utils.test import get_crawler
+
+from benchmarks.corpus import SEARCH_PAGE_SIZE
+from benchmarks.standin_server import StandInHandler, StandInServer
+from steam_crawler.config import load_config
+from steam_crawler.settings import SEARCH_PAGES_IN_FLIGHT
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+import json
+import math
+import pytest
+import subprocess
+import sys
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Обход в отдельном процессе: реактор Twisted запускается один раз на процесс
+CRAWL_SCRIPT = """
+import json, sys
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from steam_crawler.config import load_config
+from steam_crawler.spiders.SteamGameSpider import SteamGameSpider
+
+store_url, overrides = sys.argv[1], json.loads(sys.argv[2])
+settings = get_project_settings()
+settings.setdict({"STEAM_STORE_URL": store_url, "STEAM_CACHE_ENABLED": False, "LOG_LEVEL": "WARNING"}, priority="cmdline")
+process = CrawlerProcess(settings=settings)
+crawler = process.create_crawler(SteamGameSpider)
+process.crawl(crawler, config=load_config(source=overrides))
+process.start()
+print(json.dumps({"finish_reason": crawler.stats.get_value("finish_reason"), "items": crawler.stats.get_value("item_scraped_count", 0)}))
+"""
+
+PRODUCT_URLS = [
+    "https://store.steampowered.com/app/550/",
+    "https://store.steampowered.com/app/500/",
+    "https://store.steampowered.com/app/1623730/",
+]
+
+
+def form_spider(**overrides: Any) -> SteamGameSpider:
+    crawler = get_crawler(SteamGameSpider)
+    config = load_config(source=dict(FILENAME="infinite", SEARCH_BACKEND="infinite", SEARCH_BATCH_SIZE=25, **overrides))
+    return SteamGameSpider.from_crawler(crawler, config=config)
+
+
+def load_results(**changes: Any) -> Dict[str, Any]:
+    results = json.loads((FIXTURES_DIR / "search_results_infinite.json").read_text(encoding="utf-8"))
+    results.update(changes)
+    return results
+
+
+def respond(request: Request, body: str) -> List[Any]:
+    response = TextResponse(url=request.url, body=body.encode("utf-8"), encoding="utf-8", request=request)
+    return list(request.callback(response))
+
+
+def get_first_request(spider: SteamGameSpider) -> Request:
+    requests = list(spider.start_requests())
+    assert len(requests) == 1 and requests[0].meta["is_first"]
+    return requests[0]
+
+
+def split(spider: SteamGameSpider, output: List[Any]) -> tuple:
+    search_requests = [request for request in output if request.callback == spider.parse_search_results]
+    product_urls = [request.url for request in output if request.callback != spider.parse_search_results]
+    return search_requests, product_urls
+
+
+def test_first_batch_schedules_remaining_batches():
+    spider = form_spider()
+    request = get_first_request(spider=spider)
+    assert "start=0" in request.url and "count=25" in request.url
+
+    search_requests, product_urls = split(spider=spider, output=respond(request=request, body=json.dumps(load_results(total_count=60))))
+
+    assert product_urls == PRODUCT_URLS
+    assert [request.meta["start"] for request in search_requests] == [25, 50]
+    assert all(not request.meta["is_first"] and request.meta["till_start"] == 60 for request in search_requests)
+
+
+def test_last_batch_schedules_nothing_more():
+    spider = form_spider()
+    first_output = respond(request=get_first_request(spider=spider), body=json.dumps(load_results(total_count=28)))
+    search_requests, _ = split(spider=spider, output=first_output)
+    assert [request.meta["start"] for request in search_requests] == [25]
+
+    search_requests, product_urls = split(spider=spider, output=respond(request=search_requests[0], body=json.dumps(load_results(start=25))))
+    assert search_requests == []
+    assert product_urls == PRODUCT_URLS
+
+
+def test_empty_batch_stops_search():
+    spider = form_spider()
+    body = json.dumps(load_results(results_html="\r\n<!-- List Items -->\r\n<!-- End List Items -->\r\n", total_count=60))
+    assert respond(request=get_first_request(spider=spider), body=body) == []
+
+
+def test_malformed_first_batch_is_retried_as_next_first_batch():
+    for body in ("<html>Service Unavailable</html>", "null", "[]", json.dumps({"success": 1, "results_html": None})):
+        spider = form_spider()
+        output = respond(request=get_first_request(spider=spider), body=body)
+
+        assert len(output) == 1
+        assert output[0].meta["is_first"] and output[0].meta["start"] == 25
+
+
+def test_malformed_batch_keeps_stoppable_search_going():
+    # С MAX_ITEMS порции запрашиваются по одной (SEARCH_PAGES_IN_FLIGHT): пропущенная порция запрашивает следующую
+    spider = form_spider(MAX_ITEMS=100)
+    search_requests, _ = split(spider=spider, output=respond(request=get_first_request(spider=spider), body=json.dumps(load_results(total_count=100))))
+    assert [request.meta["start"] for request in search_requests] == [25]
+
+    output = respond(request=search_requests[0], body='{"success": 1, "results_html": "<a class=')
+    assert [request.meta["start"] for request in output] == [50]
+
+
+class RecordingHandler(StandInHandler):
+    # Запоминает каждый запрошенный пауком путь
+
+    def do_GET(self) -> None:
+        self.server.paths.append(self.path)
+        super().do_GET()
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = StandInServer()
+    server.RequestHandlerClass = RecordingHandler
+    server.paths = list()
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(server: StandInServer, tmp_path: Path, **overrides: Any) -> Dict[str, Any]:
+    server.paths.clear()
+    config = dict(FILENAME=str(tmp_path / "crawl"), QUERY="zombie", **overrides)
+    completed = subprocess.run(
+        [sys.executable, "-c", CRAWL_SCRIPT, server.store_url, json.dumps(config)],
+        cwd=ROOT_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    result = json.loads(completed.stdout.splitlines()[-1])
+    result["games"] = [json.loads(line) for line in (tmp_path / "crawl.jsonl").read_text(encoding="utf-8").splitlines()]
+    result["paths"] = list(server.paths)
+    return result
+
+
+def get_search_positions(paths: List[str], prefix: str, parameter: str) -> List[int]:
+    return sorted(int(parse_qs(urlparse(path).query)[parameter][0]) for path in paths if path.startswith(prefix))
+
+
+def get_expected_app_ids(server: StandInServer) -> List[str]:
+    # Дополнения, саундтреки и не вышедшие продукты паук отбрасывает
+    products = server.corpus.get_products()
+    return sorted(str(product.app_id) for product in products if product.variant in ("game", "no_reviews"))
+
+
+def test_pages_crawl_lists_every_page_and_finishes(server, tmp_path):
+    result = crawl(server=server, tmp_path=tmp_path, SEARCH_BACKEND="pages")
+    pages_count = math.ceil(len(server.corpus.get_products()) / SEARCH_PAGE_SIZE)
+
+    assert result["finish_reason"] == "finished"
+    assert sorted(game["app_id"] for game in result["games"]) == get_expected_app_ids(server=server)
+    assert result["items"] == len(result["games"])
+    # Каждая непустая страница запрашивает страницу через SEARCH_PAGES_IN_FLIGHT от себя, пустые - ничего
+    till_page = pages_count + SEARCH_PAGES_IN_FLIGHT
+    assert get_search_positions(paths=result["paths"], prefix="/search/?", parameter="page") == list(range(1, till_page + 1))
+
+
+def test_infinite_crawl_matches_pages_crawl(server, tmp_path):
+    result = crawl(server=server, tmp_path=tmp_path, SEARCH_BACKEND="infinite", SEARCH_BATCH_SIZE=100)
+
+    assert result["finish_reason"] == "finished"
+    assert sorted(game["app_id"] for game in result["games"]) == get_expected_app_ids(server=server)
+    assert get_search_positions(paths=result["paths"], prefix="/search/results", parameter="start") == [0, 100, 200]
+
+
+def test_till_page_stops_search_paging(server, tmp_path):
+    result = crawl(server=server, tmp_path=tmp_path, SEARCH_BACKEND="pages", TURN_ON_PAGE_SETTINGS=True, SINCE_PAGE=2, TILL_PAGE=3)
+
+    assert result["finish_reason"] == "finished"
+    assert get_search_positions(paths=result["paths"], prefix="/search/?", parameter="page") == [2, 3]
+    assert 0 < len(result["games"]) <= 2 * SEARCH_PAGE_SIZE
+    assert all(path.startswith(("/search/", "/app/", "/robots.txt")) for path in result["paths"])
+
+
+def test_max_items_closes_spider(server, tmp_path):
+    result = crawl(server=server, tmp_path=tmp_path, SEARCH_BACKEND="pages", MAX_ITEMS=10)
+
+    assert result["finish_reason"] == "max_items"
+    assert len(result["games"]) == 10
+    assert len([path for path in result["paths"] if path.startswith("/app/")]) < len(server.corpus.get_products())
@@ -1,12 +1,71 @@
-from typing import List
+from typing import Any, Dict, List
 
 
 """
 @QUERY: str - Пользовательский запрос. Парсятся продукты площадки Steam, выдываемые по указанному запросу
 @FILENAME: str - Имя файла (без учета расширения), в который сохранить. Предыдущие данные затираются
+@OUTPUT_FORMAT: str - Формат выходного файла, он же его расширение: "jsonl" (JSON Lines, по продукту на строку),
+                      "jsonl.gz" (сжатый gzip) или "jsonl.zst" (сжатый zstd, требует zstandard)
 """
 QUERY: str | None = "Zombie games"  # Поддерживает пустой запрос
-FILENAME: str = "zombie"  # .json
+FILENAME: str = "zombie"
+OUTPUT_FORMAT: str = "jsonl"
+
+"""
+@INCREMENTAL: bool - Флаг на инкрементальный режим. Состояние прошлого запуска хранится в FILENAME.state.json;
+                     продукты с прежними стоимостью и числом обзоров повторно не загружаются,
+                     в FILENAME.delta.OUTPUT_FORMAT пишутся только новые, измененные и удаленные записи,
+                     а FILENAME.OUTPUT_FORMAT содержит объединенный актуальный снимок. Удаленными считаются
+                     лишь продукты, не встретившиеся в полной выдаче: продукт с незагрузившейся страницей сохраняет
+                     прежнюю запись, а после пропущенной страницы поиска снимок и состояние не меняются
+"""
+INCREMENTAL: bool = False
+
+"""
+@BATCH_QUERIES: List[dict] | None - Пакетный режим: список запросов, каждый из которых задается словарем
+                                   с переопределениями настроек этого файла (как минимум "QUERY" и "FILENAME"),
+                                   например {"QUERY": "zombie", "FILENAME": "zombie_fps", "TURN_ON_TAGS_SETTINGS": True,
+                                   "TAGS": ["FPS"]}. Продукт, найденный несколькими запросами, попадает в файл каждого
+                                   запроса, фильтрам которого удовлетворяет. Загружаемая страница продукта повторно
+                                   не запрашивается, но собранные продукты в памяти не хранятся: найденный другим
+                                   запросом позже продукт загружается снова (с STEAM_CACHE_ENABLED - из кэша).
+                                   Несовместим с INCREMENTAL (None -> один запрос QUERY)
+"""
+BATCH_QUERIES: List[Dict[str, Any]] | None = None
+
+"""
+@SEARCH_BACKEND: str - Способ получения результатов поиска:
+                       "pages" - постранично, как на сайте (по 25 результатов на страницу);
+                       "infinite" - JSON-выдачей бесконечной прокрутки крупными порциями (меньше запросов)
+@SEARCH_BATCH_SIZE: int - Число результатов в одной порции для "infinite" (не больше 100)
+"""
+SEARCH_BACKEND: str = "pages"
+SEARCH_BATCH_SIZE: int = 100
+
+"""
+@SEARCH_ORDER: str | None - Порядок выдачи поиска: "release" - сначала новые, "price" - сначала дешевые
+                            (None -> по релевантности, как на сайте). С включенными настройками года выхода ("release")
+                            или стоимости ("price") обход поиска останавливается, как только выдача уходит раньше
+                            SINCE_RELEASE_YEAR или дороже MAX_PRICE: дальше подходящих продуктов быть не может
+@MAX_RESULTS: int | None - Наибольшее число просматриваемых результатов поиска (None -> без ограничения)
+@MAX_ITEMS: int | None - Наибольшее число собираемых продуктов; по его достижении обход останавливается
+                         (None -> без ограничения). MAX_RESULTS и MAX_ITEMS несовместимы с INCREMENTAL
+"""
+SEARCH_ORDER: str | None = None
+MAX_RESULTS: int | None = None
+MAX_ITEMS: int | None = None
+
+"""
+@PRODUCT_BACKEND: str - Источник данных о продукте:
+                        "html" - только страница продукта;
+                        "api" - сначала JSON api/appdetails, по которому отсеиваются неподходящие продукты,
+                                затем страница продукта лишь для отсутствующих в API полей (тэги, оценка и т.д.)
+                        Тэгов, категории, оценки, числа обзоров и франшиз в API нет, поэтому каждый прошедший
+                        фильтры API продукт стоит двух запросов вместо одного. "api" выгоден, лишь когда фильтры
+                        по полям API (стоимость, год выхода, жанры, разработчики, издатели, платформы, языки)
+                        отсеивают большую часть продуктов: без фильтров обход медленнее, чем с "html"
+"""
+PRODUCT_BACKEND: str = "html"
 
 """
 @TURN_ON_PAGE_SETTINGS: bool - Флаг на применение указанных настроек